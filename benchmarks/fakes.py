@@ -0,0 +1,122 @@
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+
+
+class MemoryFilestore(interfaces.FileStore):
+    """A dict-backed filestore so that benchmarks don't measure disk or pyfakefs"""
+
+    def __init__(self, files: Dict[str, str]) -> None:
+        self._files = files
+
+    def path_exists(self, path: str) -> bool:
+        return path in self._files
+
+    def exists_as_dir(self, path: str) -> bool:
+        return False
+
+    def exists_as_file(self, path: str) -> bool:
+        return path in self._files
+
+    def read_file(self, path: str) -> str:
+        return self._files[path]
+
+    def write_file(self, path: str, contents: str) -> None:
+        self._files[path] = contents
+
+    def list_directory_contents(self, path: str) -> Set[str]:
+        return set()
+
+    def make_fifo(self, path: str) -> None:
+        self._files[path] = ""
+
+    def write_fifo(self, path: str, contents: str) -> None:
+        self._files[path] = contents
+
+
+# much faster than a real window manager, so that benchmarks mostly measure rezide
+DEFAULT_LATENCY_MODEL = dtos.LatencyModel(
+    spawn=0.0002, split=0.00005, focus=0.00005, resize=0.00005
+)
+
+
+class LatencyWindowManager(interfaces.TilingWindowManager):
+    """A window manager that takes as long as a real one would, according to its
+    latency model, without touching the desktop
+    """
+
+    def __init__(
+        self, latency_model: dtos.LatencyModel = DEFAULT_LATENCY_MODEL
+    ) -> None:
+        self._latency_model = latency_model
+
+    def make_window(self, window_details: dtos.WindowDetails) -> None:
+        time.sleep(self._latency_model.spawn)
+
+    def resize_width(
+        self, target_window: dtos.WindowDetails, section_percentage: int
+    ) -> None:
+        time.sleep(self._latency_model.resize)
+
+    def resize_height(
+        self, target_window: dtos.WindowDetails, section_percentage: int
+    ) -> None:
+        time.sleep(self._latency_model.resize)
+
+    def focus(self, target_window: dtos.WindowDetails) -> None:
+        time.sleep(self._latency_model.focus)
+
+    def split_and_mark_parent(self, split_type: str, mark: str) -> None:
+        time.sleep(self._latency_model.split)
+
+    @property
+    def num_workspace_windows(self) -> int:
+        return 0
+
+    def get_tree(self, workspace_name: Optional[str] = None) -> List:
+        return []
+
+    def get_windows(self, workspace_name: Optional[str] = None) -> List:
+        return []
+
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        return dtos.GeometrySnapshot(focused_workspace="1", windows=[])
+
+    def wait_for_tree_change(self) -> None:
+        pass
+
+    def get_window_sizes(self, workspace_name: Optional[str] = None) -> Dict:
+        return dict()
+
+    def get_workspace_snapshot(self) -> dtos.ContainerSnapshot:
+        return dtos.ContainerSnapshot(split=None, width=0, height=0)
+
+    def switch_workspace(self, workspace_name: str) -> None:
+        time.sleep(self._latency_model.focus)
+
+    def focus_output(self, output_name: str) -> None:
+        time.sleep(self._latency_model.focus)
+
+    def spawn_hidden(self, command: str) -> int:
+        time.sleep(self._latency_model.spawn)
+        return 0
+
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        pass
+
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        time.sleep(self._latency_model.focus)
+
+    def get_con_ids(self, marks: Iterable[str]) -> Dict[str, int]:
+        return dict()
+
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        time.sleep(self._latency_model.focus)
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        time.sleep(self._latency_model.focus)
+
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        return dict()
@@ -0,0 +1,138 @@
+"""Synthetic sway trees for benchmarking
+
+Trees are shaped like the JSON reply to sway's GET_TREE: a root, its outputs, their
+workspaces, and each workspace's windows side by side. The last window of the last
+workspace on the first output is focused, and each container's focus list starts with
+the child that leads to it.
+"""
+
+import itertools
+import json
+import socket
+import struct
+import threading
+from typing import Dict, List, NamedTuple
+
+import i3ipc
+
+
+class SwayTreeShape(NamedTuple):
+    outputs: int
+    workspaces_per_output: int
+    windows_per_workspace: int
+
+    @property
+    def id(self) -> str:
+        total_windows = (
+            self.outputs * self.workspaces_per_output * self.windows_per_workspace
+        )
+        return f"{total_windows}-windows-{self.windows_per_workspace}-focused"
+
+
+def _rect(width: int = 1920, height: int = 1080) -> Dict:
+    return {"x": 0, "y": 0, "width": width, "height": height}
+
+
+def make_tree_dict(shape: SwayTreeShape) -> Dict:
+    ids = itertools.count(1)
+    outputs: List[Dict] = []
+    for output_number in range(shape.outputs):
+        workspaces: List[Dict] = []
+        for workspace_number in range(shape.workspaces_per_output):
+            workspace_name = f"{output_number}-{workspace_number}"
+            windows: List[Dict] = [
+                {
+                    "id": next(ids),
+                    "type": "con",
+                    "name": "alacritty",
+                    "marks": [f"{workspace_name}-{window_number}"],
+                    "focused": False,
+                    "layout": "none",
+                    "pid": 1000,
+                    "rect": _rect(),
+                    "window_rect": _rect(),
+                    "nodes": [],
+                }
+                for window_number in range(shape.windows_per_workspace)
+            ]
+            workspaces.append(
+                {
+                    "id": next(ids),
+                    "type": "workspace",
+                    "name": workspace_name,
+                    "layout": "splith",
+                    "rect": _rect(),
+                    "nodes": windows,
+                    "focus": [window["id"] for window in reversed(windows)],
+                }
+            )
+        outputs.append(
+            {
+                "id": next(ids),
+                "type": "output",
+                "name": f"DP-{output_number}",
+                "rect": _rect(),
+                "nodes": workspaces,
+                "focus": [workspace["id"] for workspace in reversed(workspaces)],
+            }
+        )
+    outputs[0]["nodes"][-1]["nodes"][-1]["focused"] = True
+    return {
+        "id": 0,
+        "type": "root",
+        "name": "root",
+        "rect": _rect(),
+        "nodes": outputs,
+        "focus": [output["id"] for output in outputs],
+    }
+
+
+class FakeSwayConnection(object):
+    """Replies to GET_TREE with the same synthetic tree every time, without parsing
+    it again, so that benchmarks only measure what we do with the tree
+    """
+
+    def __init__(self, shape: SwayTreeShape) -> None:
+        self._tree = i3ipc.Con(make_tree_dict(shape), None, self)
+
+    def get_tree(self) -> i3ipc.Con:
+        return self._tree
+
+
+class FakeSwayServer(object):
+    """Answers every message on a Unix socket with the same synthetic GET_TREE reply,
+    so that benchmarks can measure a whole round trip without sway
+    """
+
+    header = struct.Struct("=6sII")
+
+    def __init__(self, path: str, shape: SwayTreeShape) -> None:
+        self.path = path
+        payload = json.dumps(make_tree_dict(shape)).encode()
+        self._reply = self.header.pack(b"i3-ipc", len(payload), 4) + payload
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(path)
+        self._listener.listen()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._answer, args=(client,), daemon=True).start()
+
+    def _answer(self, client: socket.socket) -> None:
+        with client:
+            while True:
+                header = client.recv(self.header.size, socket.MSG_WAITALL)
+                if len(header) < self.header.size:
+                    return
+                _, length, _ = self.header.unpack(header)
+                if length:
+                    client.recv(length, socket.MSG_WAITALL)
+                client.sendall(self._reply)
+
+    def close(self) -> None:
+        self._listener.close()
@@ -0,0 +1,109 @@
+"""Benchmarks for each stage of `rzd open`, run in isolation from the other stages"""
+
+import collections
+from typing import Dict
+
+import pytest
+
+from benchmarks import fakes
+from rezide import testing
+from rezide.utils import config_parser
+from rezide.utils import config_readers
+from rezide.utils import dtos
+from rezide.utils import interfaces
+from rezide.utils import layouts
+from rezide.utils import tree
+
+# from a single split up to a layout much bigger than anyone would open by hand, plus
+# the degenerate shapes that are deepest and widest for their number of windows
+layout_shapes = [
+    dtos.LayoutSpec(fan_out=2, depth=1),
+    dtos.LayoutSpec(fan_out=4, depth=2),
+    dtos.LayoutSpec(fan_out=8, depth=2),
+    dtos.LayoutSpec(fan_out=2, depth=6),
+    dtos.LayoutSpec(fan_out=4, depth=4),
+    dtos.LayoutSpec(fan_out=2, depth=64, shape="chain"),
+    dtos.LayoutSpec(fan_out=64, shape="star"),
+]
+# balanced shapes keep their original ids so that they still match the baseline
+shape_ids = [
+    (
+        f"w{shape.fan_out}-d{shape.depth}"
+        if shape.shape == "balanced"
+        else f"{shape.shape}-w{shape.fan_out}-d{shape.depth}"
+    )
+    for shape in layout_shapes
+]
+
+
+class PassthroughTreeFactory(interfaces.TreeFactoryInterface):
+    """Lets us measure ConfigParser.get_tree without also measuring tree building"""
+
+    def create_tree(self, root_node: Dict) -> Dict:  # type: ignore[override]
+        return root_node
+
+
+@pytest.fixture(params=layout_shapes, ids=shape_ids)
+def shape(request):
+    return request.param
+
+
+@pytest.fixture
+def config_dict(shape):
+    return testing.generate_config_dict(shape)
+
+
+@pytest.fixture
+def tree_dict(config_dict):
+    return config_parser.ConfigParser(config_dict, PassthroughTreeFactory()).get_tree()
+
+
+@pytest.fixture
+def layout_tree(tree_dict):
+    return tree.TreeFactory().create_tree(tree_dict)
+
+
+def test_toml_reader_read(benchmark, shape):
+    path = "/rezide/benchmark/config.toml"
+    filestore = fakes.MemoryFilestore({path: testing.generate_toml(shape)})
+    reader = config_readers.TomlReader(filestore)
+    benchmark(reader.read, path)
+
+
+def test_config_parser_validate(benchmark, config_dict):
+    parser = config_parser.ConfigParser(config_dict, tree.TreeFactory())
+    benchmark(parser.validate)
+
+
+def test_config_parser_get_tree(benchmark, config_dict):
+    parser = config_parser.ConfigParser(config_dict, PassthroughTreeFactory())
+    benchmark(parser.get_tree)
+
+
+def test_tree_factory_create_tree(benchmark, tree_dict):
+    benchmark(tree.TreeFactory().create_tree, tree_dict)
+
+
+def test_tree_equality(benchmark, tree_dict):
+    # separately built trees don't share any nodes, so this can't compare by identity
+    trees = (
+        tree.TreeFactory().create_tree(tree_dict),
+        tree.TreeFactory().create_tree(tree_dict),
+    )
+    benchmark(lambda: trees[0] == trees[1])
+
+
+def test_zachstras_traversal(benchmark, layout_tree):
+    layout = layouts.Layout(layout_tree)
+
+    def traverse() -> None:
+        # exhaust the generator without keeping any of the nodes around
+        collections.deque(layout.zachstras_traversal(), maxlen=0)
+
+    benchmark(traverse)
+
+
+def test_spawn_windows(benchmark, config_dict):
+    parser = config_parser.ConfigParser(config_dict, tree.TreeFactory())
+    layout_manager = layouts.LayoutManager(parser, fakes.LatencyWindowManager())
+    benchmark(layout_manager.spawn_windows)
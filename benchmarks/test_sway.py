@@ -0,0 +1,45 @@
+"""Benchmarks for looking things up in sway's tree
+
+Every tree has 10 windows on the focused workspace. The fake connection hands back the
+same decoded tree every time, so only the lookups are measured and not fetching or
+decoding the tree. Counting follows the focus chain from the root to the focused
+workspace, so it takes about as long in a 500-window tree as in a 50-window tree.
+"""
+
+import pytest
+
+from benchmarks import sway_trees
+from rezide.utils import mark_index
+from rezide.utils import sway
+
+tree_shapes = [
+    sway_trees.SwayTreeShape(
+        outputs=1, workspaces_per_output=5, windows_per_workspace=10
+    ),
+    sway_trees.SwayTreeShape(
+        outputs=2, workspaces_per_output=25, windows_per_workspace=10
+    ),
+]
+
+
+@pytest.fixture(params=tree_shapes, ids=[shape.id for shape in tree_shapes])
+def window_manager(request, mocker):
+    connection = sway_trees.FakeSwayConnection(request.param)
+    mocker.patch("i3ipc.Connection", return_value=connection)
+    return sway.Sway()
+
+
+def test_num_workspace_windows(benchmark, window_manager):
+    assert benchmark(lambda: window_manager.num_workspace_windows) == 10
+
+
+def test_mark_index(benchmark, window_manager):
+    """Build the index from one tree fetch, then look up every window"""
+    tree = window_manager._sway.get_tree()
+    marks = [mark for node in tree for mark in node.marks]
+
+    def index_and_look_up_marks():
+        index = mark_index.MarkIndex(tree)
+        return [index.get(mark) for mark in marks]
+
+    assert len(benchmark(index_and_look_up_marks)) == len(marks)
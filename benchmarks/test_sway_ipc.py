@@ -0,0 +1,64 @@
+"""Benchmarks for fetching sway's tree with i3ipc and with rezide's own IPC client
+
+Both clients fetch a GET_TREE reply with about 1000 containers from a fake sway over a
+Unix socket, so each round trip includes framing, JSON decoding, and building the
+containers. The decode benchmarks leave out the socket. Decoding only the focused
+workspace builds 49 windows instead of 980.
+"""
+
+import json
+
+import i3ipc
+import pytest
+
+from benchmarks import sway_trees
+from rezide.utils import sway_ipc
+
+shape = sway_trees.SwayTreeShape(
+    outputs=2, workspaces_per_output=10, windows_per_workspace=49
+)
+
+
+@pytest.fixture(scope="module")
+def payload():
+    return json.dumps(sway_trees.make_tree_dict(shape)).encode()
+
+
+@pytest.fixture
+def server(tmp_path):
+    fake_sway = sway_trees.FakeSwayServer(str(tmp_path / "sway.sock"), shape)
+    yield fake_sway
+    fake_sway.close()
+
+
+def test_i3ipc_get_tree(benchmark, server):
+    connection = i3ipc.Connection(socket_path=server.path)
+    tree = benchmark(connection.get_tree)
+    assert len(tree.leaves()) == 980
+
+
+def test_lean_get_tree(benchmark, server):
+    connection = sway_ipc.connect(server.path)
+    tree = benchmark(connection.get_tree)
+    assert sum(1 for node in sway_ipc.walk(tree) if node.type == "con") == 980
+    connection.close()
+
+
+def test_i3ipc_decode(benchmark, payload):
+    """What i3ipc does with a reply once it has read it"""
+    tree = benchmark(lambda: i3ipc.Con(json.loads(payload.decode()), None, None))
+    assert len(tree.leaves()) == 980
+
+
+def test_lean_decode(benchmark, payload):
+    tree = benchmark(lambda: sway_ipc.parse_node(sway_ipc.loads(payload)))
+    assert sum(1 for node in sway_ipc.walk(tree) if node.type == "con") == 980
+
+
+def test_lean_decode_focused_workspace(benchmark, payload):
+    workspace = benchmark(
+        lambda: sway_ipc.parse_node(
+            sway_ipc.find_focused_workspace(sway_ipc.loads(payload))
+        )
+    )
+    assert len(sway_ipc.leaves(workspace)) == 49
@@ -1,11 +1,18 @@
+from typing import List, Optional
+
 import click
 
+from rezide import output_options
 from rezide.utils import interfaces
+from rezide.utils import records
 from rezide.utils import sway
 
 
-def print_tree(window_manager: interfaces.TilingWindowManager) -> None:
-    for node in window_manager.get_tree():
+def print_tree(
+    window_manager: interfaces.TilingWindowManager,
+    workspace_name: Optional[str] = None,
+) -> None:
+    for node in window_manager.get_tree(workspace_name):
         click.echo(click.style(node.name, fg="green", bold=True))
         click.echo(f"x, y: ({node.rect.x}, {node.rect.y})")
         click.echo(f"width, height: ({node.rect.width}, {node.rect.height})")
@@ -16,6 +23,17 @@ def print_tree(window_manager: interfaces.TilingWindowManager) -> None:
 
 
 @click.command()
-def main() -> None:
+@output_options.output_options(default_fields=records.TREE_FIELDS)
+def main(
+    output_format: str, fields: List[str], workspace_name: Optional[str], watch: bool
+) -> None:
     window_manager = sway.Sway()
-    print_tree(window_manager)
+    if output_format == "text":
+        print_tree(window_manager, workspace_name)
+        return
+    output_options.print_records(
+        lambda: window_manager.get_tree(workspace_name),
+        output_format,
+        fields,
+        window_manager.wait_for_tree_change if watch else None,
+    )
@@ -1,16 +1,33 @@
 import pprint
+from typing import List, Optional
 
 import click
 
+from rezide import output_options
 from rezide.utils import interfaces
+from rezide.utils import records
 from rezide.utils import sway
 
 
 @click.command()
-def main() -> None:
+@output_options.output_options(default_fields=records.WINDOW_SIZE_FIELDS)
+def main(
+    output_format: str, fields: List[str], workspace_name: Optional[str], watch: bool
+) -> None:
     window_manager = sway.Sway()
-    print_window_sizes(window_manager)
+    if output_format == "text":
+        print_window_sizes(window_manager, workspace_name)
+        return
+    output_options.print_records(
+        lambda: window_manager.get_windows(workspace_name),
+        output_format,
+        fields,
+        window_manager.wait_for_tree_change if watch else None,
+    )
 
 
-def print_window_sizes(window_manager: interfaces.TilingWindowManager) -> None:
-    pprint.pprint(window_manager.get_window_sizes())
+def print_window_sizes(
+    window_manager: interfaces.TilingWindowManager,
+    workspace_name: Optional[str] = None,
+) -> None:
+    pprint.pprint(window_manager.get_window_sizes(workspace_name))
@@ -0,0 +1,84 @@
+import functools
+from typing import Any, Callable, Iterable, List, Optional
+
+import click
+
+from rezide.utils import records
+
+# options that get-tree and get-window-sizes share for machine-readable output
+
+FORMATS = ["text"] + list(records.WRITERS.keys())
+
+
+def output_options(default_fields: List[str]) -> Callable:
+    """Add --format, --fields, --workspace, and --watch to a command"""
+
+    def parse_fields(
+        context: click.Context, parameter: click.Parameter, value: str
+    ) -> List[str]:
+        try:
+            return records.parse_fields(value)
+        except RuntimeError as error:
+            raise click.BadParameter(str(error)) from error
+
+    def decorator(command: Callable) -> Callable:
+        @click.option(
+            "--format",
+            "output_format",
+            type=click.Choice(FORMATS),
+            default="text",
+            show_default=True,
+            help="How to print each node. json, ndjson, and csv print each node as soon"
+            + " as it's found.",
+        )
+        @click.option(
+            "--fields",
+            default=",".join(default_fields),
+            show_default=True,
+            callback=parse_fields,
+            help="Comma-separated fields to print for each node. Choose from: "
+            + ", ".join(records.FIELDS.keys()),
+        )
+        @click.option(
+            "--workspace",
+            "workspace_name",
+            help="Only look at this workspace. Defaults to the current workspace.",
+        )
+        @click.option(
+            "--watch",
+            is_flag=True,
+            help="Keep running and print the nodes that are added, changed, or removed"
+            + " whenever a window or workspace changes. Only works with ndjson and csv.",
+        )
+        @functools.wraps(command)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if kwargs["watch"] and kwargs["output_format"] not in ("ndjson", "csv"):
+                raise click.UsageError("--watch only works with ndjson and csv")
+            return command(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def print_records(
+    get_nodes: Callable[[], Iterable[Any]],
+    output_format: str,
+    fields: List[str],
+    wait_for_change: Optional[Callable[[], None]] = None,
+) -> None:
+    """Print nodes in a machine-readable format. If we can wait for changes, keep
+    printing the nodes that change, along with how they changed, until we're stopped
+    """
+
+    def write(text: str) -> None:
+        click.echo(text, nl=False)
+
+    if wait_for_change is None:
+        records.write_records(
+            get_nodes(), fields, records.WRITERS[output_format](fields, write)
+        )
+        return
+    writer = records.WRITERS[output_format](fields + [records.STATUS_FIELD], write)
+    for record in records.changed_records(get_nodes, fields, wait_for_change):
+        writer.write_record(record)
@@ -1,6 +1,8 @@
+import cProfile
 import logging
+import shlex
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 import click
 
@@ -8,10 +10,27 @@ import rezide
 from rezide.utils import config_dir
 from rezide.utils import config_parser
 from rezide.utils import config_readers
+from rezide.utils import config_watcher
+from rezide.utils import daemon
+from rezide.utils import dry_run
 from rezide.utils import dtos
 from rezide.utils import filestore
+from rezide.utils import geometry
+from rezide.utils import history
+from rezide.utils import includes
+from rezide.utils import inotify
+from rezide.utils import launcher
+from rezide.utils import layout_cache
 from rezide.utils import layouts
+from rezide.utils import linter
+from rezide.utils import pool
+from rezide.utils import sessions
+from rezide.utils import snapshots
 from rezide.utils import sway
+from rezide.utils import teardown
+from rezide.utils import templates
+from rezide.utils import tracing
+from rezide.utils import transitions
 from rezide.utils import tree
 
 # maps from verbosity level to log levels
@@ -22,10 +41,6 @@ VERBOSITY_LOG_LEVELS = {
 }
 
 
-# TODO: is it possible to do a dry-run where we just log info but don't
-# open windows or run commands? maybe a fake supbrocess runner?
-
-
 @click.group()
 @click.option(
     "-v",
@@ -49,6 +64,26 @@ VERBOSITY_LOG_LEVELS = {
     help="The current user's home directory. Reads from the HOME environment variable"
     + " by default.",
 )
+@click.option(
+    "--trace",
+    "trace_file",
+    type=click.Path(dir_okay=False),
+    help="Record how long each step takes and write it to this file as Chrome"
+    + " trace-event JSON. Open it with https://ui.perfetto.dev",
+)
+@click.option(
+    "--cprofile",
+    "cprofile_file",
+    type=click.Path(dir_okay=False),
+    help="Profile the run with cProfile and dump the pstats to this file",
+)
+@click.option(
+    "--lean-ipc",
+    is_flag=True,
+    envvar="REZIDE_LEAN_IPC",
+    help="Send commands and look up marks with rezide's own sway IPC client instead"
+    + " of i3ipc. Reads from the REZIDE_LEAN_IPC environment variable by default.",
+)
 @click.pass_context
 @click.version_option(version=rezide.__version__)
 def main(
@@ -56,6 +91,9 @@ def main(
     verbosity_level: int,
     xdg_config_home_dir: str,
     user_home_dir: str,
+    trace_file: Optional[str],
+    cprofile_file: Optional[str],
+    lean_ipc: bool,
 ) -> None:
     """todo: write me"""
     # ensure that ctx.obj exists and is a dict (in case `cli()` is called outside of
@@ -71,26 +109,392 @@ def main(
     logging.basicConfig(level=log_level)
     logging.info(f"Log level set to {log_level}")
     sys.tracebacklimit = verbosity_level
+    if cprofile_file:
+        start_profiling(context, cprofile_file)
+    tracer = tracing.Tracer()
+    context.obj["tracer"] = tracer
+    context.obj["lean_ipc"] = lean_ipc
+    if trace_file:
+        context.call_on_close(
+            lambda: tracer.write(filestore.LocalFilestore(), trace_file)
+        )
     env = dtos.Env(home=user_home_dir, xdg_config_home=xdg_config_home_dir)
     context.obj["env"] = env
-    context.obj["config_dir"] = config_dir.ConfigDir(filestore.LocalFilestore(), env)
+    with tracer.span("config discovery", "config"):
+        context.obj["config_dir"] = config_dir.ConfigDir(
+            filestore.LocalFilestore(), env
+        )
+
+
+def start_profiling(context: click.Context, cprofile_file: str) -> None:
+    """Profile everything until the command finishes, then dump the stats"""
+    profiler = cProfile.Profile()
+
+    def stop_profiling() -> None:
+        profiler.disable()
+        profiler.dump_stats(cprofile_file)
+
+    context.call_on_close(stop_profiling)
+    profiler.enable()
+
+
+socket_path_option = click.option(
+    "--socket-path",
+    default=daemon.default_socket_path,
+    show_default="$XDG_RUNTIME_DIR/rezide.sock",
+    help="The Unix socket that the rezide daemon listens on.",
+)
+
+param_option = click.option(
+    "--param",
+    "param_pairs",
+    multiple=True,
+    metavar="NAME=VALUE",
+    help="Fill in the layout's {{NAME}} placeholders. Can be given more than once.",
+)
 
 
 @main.command()
 @click.argument("layout_name")
+@click.option(
+    "--use-daemon",
+    is_flag=True,
+    help="Ask a running `rzd daemon` to open the layout instead of doing it here.",
+)
+@click.option(
+    "--supervise",
+    is_flag=True,
+    help="Start clients as rezide's own processes so that crashes are caught and"
+    + " readiness probes are run.",
+)
+@click.option(
+    "--prelaunch",
+    is_flag=True,
+    help="Start clients that were slow to open in earlier runs before anything else.",
+)
+@param_option
+@click.option(
+    "--dry-run",
+    "is_dry_run",
+    is_flag=True,
+    help="Print the commands that sway would be sent and estimate how long they'd"
+    + " take, without opening anything.",
+)
+@click.option(
+    "--latency",
+    "latency_pairs",
+    multiple=True,
+    metavar="OPERATION=SECONDS",
+    help="How long sway takes to spawn, split, focus or resize, for estimating dry"
+    + " runs. Can be given more than once.",
+)
+@click.option(
+    "--latency-from",
+    "latency_trace_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Measure latencies for dry runs from a file written by `rzd --trace`.",
+)
+@socket_path_option
 @click.pass_context
-def open(context: click.Context, layout_name: str) -> None:
+def open(
+    context: click.Context,
+    layout_name: str,
+    use_daemon: bool,
+    supervise: bool,
+    prelaunch: bool,
+    param_pairs: Tuple[str, ...],
+    is_dry_run: bool,
+    latency_pairs: Tuple[str, ...],
+    latency_trace_file: Optional[str],
+    socket_path: str,
+) -> None:
     """Open the IDE of your choice"""
     context.obj: Dict[str, Any]  # type: ignore[misc]
+    params = templates.parse_params(param_pairs)
+    if is_dry_run and (use_daemon or supervise):
+        raise click.UsageError(
+            "--dry-run can't be used with --use-daemon or --supervise"
+        )
+    if use_daemon and prelaunch:
+        raise click.UsageError("--prelaunch can't be used with --use-daemon")
+    if use_daemon:
+        request = shlex.join(["open", layout_name, *param_pairs])
+        response = daemon.send_request(socket_path, request)
+        if response != "ok":
+            raise RuntimeError(f"The daemon failed to open {layout_name}: {response}")
+        return
+    tracer: tracing.Tracer = context.obj["tracer"]
     config_directory = context.obj["config_dir"]
-    config_file_path = config_directory.get_layout_file_path(layout_name)
-    config_reader = config_readers.TomlReader(filestore.LocalFilestore())
-    config_dict = config_reader.read(config_file_path)
-    parser = config_parser.ConfigParser(config_dict, tree.TreeFactory())
-    window_manager = sway.Sway()
+    config_reader = tracing.TracingConfigReader(
+        config_readers.TomlReader(filestore.LocalFilestore()), tracer
+    )
+    modules = includes.ModuleCache(config_directory, config_reader)
+    parser = make_parser(modules, layout_name, tracer)
+    startup_times = load_startup_times() if prelaunch else None
+    if is_dry_run:
+        latency_model = dry_run.DEFAULT_LATENCY
+        if latency_trace_file:
+            latency_model = dry_run.latency_from_trace(
+                filestore.LocalFilestore().read_file(latency_trace_file)
+            )
+        latency_model = dry_run.parse_latency(latency_pairs, latency_model)
+        recorder = dry_run.RecordingWindowManager()
+        Rezide(
+            context.obj["env"],
+            layouts.LayoutManager(parser, recorder, startup_times=startup_times),
+        ).run(layout_name, params)
+        for recorded in recorder.commands:
+            click.echo(recorded.command)
+        click.echo(
+            dry_run.describe_estimate(recorder.operation_counts, latency_model),
+            err=True,
+        )
+        return
+    client_launcher = None
+    if supervise:
+        client_launcher = launcher.Launcher(filestore.LocalFilestore())
+    outcome = "error"
+    try:
+        with tracer.span("connect", "ipc"):
+            window_manager = tracing.TracingWindowManager(
+                sway.Sway(
+                    client_launcher=client_launcher, lean_ipc=context.obj["lean_ipc"]
+                ),
+                tracer,
+            )
+        layout = layouts.LayoutManager(
+            parser, window_manager, startup_times=startup_times
+        )
+        application = Rezide(context.obj["env"], layout)
+        with tracer.span("traversal", "layout", layout=layout_name):
+            application.run(layout_name, params)
+        outcome = "ok"
+    finally:
+        if client_launcher is not None:
+            client_launcher.close()
+        history.RunHistory(history.default_history_path()).record(
+            layout_name, outcome, tracer.events
+        )
+
+
+def make_parser(
+    modules: includes.ModuleCache, layout_name: str, tracer: tracing.Tracer
+) -> tracing.TracingConfigParser:
+    with tracer.span("config discovery", "config", layout=layout_name):
+        config_dict = modules.get(layout_name)
+    return tracing.TracingConfigParser(
+        config_parser.ConfigParser(
+            config_dict, tracing.TracingTreeFactory(tree.TreeFactory(), tracer)
+        ),
+        tracer,
+    )
+
+
+def load_startup_times() -> Dict[str, float]:
+    """Get how long each client has taken to open its window in earlier runs"""
+    return history.RunHistory(history.default_history_path()).startup_times()
+
+
+@main.command()
+@click.argument("old_layout_name")
+@click.argument("new_layout_name")
+@param_option
+@click.pass_context
+def switch(
+    context: click.Context,
+    old_layout_name: str,
+    new_layout_name: str,
+    param_pairs: Tuple[str, ...],
+) -> None:
+    """Turn the layout in the current workspace into another one, keeping the windows
+    that they share
+    """
+    context.obj: Dict[str, Any]  # type: ignore[misc]
+    params = templates.parse_params(param_pairs)
+    tracer: tracing.Tracer = context.obj["tracer"]
+    config_reader = tracing.TracingConfigReader(
+        config_readers.TomlReader(filestore.LocalFilestore()), tracer
+    )
+    modules = includes.ModuleCache(context.obj["config_dir"], config_reader)
+    old_parser = make_parser(modules, old_layout_name, tracer)
+    new_parser = make_parser(modules, new_layout_name, tracer)
+    with tracer.span("connect", "ipc"):
+        window_manager = tracing.TracingWindowManager(
+            sway.Sway(lean_ipc=context.obj["lean_ipc"]), tracer
+        )
+    switcher = transitions.LayoutSwitcher(window_manager)
+    with tracer.span("traversal", "layout", layout=new_layout_name):
+        plan = switcher.switch(
+            layouts.LayoutManager(old_parser, window_manager),
+            layouts.LayoutManager(new_parser, window_manager),
+            params,
+        )
+    click.echo(
+        f"reused {len(plan.reused)} windows and closed {len(plan.dropped)}", err=True
+    )
+
+
+@main.command()
+@click.argument("layout_name")
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=teardown.DEFAULT_TIMEOUT,
+    show_default=True,
+    help="How many seconds to give windows to close.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Stop the processes of windows that are still open after the timeout,"
+    + " unless they have windows outside of the layout.",
+)
+@click.pass_context
+def close(
+    context: click.Context, layout_name: str, timeout: float, force: bool
+) -> None:
+    """Close every window in a layout"""
+    context.obj: Dict[str, Any]  # type: ignore[misc]
+    tracer: tracing.Tracer = context.obj["tracer"]
+    config_reader = tracing.TracingConfigReader(
+        config_readers.TomlReader(filestore.LocalFilestore()), tracer
+    )
+    modules = includes.ModuleCache(context.obj["config_dir"], config_reader)
+    parser = make_parser(modules, layout_name, tracer)
+    with tracer.span("connect", "ipc"):
+        window_manager = tracing.TracingWindowManager(
+            sway.Sway(lean_ipc=context.obj["lean_ipc"]), tracer
+        )
     layout = layouts.LayoutManager(parser, window_manager)
-    application = Rezide(context.obj["env"], layout)
-    application.run(layout_name)
+    with tracer.span("teardown", "layout", layout=layout_name):
+        report = teardown.LayoutCloser(window_manager).close(
+            layout.marks(), timeout, force
+        )
+    for mark in report.survivors:
+        click.echo(mark)
+    click.echo(
+        f"closed {len(report.closed)} windows, {len(report.survivors)} still open"
+        + f" ({len(report.missing)} weren't open)",
+        err=True,
+    )
+    if report.survivors:
+        context.exit(1)
+
+
+@main.command()
+@click.argument("session_name")
+@click.pass_context
+def open_session(context: click.Context, session_name: str) -> None:
+    """Open several layouts at once, each on its own workspace"""
+    context.obj: Dict[str, Any]  # type: ignore[misc]
+    tracer: tracing.Tracer = context.obj["tracer"]
+    config_directory = context.obj["config_dir"]
+    with tracer.span("config discovery", "config", session=session_name):
+        session_file_path = config_directory.get_session_file_path(session_name)
+    config_reader = tracing.TracingConfigReader(
+        config_readers.TomlReader(filestore.LocalFilestore()), tracer
+    )
+    workspace_layouts = sessions.parse_session(config_reader.read(session_file_path))
+    with tracer.span("connect", "ipc"):
+        window_manager = tracing.TracingWindowManager(
+            sway.Sway(lean_ipc=context.obj["lean_ipc"]), tracer
+        )
+    cache = layout_cache.LayoutCache(
+        config_directory,
+        config_reader,
+        tracing.TracingTreeFactory(tree.TreeFactory(), tracer),
+        window_manager,
+    )
+    session = sessions.SessionManager(workspace_layouts, cache.get, window_manager)
+    with tracer.span("traversal", "layout", session=session_name):
+        session.open()
+
+
+@main.command()
+@click.argument("layout_name")
+@click.option("--force", is_flag=True, help="Replace the layout if it already exists.")
+@click.pass_context
+def save(context: click.Context, layout_name: str, force: bool) -> None:
+    """Save the windows in the current workspace as a new layout"""
+    context.obj: Dict[str, Any]  # type: ignore[misc]
+    tracer: tracing.Tracer = context.obj["tracer"]
+    config_directory = context.obj["config_dir"]
+    config_file_path = config_directory.get_new_layout_file_path(
+        layout_name, overwrite=force
+    )
+    local_filestore = filestore.LocalFilestore()
+    with tracer.span("connect", "ipc"):
+        window_manager = tracing.TracingWindowManager(sway.Sway(), tracer)
+    workspace = window_manager.get_workspace_snapshot()
+    with tracer.span("serialize", "config", layout=layout_name):
+        contents = snapshots.to_toml(
+            workspace, snapshots.ProcCommandReader(local_filestore)
+        )
+    local_filestore.write_file(config_file_path, contents)
+    click.echo(f"saved {layout_name} to {config_file_path}")
+
+
+@main.command()
+@click.argument("layout_names", nargs=-1)
+@click.option(
+    "--all", "check_all", is_flag=True, help="Check every layout in the config dir."
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="How many layouts to check at once. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--cache-file",
+    type=click.Path(dir_okay=False),
+    default=linter.default_cache_path,
+    show_default="$XDG_CACHE_HOME/rezide/check.json",
+    help="Where to remember results so that unchanged layouts aren't checked again.",
+)
+@click.option("--no-cache", is_flag=True, help="Check every layout from scratch.")
+@click.pass_context
+def check(
+    context: click.Context,
+    layout_names: Tuple[str, ...],
+    check_all: bool,
+    jobs: Optional[int],
+    cache_file: str,
+    no_cache: bool,
+) -> None:
+    """Check layouts for mistakes without opening them"""
+    context.obj: Dict[str, Any]  # type: ignore[misc]
+    config_directory: config_dir.ConfigDir = context.obj["config_dir"]
+    if check_all:
+        layout_names = tuple(config_directory.list_layouts())
+    elif not layout_names:
+        raise click.UsageError("Name the layouts to check or pass --all")
+    local_filestore = filestore.LocalFilestore()
+    cache = None if no_cache else linter.CheckCache(local_filestore, cache_file)
+    checks, cached_count = linter.check_layouts(
+        local_filestore, config_directory.path, layout_names, cache, jobs
+    )
+    if cache is not None:
+        cache.save()
+    problems = [problem for layout_check in checks for problem in layout_check.problems]
+    for problem in problems:
+        click.echo(linter.format_problem(problem))
+    click.echo(
+        f"checked {len(checks)} layouts ({cached_count} unchanged):"
+        + f" {len(problems)} problems",
+        err=True,
+    )
+    if problems:
+        context.exit(1)
+
+
+@main.command()
+@click.argument("layout_name", required=False)
+def stats(layout_name: Optional[str]) -> None:
+    """Show how long layouts have taken to open"""
+    report = history.RunHistory(history.default_history_path()).report(layout_name)
+    for line in history.describe_report(report):
+        click.echo(line)
 
 
 # I want to handle this with an "eager option", but we wouldn't be able to retrieve the
@@ -108,6 +512,72 @@ def list_layouts(context: click.Context) -> None:
         click.secho(layout, fg="blue")
 
 
+@main.command(name="daemon")
+@socket_path_option
+@click.option(
+    "--pool-size",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Keep this many terminals warm in the scratchpad for windows that define"
+    + " terminal_command.",
+)
+@click.option(
+    "--pool-terminal",
+    default=pool.DEFAULT_TERMINAL,
+    show_default=True,
+    help="The command that opens a warm terminal and runs the rest of the line in it."
+    + " {app_id} is replaced with the app id that the terminal's window needs.",
+)
+@click.pass_context
+def run_daemon(
+    context: click.Context, socket_path: str, pool_size: int, pool_terminal: str
+) -> None:
+    """Keep layouts and a window manager connection ready so that layouts open fast.
+
+    Send requests to the daemon with `rzd open --use-daemon LAYOUT_NAME` or with
+    anything that can write to a Unix socket, like
+    `echo "open LAYOUT_NAME" | nc -U $XDG_RUNTIME_DIR/rezide.sock`
+    """
+    context.obj: Dict[str, Any]  # type: ignore[misc]
+    client_pool = None
+    if pool_size > 0:
+        # the pool gets its own connection so that it can start terminals while the
+        # daemon is building a layout
+        client_pool = pool.ClientPool(
+            sway.Sway(), filestore.LocalFilestore(), pool_size, pool_terminal
+        )
+        client_pool.start()
+    cache = layout_cache.LayoutCache(
+        context.obj["config_dir"],
+        config_readers.TomlReader(filestore.LocalFilestore()),
+        tree.TreeFactory(),
+        sway.Sway(keep_event_subscription=True, lean_ipc=context.obj["lean_ipc"]),
+        client_pool,
+    )
+    cache.preload()
+    watcher = config_watcher.ConfigWatcher(
+        context.obj["config_dir"],
+        filestore.LocalFilestore(),
+        inotify.InotifyWatcher(),
+        cache,
+    )
+    watcher.start()
+    # the monitor gets its own connection so that it can fetch the tree while the
+    # daemon is building a layout
+    geometry_model = geometry.GeometryModel()
+    monitor = geometry.GeometryMonitor(sway.Sway(), geometry_model)
+    monitor.start()
+    try:
+        with daemon.Daemon(socket_path, cache, geometry_model) as server:
+            logging.info(f"listening on {socket_path}")
+            server.serve_forever()
+    finally:
+        monitor.stop()
+        watcher.stop()
+        if client_pool is not None:
+            client_pool.stop()
+
+
 class Rezide(object):
     """Manages the application's state and calls the appropriate functions"""
 
@@ -119,5 +589,5 @@ class Rezide(object):
         self._layout = layout
         logging.debug(f"Env is {env}")
 
-    def run(self, layout_name: str) -> None:
-        self._layout.spawn_windows()
+    def run(self, layout_name: str, params: Optional[Dict[str, str]] = None) -> None:
+        self._layout.spawn_windows(params)
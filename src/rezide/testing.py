@@ -0,0 +1,194 @@
+"""Synthetic layouts for stress tests and benchmarks
+
+Layouts come out in the same format that `TomlReader.read` returns, or as TOML. The
+same spec and seed always make the same layout, so they're safe to use in tests:
+
+    config_dict = testing.generate_config_dict(dtos.LayoutSpec(depth=4, fan_out=3))
+
+Shapes:
+* balanced: every section has `fan_out` children, and every window is `depth` levels
+  below the root
+* chain: a left-deep chain of `depth` sections. Each one's first child is the next
+  section and the rest are windows, so the first window is as deep as it gets
+* star: a single section with `fan_out` windows. `depth` is ignored
+* random: sections have 2 to `fan_out` children, and each child that can be a section
+  has an even chance of being one
+"""
+
+import collections
+import json
+import random
+import string
+from typing import Deque, Dict, List, Tuple
+
+import click
+import toml
+
+from rezide.utils import dtos
+
+SHAPES = ["balanced", "chain", "star", "random"]
+SIZE_DISTRIBUTIONS = ["even", "random", "skewed"]
+# sizes are whole percentages, and every child gets at least 1%
+MAX_FAN_OUT = 100
+# anything bigger takes a long time to generate and even longer to open
+MAX_WINDOWS = 10_000
+# the parser and the tree factory recurse once per level, so deeper layouts would run
+# into the recursion limit before they could be opened
+MAX_DEPTH = 200
+
+
+def generate_config_dict(spec: dtos.LayoutSpec) -> Dict[str, Dict]:
+    """Create a layout in the same format that `TomlReader.read` returns"""
+    check_spec(spec)
+    rng = random.Random(spec.seed)
+    definitions: Dict[str, Dict] = dict()
+    counts = {"section": 0, "window": 0}
+    # breadth-first, so that deep chains don't run into the recursion limit
+    sections: Deque[Tuple[str, int]] = collections.deque([("root", 1)])
+    while sections:
+        name, level = sections.popleft()
+        children = []
+        windows = []
+        for child_is_section in _child_kinds(spec, rng, level):
+            kind = "section" if child_is_section else "window"
+            counts[kind] += 1
+            child = f"{kind}-{counts[kind]}"
+            children.append(child)
+            if child_is_section:
+                sections.append((child, level + 1))
+            else:
+                windows.append(child)
+        # sections come before their windows so that the TOML reads top-down
+        definitions[name] = {
+            "split": "horizontal" if level % 2 == 1 else "vertical",
+            "children": children,
+            "sizes": make_sizes(len(children), spec.sizes, rng),
+        }
+        for window in windows:
+            definitions[window] = {"command": make_command(window, spec, rng)}
+    return definitions
+
+
+def generate_toml(spec: dtos.LayoutSpec) -> str:
+    return toml.dumps(generate_config_dict(spec))
+
+
+def check_spec(spec: dtos.LayoutSpec) -> None:
+    if spec.shape not in SHAPES:
+        raise RuntimeError(f"shape must be one of {', '.join(SHAPES)}: {spec.shape}")
+    if spec.sizes not in SIZE_DISTRIBUTIONS:
+        raise RuntimeError(
+            f"sizes must be one of {', '.join(SIZE_DISTRIBUTIONS)}: {spec.sizes}"
+        )
+    if not 1 <= spec.depth <= MAX_DEPTH:
+        raise RuntimeError(f"depth must be between 1 and {MAX_DEPTH}: {spec.depth}")
+    if not 2 <= spec.fan_out <= MAX_FAN_OUT:
+        raise RuntimeError(
+            f"fan_out must be between 2 and {MAX_FAN_OUT}: {spec.fan_out}"
+        )
+    if spec.command_length < 0:
+        raise RuntimeError(f"command_length can't be negative: {spec.command_length}")
+    if max_windows(spec) > MAX_WINDOWS:
+        raise RuntimeError(
+            f"this layout could have {max_windows(spec)} windows, but the most that"
+            + f" can be generated is {MAX_WINDOWS}"
+        )
+
+
+def max_windows(spec: dtos.LayoutSpec) -> int:
+    """Get the most windows that a layout with this spec can have"""
+    if spec.shape == "star":
+        return spec.fan_out
+    if spec.shape == "chain":
+        return spec.depth * (spec.fan_out - 1) + 1
+    return int(spec.fan_out**spec.depth)
+
+
+def make_sizes(num_children: int, distribution: str, rng: random.Random) -> List[int]:
+    """Split 100 between the children"""
+    if distribution == "random":
+        cuts = sorted(rng.sample(range(1, 100), num_children - 1))
+        return [end - start for start, end in zip([0, *cuts], [*cuts, 100])]
+    if distribution == "skewed":
+        # one huge child and a lot of slivers
+        return [100 - (num_children - 1)] + [1] * (num_children - 1)
+    # give any remainder to the first child
+    sizes = [100 // num_children] * num_children
+    sizes[0] += 100 - sum(sizes)
+    return sizes
+
+
+def make_command(name: str, spec: dtos.LayoutSpec, rng: random.Random) -> str:
+    """Make a terminal command that's `spec.command_length` characters long, or as
+    close as it can get without going under that
+    """
+    prefix = f"alacritty --title {name} -e sh -c '"
+    suffix = "zsh'"
+    padding = spec.command_length - len(prefix) - len(suffix) - len("echo ; ")
+    if padding <= 0:
+        return prefix + suffix
+    filler = "".join(rng.choices(string.ascii_lowercase, k=padding))
+    return f"{prefix}echo {filler}; {suffix}"
+
+
+def _child_kinds(spec: dtos.LayoutSpec, rng: random.Random, level: int) -> List[bool]:
+    """Decide how many children a section at this level has and which of them are
+    sections
+    """
+    can_nest = level < spec.depth
+    if spec.shape == "star":
+        return [False] * spec.fan_out
+    if spec.shape == "chain":
+        return [can_nest] + [False] * (spec.fan_out - 1)
+    if spec.shape == "random":
+        num_children = rng.randint(2, spec.fan_out)
+        return [can_nest and rng.random() < 0.5 for _ in range(num_children)]
+    return [can_nest] * spec.fan_out
+
+
+@click.command()
+@click.option("--depth", default=2, show_default=True, help="Levels of sections.")
+@click.option("--fan-out", default=2, show_default=True, help="Children per section.")
+@click.option(
+    "--shape", type=click.Choice(SHAPES), default="balanced", show_default=True
+)
+@click.option(
+    "--sizes",
+    type=click.Choice(SIZE_DISTRIBUTIONS),
+    default="even",
+    show_default=True,
+    help="How each section splits its space between its children.",
+)
+@click.option(
+    "--command-length",
+    default=0,
+    show_default=True,
+    help="Pad window commands out to this many characters.",
+)
+@click.option("--seed", default=0, show_default=True)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["toml", "json"]),
+    default="toml",
+    show_default=True,
+)
+def main(
+    depth: int,
+    fan_out: int,
+    shape: str,
+    sizes: str,
+    command_length: int,
+    seed: int,
+    output_format: str,
+) -> None:
+    """Print a synthetic layout, for example to save as a layout's config.toml"""
+    spec = dtos.LayoutSpec(depth, fan_out, shape, sizes, command_length, seed)
+    try:
+        config_dict = generate_config_dict(spec)
+    except RuntimeError as error:
+        raise click.UsageError(str(error)) from error
+    if output_format == "json":
+        click.echo(json.dumps(config_dict, indent=2))
+    else:
+        click.echo(toml.dumps(config_dict), nl=False)
@@ -5,6 +5,9 @@ from typing import Optional, Set
 from rezide.utils import dtos
 from rezide.utils import interfaces
 
+CONFIG_FILE_NAME = "config.toml"
+SESSION_FILE_NAME = "session.toml"
+
 
 class ConfigDir(interfaces.ConfigDir):
     """Finds and exposes operations for a rezide configuration directory"""
@@ -42,6 +45,10 @@ class ConfigDir(interfaces.ConfigDir):
             )
         logging.info(f"reading from '{self._dir}' as config dir")
 
+    @property
+    def path(self) -> str:
+        return self._dir
+
     def list_layouts(self) -> Set[str]:
         """List all available layouts in the config directory"""
         logging.info(f"listing layouts in {self._dir}")
@@ -50,7 +57,7 @@ class ConfigDir(interfaces.ConfigDir):
             logging.debug(f"examining {file_or_dir} to see if it has a config")
             absolute_path_to_dir = os.path.join(self._dir, file_or_dir)
             absolute_path_to_config_file = os.path.join(
-                absolute_path_to_dir, "config.toml"
+                absolute_path_to_dir, CONFIG_FILE_NAME
             )
             is_dir = self._filestore.exists_as_dir(absolute_path_to_dir)
             has_config_file = self._filestore.exists_as_file(
@@ -64,7 +71,31 @@ class ConfigDir(interfaces.ConfigDir):
         """Given a name of a layout, check for a matching toml file in the config directory
         and return its absolute file path if it exists
         """
-        file_path = os.path.join(self._dir, layout_name, "config.toml")
+        file_path = os.path.join(self._dir, layout_name, CONFIG_FILE_NAME)
         if not self._filestore.exists_as_file(file_path):
             raise RuntimeError(f"Layout '{layout_name}' doesn't exist in '{self._dir}'")
         return file_path
+
+    def get_new_layout_file_path(
+        self, layout_name: str, overwrite: bool = False
+    ) -> str:
+        """Get the path where a new layout's toml file should go. Refuse to replace an
+        existing layout unless we're told to overwrite it
+        """
+        file_path = os.path.join(self._dir, layout_name, CONFIG_FILE_NAME)
+        if not overwrite and self._filestore.path_exists(file_path):
+            raise RuntimeError(
+                f"Layout '{layout_name}' already exists in '{self._dir}'"
+            )
+        return file_path
+
+    def get_session_file_path(self, session_name: str) -> str:
+        """Given a name of a session, check for a matching session file in the config
+        directory and return its absolute file path if it exists
+        """
+        file_path = os.path.join(self._dir, session_name, SESSION_FILE_NAME)
+        if not self._filestore.exists_as_file(file_path):
+            raise RuntimeError(
+                f"Session '{session_name}' doesn't exist in '{self._dir}'"
+            )
+        return file_path
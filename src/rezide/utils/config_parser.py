@@ -1,8 +1,35 @@
 import logging
-from typing import Dict
+import re
+from typing import Any, Dict, Iterable, List, Optional
 
 from rezide.utils import interfaces
 
+# readiness probes that a window can define on top of its command
+WINDOW_PROBE_KEYS = {"ready_title", "ready_socket", "ready_timeout"}
+
+
+class ConfigError(RuntimeError):
+    """A problem with a layout's config, along with the file, table, and key where it
+    is when we know them
+    """
+
+    def __init__(
+        self,
+        message: str,
+        table: Optional[str] = None,
+        key: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        # passing every argument along lets errors be pickled and copied
+        super().__init__(message, table, key, path)
+        self.message = message
+        self.table = table
+        self.key = key
+        self.path = path
+
+    def __str__(self) -> str:
+        return self.message
+
 
 class ConfigParser(interfaces.ConfigParserInterface):
     """Parses a config file and creates a Tree out of it."""
@@ -17,46 +44,123 @@ class ConfigParser(interfaces.ConfigParserInterface):
 
     def validate(self) -> None:
         for definition_name, definition_body in self._layout_definitions.items():
-            if "command" in definition_body:
-                self._validate_window(definition_name, definition_body)
-            elif "children" in definition_body:
-                self._validate_section(definition_name, definition_body)
-            else:
-                logging.error(definition_body)
-                raise RuntimeError(
-                    f"This definition is not a Window or Section: {definition_name}"
-                )
+            self._validate_definition(definition_name, definition_body)
+
+    def find_errors(self) -> List[ConfigError]:
+        """Validate every definition instead of stopping at the first error"""
+        errors = []
+        for definition_name, definition_body in self._layout_definitions.items():
+            try:
+                self._validate_definition(definition_name, definition_body)
+            except ConfigError as error:
+                errors.append(error)
+        return errors
+
+    def _validate_definition(self, definition_name: str, definition_body: Any) -> None:
+        if not isinstance(definition_body, dict):
+            raise ConfigError(
+                f"This definition is not a table: {definition_name}", definition_name
+            )
+        if "command" in definition_body:
+            self._validate_window(definition_name, definition_body)
+        elif "children" in definition_body:
+            self._validate_section(definition_name, definition_body)
+        else:
+            logging.error(definition_body)
+            raise ConfigError(
+                f"This definition is not a Window or Section: {definition_name}",
+                definition_name,
+            )
 
     def _validate_window(self, definition_name: str, definition_body: Dict) -> None:
-        if len(definition_body) != 1:
-            raise RuntimeError(f"Window must only define command: {definition_name}")
+        allowed_keys = {"command", "terminal_command", "reuse"} | WINDOW_PROBE_KEYS
+        extra_keys = set(definition_body.keys()) - allowed_keys
+        if len(extra_keys) > 0:
+            raise ConfigError(
+                f"Window must only define these keys: {allowed_keys}. extra keys"
+                + f" defined in {definition_name}: {extra_keys}",
+                definition_name,
+                _join(extra_keys),
+            )
+        if "ready_title" in definition_body:
+            try:
+                re.compile(definition_body["ready_title"])
+            except (re.error, TypeError) as error:
+                raise ConfigError(
+                    f"ready_title is not a valid regex in {definition_name}: {error}",
+                    definition_name,
+                    "ready_title",
+                ) from error
+        if "ready_timeout" in definition_body:
+            ready_timeout = definition_body["ready_timeout"]
+            if not isinstance(ready_timeout, (int, float)) or ready_timeout <= 0:
+                raise ConfigError(
+                    "ready_timeout must be a positive number of seconds in"
+                    + f" {definition_name}",
+                    definition_name,
+                    "ready_timeout",
+                )
 
     def _validate_section(self, definition_name: str, definition_body: Dict) -> None:
         keys = set(definition_body.keys())
-        if not {"split", "children", "sizes"}.issubset(keys):
-            raise RuntimeError(
-                f"Section must define split, children, and sizes. keys defined: {keys}"
+        required_keys = {"split", "children", "sizes"}
+        if not required_keys.issubset(keys):
+            raise ConfigError(
+                f"Section must define split, children, and sizes. keys defined: {keys}",
+                definition_name,
+                _join(required_keys - keys),
             )
         allowed_keys = {"split", "children", "sizes", "is_layout"}
         extra_keys = keys - allowed_keys
         if len(extra_keys) > 0:
-            raise RuntimeError(
+            raise ConfigError(
                 f"Section must only define these keys: {allowed_keys}. extra keys"
-                + f" defined: {extra_keys}"
+                + f" defined: {extra_keys}",
+                definition_name,
+                _join(extra_keys),
+            )
+        # TOML can give us any type, and the checks below need lists
+        sizes = definition_body["sizes"]
+        if not isinstance(sizes, list) or not all(
+            isinstance(size, int) and not isinstance(size, bool) for size in sizes
+        ):
+            raise ConfigError(
+                f"sizes must be a list of whole numbers: {definition_name}",
+                definition_name,
+                "sizes",
+            )
+        children = definition_body["children"]
+        if not isinstance(children, list) or not all(
+            isinstance(child, str) for child in children
+        ):
+            raise ConfigError(
+                f"children must be a list of definition names: {definition_name}",
+                definition_name,
+                "children",
             )
         if sum(definition_body["sizes"]) != 100:
-            raise RuntimeError(f"Sum of sizes is not 100: {definition_name}")
+            raise ConfigError(
+                f"Sum of sizes is not 100: {definition_name}", definition_name, "sizes"
+            )
         for child in definition_body["children"]:
             if child not in self._layout_definitions:
-                raise RuntimeError(
-                    f"{child} is a child of {definition_name} but is not defined"
+                raise ConfigError(
+                    f"{child} is a child of {definition_name} but is not defined",
+                    definition_name,
+                    "children",
                 )
         if len(definition_body["children"]) < 2:
-            raise RuntimeError(f"{definition_name} has less than 2 children")
+            raise ConfigError(
+                f"{definition_name} has less than 2 children",
+                definition_name,
+                "children",
+            )
         if len(definition_body["children"]) != len(definition_body["sizes"]):
-            raise RuntimeError(
+            raise ConfigError(
                 "The number of children to not match the number of sizes in"
-                + f" {definition_name}"
+                + f" {definition_name}",
+                definition_name,
+                "sizes",
             )
 
     def get_tree(self) -> interfaces.TreeNodeInterface:
@@ -74,9 +178,13 @@ class ConfigParser(interfaces.ConfigParserInterface):
             subtree = subtree_dict.copy()
             child_subtrees = []
             for child in subtree["children"]:
-                child_definition = self._layout_definitions[child]
-                if "mark" not in child_definition:
-                    child_definition["mark"] = child
-                child_subtrees.append(self._construct_subtree(child_definition))
+                child_subtree = self._construct_subtree(self._layout_definitions[child])
+                # definitions can be shared between layouts, so only mark the copy
+                child_subtree.setdefault("mark", child)
+                child_subtrees.append(child_subtree)
             subtree["children"] = child_subtrees
             return subtree
+
+
+def _join(keys: Iterable[str]) -> str:
+    return ", ".join(sorted(keys))
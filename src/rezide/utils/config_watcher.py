@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+from typing import Callable, Optional, Set
+
+from rezide.utils import config_dir
+from rezide.utils import interfaces
+from rezide.utils import layout_cache
+
+# how often the watcher thread checks whether it's been asked to stop
+STOP_CHECK_INTERVAL = 0.5
+
+
+def log_error(layout_name: str, error: Exception) -> None:
+    logging.error(f"layout {layout_name} is invalid: {error}")
+
+
+class ConfigWatcher(object):
+    """Reloads layouts in the background as soon as their config files change, so
+    that mistakes are reported right away and opening a layout never has to wait for
+    it to be parsed
+    """
+
+    def __init__(
+        self,
+        config_directory: interfaces.ConfigDir,
+        filestore: interfaces.FileStore,
+        file_watcher: interfaces.FileWatcher,
+        layouts: layout_cache.LayoutCache,
+        on_error: Callable[[str, Exception], None] = log_error,
+    ) -> None:
+        self._config_dir = config_directory
+        self._filestore = filestore
+        self._file_watcher = file_watcher
+        self._layouts = layouts
+        self._on_error = on_error
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Watch the config dir and every layout dir inside of it from a background
+        thread
+        """
+        self._file_watcher.watch_directory(self._config_dir.path)
+        for name in self._filestore.list_directory_contents(self._config_dir.path):
+            layout_dir = os.path.join(self._config_dir.path, name)
+            if self._filestore.exists_as_dir(layout_dir):
+                self._file_watcher.watch_directory(layout_dir)
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._file_watcher.close()
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            changed_paths = self._file_watcher.wait_for_changes(STOP_CHECK_INTERVAL)
+            if changed_paths:
+                self.handle_changes(changed_paths)
+
+    def handle_changes(self, changed_paths: Set[str]) -> None:
+        """Reload each layout whose config file changed. Editors often touch a file
+        several times when saving it, so each layout is only reloaded once
+        """
+        changed_layouts = set()
+        for path in changed_paths:
+            relative_path = os.path.relpath(path, self._config_dir.path)
+            path_parts = relative_path.split(os.sep)
+            if len(path_parts) == 1 and relative_path != os.curdir:
+                # a layout dir was created, deleted, or renamed
+                if self._filestore.exists_as_dir(path):
+                    self._file_watcher.watch_directory(path)
+                changed_layouts.add(path_parts[0])
+            elif len(path_parts) == 2 and path_parts[1] == config_dir.CONFIG_FILE_NAME:
+                changed_layouts.add(path_parts[0])
+        for layout_name in sorted(changed_layouts):
+            self._reload(layout_name)
+
+    def _reload(self, layout_name: str) -> None:
+        """Reload a layout along with the loaded layouts that include it, so that
+        none of them have to be parsed when they're opened
+        """
+        config_file_path = os.path.join(
+            self._config_dir.path, layout_name, config_dir.CONFIG_FILE_NAME
+        )
+        dependents = self._layouts.invalidate(layout_name) - {layout_name}
+        if self._filestore.exists_as_file(config_file_path):
+            logging.info(f"reloading layout {layout_name}")
+            reloaded_names = [layout_name] + sorted(dependents)
+        else:
+            logging.info(f"layout {layout_name} was removed")
+            reloaded_names = sorted(dependents)
+        for name in reloaded_names:
+            try:
+                self._layouts.get(name)
+            except Exception as error:
+                self._on_error(name, error)
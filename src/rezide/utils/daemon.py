@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import shlex
+import socket
+import socketserver
+from typing import List, Optional
+
+from rezide.utils import geometry
+from rezide.utils import layout_cache
+from rezide.utils import templates
+
+# Requests and responses are single lines of text, so any client that can write to a
+# Unix socket can talk to the daemon. For example:
+#   echo "open rice" | nc -U "$XDG_RUNTIME_DIR/rezide.sock"
+#
+# requests:
+#   open <layout> [<name>=<value> ...]
+#                       spawn the windows of a layout, filling in its parameters.
+#                       Arguments are split like a shell would split them
+#   reload [<layout>]   forget one or all cached layouts so they get read again
+#   ping                check that the daemon is running
+#   sizes [<workspace>] get the size of each window in a workspace. Defaults to the
+#                       current workspace
+#   history <mark>      get every size that a marked window has had, oldest first
+#
+# responses:
+#   ok
+#   ok <json>           for sizes and history
+#   error <message>
+
+SOCKET_NAME = "rezide.sock"
+ENCODING = "utf-8"
+
+
+def default_socket_path() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    return os.path.join("/tmp", f"rezide-{os.getuid()}.sock")  # noqa: S108
+
+
+class Daemon(socketserver.UnixStreamServer):
+    """Serves requests from thin clients over a Unix socket.
+
+    Requests are handled one at a time since they all share the same window manager
+    connection, and a window manager can only build one layout at a time anyway.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        layouts: layout_cache.LayoutCache,
+        geometry_model: Optional[geometry.GeometryModel] = None,
+    ) -> None:
+        self._layouts = layouts
+        self._geometry = geometry_model
+        self._socket_path = socket_path
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+
+    def respond(self, request: str) -> str:
+        """Run a request and describe how it went"""
+        command, _, argument = request.strip().partition(" ")
+        logging.info(f"received request: {request.strip()}")
+        try:
+            if command == "open":
+                self._open(shlex.split(argument))
+            elif command == "reload":
+                if argument:
+                    self._layouts.invalidate(argument)
+                else:
+                    self._layouts.clear()
+            elif command in ("sizes", "history"):
+                return f"ok {self._query_geometry(command, argument)}"
+            elif command != "ping":
+                raise RuntimeError(f"unknown request: {command}")
+        except Exception as error:
+            logging.exception(f"failed to handle request: {request.strip()}")
+            return f"error {error}"
+        return "ok"
+
+    def _open(self, arguments: List[str]) -> None:
+        if not arguments:
+            raise RuntimeError("open needs the name of a layout")
+        layout_name, *param_pairs = arguments
+        params = templates.parse_params(param_pairs)
+        self._layouts.get(layout_name).spawn_windows(params)
+
+    def _query_geometry(self, command: str, argument: str) -> str:
+        """Answer a question about window sizes from memory"""
+        if self._geometry is None:
+            raise RuntimeError("this daemon isn't keeping track of window sizes")
+        if command == "sizes":
+            windows = self._geometry.window_sizes(argument or None)
+            return json.dumps([window._asdict() for window in windows])
+        return json.dumps(
+            [resize._asdict() for resize in self._geometry.history(argument)]
+        )
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: Daemon
+
+    def handle(self) -> None:
+        request = self.rfile.readline().decode(ENCODING)
+        response = self.server.respond(request)
+        self.wfile.write(f"{response}\n".encode(ENCODING))
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Clean up the socket of a daemon that didn't shut down properly, but refuse to
+    start if there's a daemon that's still running
+    """
+    if not os.path.exists(socket_path):
+        return
+    try:
+        send_request(socket_path, "ping")
+    except OSError:
+        logging.info(f"removing stale socket {socket_path}")
+        os.unlink(socket_path)
+    else:
+        raise RuntimeError(f"A rezide daemon is already listening on {socket_path}")
+
+
+def send_request(socket_path: str, request: str) -> str:
+    """Send a request to the daemon and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(f"{request}\n".encode(ENCODING))
+        with connection.makefile("rb") as response:
+            return response.readline().decode(ENCODING).strip()
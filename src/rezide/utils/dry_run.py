@@ -0,0 +1,242 @@
+import collections
+import json
+from typing import Dict, Iterable, List, Optional
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+from rezide.utils import sway_commands
+
+# `rzd open --dry-run` builds a layout against a window manager that only writes down
+# the commands that sway would have been sent. Nothing opens, so each operation is
+# priced with a latency model to estimate how long the real thing would take.
+
+# roughly what sway needs on a typical desktop. Spawning is dominated by the client
+# itself, and splitting waits for sway to settle before marking the new parent
+DEFAULT_LATENCY = dtos.LatencyModel(spawn=0.5, split=0.25, focus=0.002, resize=0.002)
+
+# maps from the spans in `rzd --trace` files to the operations that they measure
+TRACE_OPERATIONS = {
+    "make_window": "spawn",
+    "split_and_mark_parent": "split",
+    "focus": "focus",
+    "resize_width": "resize",
+    "resize_height": "resize",
+}
+
+
+class RecordingWindowManager(interfaces.TilingWindowManager):
+    """Pretends to be an empty workspace and records the commands that sway would be
+    sent to build a layout in it. Container ids are made up, but they're handed out
+    the same way sway would hand them out
+    """
+
+    def __init__(self) -> None:
+        self.commands: List[dtos.RecordedCommand] = []
+        self.operation_counts: Dict[str, int] = collections.Counter()
+        self._con_ids: Dict[str, int] = dict()
+        self._next_con_id = 1
+        self._focused_con_id: Optional[int] = None
+        # maps from marks to the hidden windows of clients that started early
+        self._prelaunched: Dict[str, int] = dict()
+
+    def make_window(self, window_details: dtos.WindowDetails) -> None:
+        if window_details.mark in self._prelaunched:
+            # the client started at the beginning, so it only has to be put in place
+            con_id = self._prelaunched.pop(window_details.mark)
+            self._record("adopt", sway_commands.hide(con_id))
+            self.adopt_window(con_id, window_details)
+            return
+        self._count("spawn")
+        self._record("spawn", sway_commands.exec_(window_details.command))
+        self._focused_con_id = self._new_con_id()
+        self._mark("spawn", self._focused_con_id, window_details.mark)
+
+    def resize_width(
+        self, target_window: dtos.WindowDetails, section_percentage: int
+    ) -> None:
+        self._resize(target_window, "width", section_percentage)
+
+    def resize_height(
+        self, target_window: dtos.WindowDetails, section_percentage: int
+    ) -> None:
+        self._resize(target_window, "height", section_percentage)
+
+    def _resize(
+        self, target_window: dtos.WindowDetails, dimension: str, section_percentage: int
+    ) -> None:
+        self._count("resize")
+        con_id = self._get_con_id(target_window.mark)
+        self._record(
+            "resize", sway_commands.resize(con_id, dimension, section_percentage)
+        )
+
+    def focus(self, target_window: dtos.WindowDetails) -> None:
+        self._count("focus")
+        con_id = self._get_con_id(target_window.mark)
+        self._record("focus", sway_commands.focus(con_id))
+        self._focused_con_id = con_id
+
+    def split_and_mark_parent(self, split_type: str, mark: str) -> None:
+        if split_type not in ("vertical", "horizontal"):
+            raise RuntimeError(f"invalid split type: {split_type}")
+        if self._focused_con_id is None:
+            raise RuntimeError("There is no focused window")
+        self._count("split")
+        self._record("split", sway_commands.split(self._focused_con_id, split_type))
+        self._mark("split", self._new_con_id(), mark)
+
+    @property
+    def num_workspace_windows(self) -> int:
+        return 0
+
+    def get_tree(self, workspace_name: Optional[str] = None) -> List:
+        return []
+
+    def get_windows(self, workspace_name: Optional[str] = None) -> List:
+        return []
+
+    def get_window_sizes(self, workspace_name: Optional[str] = None) -> Dict:
+        return dict()
+
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        raise RuntimeError("Dry runs don't know how big windows are")
+
+    def wait_for_tree_change(self) -> None:
+        raise RuntimeError("Nothing changes during a dry run")
+
+    def get_workspace_snapshot(self) -> dtos.ContainerSnapshot:
+        raise RuntimeError("Dry runs don't know how big windows are")
+
+    def switch_workspace(self, workspace_name: str) -> None:
+        self._record("workspace", sway_commands.workspace(workspace_name))
+
+    def focus_output(self, output_name: str) -> None:
+        self._record("workspace", sway_commands.focus_output(output_name))
+
+    def spawn_hidden(self, command: str) -> int:
+        self._record("hidden", sway_commands.exec_(command))
+        return self._new_con_id()
+
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        self._count("spawn")
+        self._record(
+            "prelaunch",
+            sway_commands.exec_on_workspace(
+                sway_commands.prelaunch_workspace(window_details.mark),
+                window_details.command,
+            ),
+        )
+        self._prelaunched[window_details.mark] = self._new_con_id()
+
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        # windows come out of the pool at the speed of IPC, so they aren't priced
+        self._record("adopt", sway_commands.show_hidden(con_id))
+        self._record("adopt", sway_commands.tile(con_id))
+        self._focused_con_id = con_id
+        self._mark("adopt", con_id, window_details.mark)
+
+    def get_con_ids(self, marks: Iterable[str]) -> Dict[str, int]:
+        return {mark: self._con_ids[mark] for mark in marks if mark in self._con_ids}
+
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        self._record_all("hide", map(sway_commands.hide, con_ids))
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        self._record_all("close", map(sway_commands.kill, con_ids))
+
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        return dict()
+
+    def _mark(self, operation: str, con_id: int, mark: str) -> None:
+        self._record(operation, sway_commands.mark(con_id, mark))
+        self._con_ids[mark] = con_id
+
+    def _get_con_id(self, mark: str) -> int:
+        if mark not in self._con_ids:
+            raise RuntimeError(f"No window is marked {mark}")
+        return self._con_ids[mark]
+
+    def _new_con_id(self) -> int:
+        con_id = self._next_con_id
+        self._next_con_id += 1
+        return con_id
+
+    def _record(self, operation: str, command: str) -> None:
+        self.commands.append(dtos.RecordedCommand(operation, command))
+
+    def _record_all(self, operation: str, commands: Iterable[str]) -> None:
+        """Record commands that are sent in one round trip"""
+        command = sway_commands.chain(commands)
+        if command:
+            self._record(operation, command)
+
+    def _count(self, operation: str) -> None:
+        self.operation_counts[operation] += 1
+
+
+def parse_latency(
+    pairs: Iterable[str], base: dtos.LatencyModel = DEFAULT_LATENCY
+) -> dtos.LatencyModel:
+    """Override parts of a latency model with strings like `spawn=1.5`"""
+    overrides: Dict[str, float] = dict()
+    for pair in pairs:
+        operation, separator, seconds = pair.partition("=")
+        if not separator or operation not in dtos.LatencyModel._fields:
+            raise RuntimeError(
+                "Latencies must look like operation=seconds, where the operation is"
+                + f" one of {', '.join(dtos.LatencyModel._fields)}: {pair}"
+            )
+        try:
+            overrides[operation] = float(seconds)
+        except ValueError:
+            raise RuntimeError(
+                f"Latencies must be a number of seconds: {pair}"
+            ) from None
+        if overrides[operation] < 0:
+            raise RuntimeError(f"Latencies can't be negative: {pair}")
+    return base._replace(**overrides)
+
+
+def latency_from_trace(
+    trace_json: str, base: dtos.LatencyModel = DEFAULT_LATENCY
+) -> dtos.LatencyModel:
+    """Measure each operation's latency from a `rzd --trace` file. Operations that
+    the trace never ran keep their latency from the base model
+    """
+    try:
+        events = json.loads(trace_json)["traceEvents"]
+    except (ValueError, KeyError, TypeError):
+        raise RuntimeError("The trace isn't a trace written by rzd --trace") from None
+    durations: Dict[str, List[float]] = collections.defaultdict(list)
+    for event in events:
+        operation = TRACE_OPERATIONS.get(event.get("name"))
+        if operation is not None and "dur" in event:
+            # trace durations are in microseconds
+            durations[operation].append(event["dur"] / 1_000_000)
+    return base._replace(
+        **{
+            operation: sum(seconds) / len(seconds)
+            for operation, seconds in durations.items()
+        }
+    )
+
+
+def estimate(
+    operation_counts: Dict[str, int], latency_model: dtos.LatencyModel
+) -> float:
+    """Estimate how long, in seconds, the operations would take"""
+    return sum(
+        count * getattr(latency_model, operation)
+        for operation, count in operation_counts.items()
+    )
+
+
+def describe_estimate(
+    operation_counts: Dict[str, int], latency_model: dtos.LatencyModel
+) -> str:
+    counts = ", ".join(
+        f"{operation_counts.get(operation, 0)} {operation}"
+        for operation in dtos.LatencyModel._fields
+    )
+    seconds = estimate(operation_counts, latency_model)
+    return f"estimated {seconds:.2f}s: {counts}"
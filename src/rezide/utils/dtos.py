@@ -1,4 +1,4 @@
-from typing import Any, NamedTuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 # data-transfer objects (DTOs)
 # objects that don't have much functionality besides storing
@@ -20,6 +20,15 @@ class Window(NamedTuple):
 class WindowDetails(NamedTuple):
     mark: str
     command: str
+    # readiness probes. The launcher waits for these before opening the next window
+    ready_title: Optional[str] = None
+    ready_socket: Optional[str] = None
+    ready_timeout: Optional[float] = None
+    # runs in one of the warm pool's terminals instead of starting a new client
+    terminal_command: Optional[str] = None
+    # `rzd switch` moves windows with the same reuse key between layouts. Windows
+    # without one are matched by their command
+    reuse: Optional[str] = None
 
 
 # todo: remove tiles now that we don't use them anymore
@@ -44,8 +53,212 @@ class Env(NamedTuple):
     xdg_config_home: str
 
 
+class WorkspaceLayout(NamedTuple):
+    """A layout that a session opens on a workspace"""
+
+    workspace: str
+    layout: str
+    output: Optional[str] = None
+    # fills in the layout's placeholders
+    params: Optional[Dict[str, str]] = None
+
+
+class ContainerSnapshot(NamedTuple):
+    """A container in the window manager's tree, along with everything inside of it.
+    Windows have no split and no children
+    """
+
+    split: Optional[str]
+    width: float
+    height: float
+    marks: Tuple[str, ...] = ()
+    pid: Optional[int] = None
+    app_name: Optional[str] = None
+    children: Tuple["ContainerSnapshot", ...] = ()
+
+
+class WindowGeometry(NamedTuple):
+    """The size of a window that's open on a workspace"""
+
+    id: int
+    workspace: str
+    marks: Tuple[str, ...]
+    width: int
+    height: int
+
+
+class GeometrySnapshot(NamedTuple):
+    """The sizes of every window on every workspace at one point in time"""
+
+    focused_workspace: str
+    windows: List[WindowGeometry]
+
+
+class Resize(NamedTuple):
+    """A size that a window had starting at `time`"""
+
+    time: float
+    width: int
+    height: int
+
+
+class ConfigProblem(NamedTuple):
+    """Where `rzd check` found a problem. table and key are None when the problem
+    isn't in a particular table or key
+    """
+
+    path: str
+    table: Optional[str]
+    key: Optional[str]
+    message: str
+
+
+class LayoutCheck(NamedTuple):
+    """The problems with a layout, and the hashes of the files that were read to find
+    them
+    """
+
+    layout: str
+    problems: List[ConfigProblem]
+    file_hashes: Dict[str, str]
+
+
 class WindowManagerCall(NamedTuple):
     """Used for verifying calls to a window manager"""
 
     command: str
     arg: Any
+
+
+class LatencyModel(NamedTuple):
+    """How long (in seconds) the window manager takes to finish each operation"""
+
+    spawn: float
+    split: float
+    focus: float
+    resize: float
+
+
+class RecordedCommand(NamedTuple):
+    """A command that a dry run would have sent, and the operation that sent it"""
+
+    operation: str
+    command: str
+
+
+class PooledClient(NamedTuple):
+    """A warm terminal waiting in the scratchpad for a command to come down its pipe"""
+
+    con_id: int
+    fifo_path: str
+
+
+class TransitionPlan(NamedTuple):
+    """How `rzd switch` gets from one layout to another"""
+
+    # maps from marks in the new layout to the marks of the windows that they reuse
+    reused: Dict[str, str]
+    # marks of the old layout's windows that nothing reuses
+    dropped: List[str]
+
+
+class TeardownReport(NamedTuple):
+    """What happened to each window when `rzd close` closed a layout"""
+
+    closed: List[str]
+    # windows that were still open when we stopped waiting
+    survivors: List[str]
+    # windows that weren't open in the first place
+    missing: List[str]
+
+
+class Rect(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class SwayNode(NamedTuple):
+    """A container from sway's GET_TREE reply, with only the fields that rezide reads.
+    Unlike i3ipc's containers, nodes don't link back to their parents
+    """
+
+    id: int
+    type: str
+    name: Optional[str]
+    marks: Tuple[str, ...]
+    focused: bool
+    layout: Optional[str]
+    pid: Optional[int]
+    app_id: Optional[str]
+    window_class: Optional[str]
+    rect: Rect
+    window_rect: Rect
+    nodes: Tuple["SwayNode", ...]
+    floating_nodes: Tuple["SwayNode", ...]
+
+
+class CommandReply(NamedTuple):
+    success: bool
+    error: Optional[str] = None
+
+
+class RunStep(NamedTuple):
+    """One step of an `rzd open` run, as it's kept in the run history"""
+
+    step: str
+    mark: Optional[str]
+    duration: float
+    outcome: str
+    # the command that opened the window, for steps that open windows
+    command: Optional[str] = None
+
+
+class DurationSummary(NamedTuple):
+    samples: int
+    p50: float
+    p90: float
+    p99: float
+
+
+class Regression(NamedTuple):
+    """A layout whose recent runs are slower than the runs before them"""
+
+    layout: str
+    recent_median: float
+    baseline_median: float
+
+
+class ClientTiming(NamedTuple):
+    """How long a window usually takes to open"""
+
+    mark: str
+    median: float
+    runs: int
+
+
+class HistoryReport(NamedTuple):
+    """What `rzd stats` prints"""
+
+    runs: DurationSummary
+    failed_runs: int
+    steps: Dict[str, DurationSummary]
+    regressions: List[Regression]
+    slowest_clients: List[ClientTiming]
+
+
+class LayoutSpec(NamedTuple):
+    """The shape of a synthetic layout from `rezide.testing`"""
+
+    # sections between the root and the deepest windows, counting the root
+    depth: int = 2
+    # children per section, or the most children a section can have in random layouts
+    fan_out: int = 2
+    # balanced, chain, star, or random
+    shape: str = "balanced"
+    # even, random, or skewed
+    sizes: str = "even"
+    # pad window commands out to this many characters
+    command_length: int = 0
+    seed: int = 0
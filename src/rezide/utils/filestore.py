@@ -1,4 +1,5 @@
 import os
+import stat
 from typing import Set
 
 from rezide.utils import interfaces
@@ -12,6 +13,13 @@ class LocalFilestore(interfaces.FileStore):
         with open(path, "r") as infile:
             return infile.read()
 
+    def write_file(self, path: str, contents: str) -> None:
+        parent_dir = os.path.dirname(path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        with open(path, "w") as outfile:
+            outfile.write(contents)
+
     def exists_as_dir(self, path: str) -> bool:
         return self.path_exists(path) and os.path.isdir(path)
 
@@ -22,3 +30,32 @@ class LocalFilestore(interfaces.FileStore):
         if self.exists_as_dir(path):
             return set(os.listdir(path))
         raise RuntimeError(f"{path} is not a valid directory")
+
+    def make_fifo(self, path: str) -> None:
+        make_private_dir(os.path.dirname(path))
+        if os.path.lexists(path):
+            os.remove(path)
+        os.mkfifo(path, 0o600)
+
+    def write_fifo(self, path: str, contents: str) -> None:
+        try:
+            # opening a pipe with nobody reading from it fails instead of waiting
+            fifo_fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as error:
+            raise RuntimeError(f"Nothing is reading from {path}") from error
+        with os.fdopen(fifo_fd, "w") as fifo:
+            fifo.write(contents)
+
+
+def make_private_dir(path: str) -> None:
+    """Make a dir that only we can use. A dir that someone else made first, or that
+    others can get into, could have its contents swapped out, so it isn't used
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    dir_stat = os.lstat(path)
+    if not stat.S_ISDIR(dir_stat.st_mode):
+        raise RuntimeError(f"{path} is not a directory")
+    if dir_stat.st_uid != os.getuid():
+        raise RuntimeError(f"{path} belongs to another user")
+    if dir_stat.st_mode & 0o077:
+        raise RuntimeError(f"{path} can be used by other users")
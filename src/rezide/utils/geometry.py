@@ -0,0 +1,113 @@
+import collections
+import logging
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+
+# how many resizes we remember for each window
+HISTORY_LENGTH = 100
+
+
+class GeometryModel(object):
+    """Remembers the size of every window so that questions about sizes can be
+    answered without asking the window manager. Updates and queries can come from
+    different threads
+    """
+
+    def __init__(
+        self,
+        history_length: int = HISTORY_LENGTH,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._history_length = history_length
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot = dtos.GeometrySnapshot(focused_workspace="", windows=[])
+        self._windows_by_mark: Dict[str, dtos.WindowGeometry] = dict()
+        self._histories: Dict[int, Deque[dtos.Resize]] = dict()
+
+    def update(self, snapshot: dtos.GeometrySnapshot) -> None:
+        """Replace what we know with a new snapshot. Windows that changed size get a
+        new entry in their history, and windows that closed are forgotten
+        """
+        now = self._clock()
+        windows_by_mark = dict()
+        histories = dict()
+        for window in snapshot.windows:
+            history = self._histories.get(window.id)
+            if history is None:
+                history = collections.deque(maxlen=self._history_length)
+            if not history or (history[-1].width, history[-1].height) != (
+                window.width,
+                window.height,
+            ):
+                history.append(dtos.Resize(now, window.width, window.height))
+            histories[window.id] = history
+            for mark in window.marks:
+                windows_by_mark[mark] = window
+        with self._lock:
+            self._snapshot = snapshot
+            self._windows_by_mark = windows_by_mark
+            self._histories = histories
+
+    def window_sizes(
+        self, workspace_name: Optional[str] = None
+    ) -> List[dtos.WindowGeometry]:
+        """Get every window in a workspace, or in the current workspace if no name is
+        given
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        if workspace_name is None:
+            workspace_name = snapshot.focused_workspace
+        return [
+            window for window in snapshot.windows if window.workspace == workspace_name
+        ]
+
+    def history(self, mark: str) -> List[dtos.Resize]:
+        """Get the sizes that a marked window has had, oldest first"""
+        with self._lock:
+            window = self._windows_by_mark.get(mark)
+            if window is None:
+                raise RuntimeError(f"There is no window with the mark {mark}")
+            return list(self._histories[window.id])
+
+
+class GeometryMonitor(object):
+    """Keeps a geometry model up to date by listening for window and workspace events
+    in the background. The window manager's tree is only fetched when something
+    changes
+    """
+
+    def __init__(
+        self,
+        window_manager: interfaces.TilingWindowManager,
+        model: GeometryModel,
+    ) -> None:
+        self._window_manager = window_manager
+        self._model = model
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._model.update(self._window_manager.get_window_geometries())
+        # waiting for events can't be interrupted, so this thread can't hold up exit
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop updating the model after the next change"""
+        self._stopped.set()
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            self._window_manager.wait_for_tree_change()
+            if self._stopped.is_set():
+                return
+            try:
+                self._model.update(self._window_manager.get_window_geometries())
+            except Exception:
+                logging.exception("failed to update window sizes")
@@ -0,0 +1,264 @@
+import collections
+import logging
+import os
+import sqlite3
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from rezide.utils import dtos
+
+# Every `rzd open` adds a run to a SQLite database along with each step that the
+# tracer timed. All of a run's rows are written in one transaction after its windows
+# are open, so keeping the history doesn't slow layouts down. `rzd stats` reads it back.
+
+HISTORY_FILE_NAME = "history.sqlite3"
+# a layout has regressed when the median of its last few runs is this much slower
+# than the median of the runs before them
+RECENT_RUNS = 5
+REGRESSION_THRESHOLD = 1.25
+SLOWEST_CLIENTS = 5
+# the step that starts a client and waits for its window
+CLIENT_STEP = "make_window"
+
+# each migration upgrades the database from the version before it. The first one only
+# creates tables that aren't there yet, so it's safe to run on any database
+MIGRATIONS = [
+    """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    layout TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    step TEXT NOT NULL,
+    mark TEXT,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_layout ON runs (layout);
+CREATE INDEX IF NOT EXISTS steps_by_run ON steps (run_id);
+""",
+    "ALTER TABLE steps ADD COLUMN command TEXT;",
+]
+
+
+def default_history_path() -> str:
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".local", "state"
+    )
+    return os.path.join(state_home, "rezide", HISTORY_FILE_NAME)
+
+
+def steps_from_trace(events: Iterable[Dict[str, Any]]) -> List[dtos.RunStep]:
+    return [
+        dtos.RunStep(
+            step=event["name"],
+            mark=event["args"].get("mark"),
+            duration=event["dur"] / 1_000_000,
+            outcome="error" if "error" in event["args"] else "ok",
+            command=event["args"].get("command"),
+        )
+        for event in events
+    ]
+
+
+def trace_duration(events: List[Dict[str, Any]]) -> float:
+    """Get the time from the start of the first span to the end of the last one"""
+    if not events:
+        return 0.0
+    start = min(event["ts"] for event in events)
+    end = max(event["ts"] + event["dur"] for event in events)
+    return (end - start) / 1_000_000
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Interpolate between the two closest values, like numpy does by default"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (
+        position - lower
+    )
+
+
+def summarize(durations: Iterable[float]) -> dtos.DurationSummary:
+    sorted_durations = sorted(durations)
+    if not sorted_durations:
+        return dtos.DurationSummary(0, 0.0, 0.0, 0.0)
+    return dtos.DurationSummary(
+        len(sorted_durations),
+        percentile(sorted_durations, 0.5),
+        percentile(sorted_durations, 0.9),
+        percentile(sorted_durations, 0.99),
+    )
+
+
+def find_regression(layout: str, durations: List[float]) -> Optional[dtos.Regression]:
+    """Compare a layout's most recent runs with the runs before them. Durations go
+    from oldest to newest
+    """
+    if len(durations) < 2 * RECENT_RUNS:
+        return None
+    recent_median = statistics.median(durations[-RECENT_RUNS:])
+    baseline_median = statistics.median(durations[:-RECENT_RUNS])
+    if recent_median <= baseline_median * REGRESSION_THRESHOLD:
+        return None
+    return dtos.Regression(layout, recent_median, baseline_median)
+
+
+class RunHistory(object):
+    def __init__(self, path: str, clock: Callable[[], float] = time.time) -> None:
+        self._path = path
+        self._clock = clock
+
+    def record(self, layout: str, outcome: str, events: List[Dict[str, Any]]) -> None:
+        """Save a run and every step that the tracer timed in one transaction. The
+        history is only for statistics, so failing to save it is just logged
+        """
+        try:
+            connection = self._connect()
+        except (sqlite3.Error, OSError) as error:
+            logging.warning(f"couldn't save this run to the history: {error}")
+            return
+        duration = trace_duration(events)
+        try:
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO runs (layout, started_at, duration, outcome)"
+                    + " VALUES (?, ?, ?, ?)",
+                    (layout, self._clock() - duration, duration, outcome),
+                )
+                connection.executemany(
+                    "INSERT INTO steps (run_id, step, mark, duration, outcome, command)"
+                    + " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(cursor.lastrowid, *step) for step in steps_from_trace(events)],
+                )
+        except sqlite3.Error as error:
+            logging.warning(f"couldn't save this run to the history: {error}")
+        finally:
+            connection.close()
+
+    def report(self, layout: Optional[str] = None) -> dtos.HistoryReport:
+        """Summarize every run, or only the runs of one layout"""
+        if not os.path.exists(self._path):
+            return dtos.HistoryReport(summarize([]), 0, dict(), [], [])
+        connection = self._connect()
+        try:
+            # filtering on NULL matches every layout
+            layout_filter = "(:layout IS NULL OR runs.layout = :layout)"
+            runs = connection.execute(
+                "SELECT layout, duration, outcome FROM runs"
+                + f" WHERE {layout_filter} ORDER BY id",
+                {"layout": layout},
+            ).fetchall()
+            steps = connection.execute(
+                "SELECT steps.step, steps.mark, steps.duration FROM steps"
+                + " JOIN runs ON runs.id = steps.run_id"
+                + f" WHERE {layout_filter} AND steps.outcome = 'ok'",
+                {"layout": layout},
+            ).fetchall()
+        finally:
+            connection.close()
+        layout_durations: Dict[str, List[float]] = collections.defaultdict(list)
+        for run_layout, duration, outcome in runs:
+            if outcome == "ok":
+                layout_durations[run_layout].append(duration)
+        step_durations: Dict[str, List[float]] = collections.defaultdict(list)
+        client_durations: Dict[str, List[float]] = collections.defaultdict(list)
+        for step, mark, duration in steps:
+            step_durations[step].append(duration)
+            if step == CLIENT_STEP and mark is not None:
+                client_durations[mark].append(duration)
+        regressions = [
+            find_regression(run_layout, durations)
+            for run_layout, durations in sorted(layout_durations.items())
+        ]
+        clients = [
+            dtos.ClientTiming(mark, statistics.median(durations), len(durations))
+            for mark, durations in client_durations.items()
+        ]
+        clients.sort(key=lambda client: client.median, reverse=True)
+        return dtos.HistoryReport(
+            runs=summarize(
+                duration
+                for durations in layout_durations.values()
+                for duration in durations
+            ),
+            failed_runs=sum(1 for _, _, outcome in runs if outcome != "ok"),
+            steps={
+                step: summarize(durations) for step, durations in step_durations.items()
+            },
+            regressions=[regression for regression in regressions if regression],
+            slowest_clients=clients[:SLOWEST_CLIENTS],
+        )
+
+    def startup_times(self) -> Dict[str, float]:
+        """Get the median time that each command has taken to open its window"""
+        if not os.path.exists(self._path):
+            return dict()
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT command, duration FROM steps"
+                + " WHERE step = ? AND outcome = 'ok' AND command IS NOT NULL",
+                (CLIENT_STEP,),
+            ).fetchall()
+        finally:
+            connection.close()
+        durations: Dict[str, List[float]] = collections.defaultdict(list)
+        for command, duration in rows:
+            durations[command].append(duration)
+        return {
+            command: statistics.median(command_durations)
+            for command, command_durations in durations.items()
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self._path)
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            connection.executescript(migration)
+            connection.execute(f"PRAGMA user_version = {number}")
+        return connection
+
+
+def describe_report(report: dtos.HistoryReport) -> List[str]:
+    total_runs = report.runs.samples + report.failed_runs
+    if total_runs == 0:
+        return ["no runs recorded yet"]
+    lines = [
+        f"{total_runs} runs ({report.failed_runs} failed): {_describe(report.runs)}"
+    ]
+    if report.steps:
+        lines.append("steps:")
+        width = max(len(step) for step in report.steps)
+        for step, summary in sorted(
+            report.steps.items(), key=lambda item: item[1].p50, reverse=True
+        ):
+            lines.append(f"  {step:<{width}}  {_describe(summary)} ({summary.samples})")
+    if report.regressions:
+        lines.append("regressions:")
+        for regression in report.regressions:
+            lines.append(
+                f"  {regression.layout}: the last {RECENT_RUNS} runs took"
+                + f" {regression.recent_median:.2f}s, up from"
+                + f" {regression.baseline_median:.2f}s"
+            )
+    if report.slowest_clients:
+        lines.append("slowest clients:")
+        for client in report.slowest_clients:
+            lines.append(
+                f"  {client.mark}: {client.median:.2f}s over {client.runs} runs"
+            )
+    return lines
+
+
+def _describe(summary: dtos.DurationSummary) -> str:
+    return f"p50 {summary.p50:.2f}s, p90 {summary.p90:.2f}s, p99 {summary.p99:.2f}s"
@@ -0,0 +1,227 @@
+import collections
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from rezide.utils import config_parser
+from rezide.utils import interfaces
+
+# Layouts can reuse definitions from the other layouts in the config dir:
+#
+#   # every definition in common/config.toml except its root
+#   include = ["common"]
+#
+#   # one definition from another layout, along with everything inside of it
+#   [tests]
+#   use = "common:test-runner"
+#
+# Both bring in definitions under their own names, so they become children and
+# marks like any other definition. A name can only be defined twice if both
+# definitions are exactly the same.
+
+INCLUDE_KEY = "include"
+USE_KEY = "use"
+REFERENCE_SEPARATOR = ":"
+ROOT_NAME = "root"
+
+
+class ModuleCache(object):
+    """Reads each layout file at most once, no matter how many layouts include it,
+    and remembers which layouts include which so that changes can be passed along
+    """
+
+    def __init__(
+        self,
+        config_directory: interfaces.ConfigDir,
+        config_reader: interfaces.ConfigReader,
+    ) -> None:
+        self._config_dir = config_directory
+        self._config_reader = config_reader
+        self._modules: Dict[str, Dict] = dict()
+        # maps from each layout to the layouts that it includes
+        self._dependencies: Dict[str, Set[str]] = dict()
+        # maps from each layout's definitions to the layouts that they're written in
+        self._origins: Dict[str, Dict[str, str]] = dict()
+        # layouts can be loaded from several threads at once
+        self._lock = threading.Lock()
+
+    def get(self, layout_name: str) -> Dict:
+        """Get a layout's definitions with its includes filled in. The result is
+        shared, so don't change it
+        """
+        with self._lock:
+            return self._load(layout_name, ())
+
+    def _load(self, layout_name: str, including: Tuple[str, ...]) -> Dict:
+        if layout_name in including:
+            cycle = " -> ".join(including + (layout_name,))
+            raise config_parser.ConfigError(
+                f"Layouts can't include themselves: {cycle}", key=INCLUDE_KEY
+            )
+        if layout_name not in self._modules:
+            logging.info(f"reading layout {layout_name}")
+            config_file_path = self._config_dir.get_layout_file_path(layout_name)
+            dependencies: Set[str] = set()
+
+            def load_module(module_name: str) -> Dict:
+                dependencies.add(module_name)
+                return self._load(module_name, including + (layout_name,))
+
+            config_dict = self._config_reader.read(config_file_path)
+            try:
+                self._modules[layout_name] = resolve(config_dict, load_module)
+            except config_parser.ConfigError as error:
+                if error.path is None:
+                    error.path = config_file_path
+                raise
+            self._dependencies[layout_name] = dependencies
+            self._origins[layout_name] = trace_origins(
+                layout_name, config_dict, self._modules, self._origins
+            )
+        return self._modules[layout_name]
+
+    def origin(self, layout_name: str, definition_name: str) -> str:
+        """Get the layout whose file one of a loaded layout's definitions is written
+        in
+        """
+        with self._lock:
+            return self._origins.get(layout_name, dict()).get(
+                definition_name, layout_name
+            )
+
+    def invalidate(self, layout_name: str) -> Set[str]:
+        """Forget a layout and every layout that includes it, directly or not.
+        Returns the names of the layouts that were forgotten
+        """
+        with self._lock:
+            forgotten = {layout_name}
+            name_queue = collections.deque([layout_name])
+            while name_queue:
+                name = name_queue.popleft()
+                self._modules.pop(name, None)
+                self._dependencies.pop(name, None)
+                self._origins.pop(name, None)
+                for dependent, dependencies in list(self._dependencies.items()):
+                    if name in dependencies and dependent not in forgotten:
+                        forgotten.add(dependent)
+                        name_queue.append(dependent)
+            return forgotten
+
+    def clear(self) -> None:
+        with self._lock:
+            self._modules.clear()
+            self._dependencies.clear()
+            self._origins.clear()
+
+    def __contains__(self, layout_name: object) -> bool:
+        return layout_name in self._modules
+
+
+def resolve(config_dict: Dict, load_module: Callable[[str], Dict]) -> Dict:
+    """Fill in a layout's include and use directives"""
+    definitions: Dict[str, Dict] = dict()
+    module_names = config_dict.get(INCLUDE_KEY, [])
+    if not isinstance(module_names, list) or not all(
+        isinstance(name, str) for name in module_names
+    ):
+        raise config_parser.ConfigError(
+            f"{INCLUDE_KEY} must be a list of layout names", key=INCLUDE_KEY
+        )
+    for module_name in module_names:
+        for name, body in load_module(module_name).items():
+            if name != ROOT_NAME:
+                _define(definitions, name, body, module_name)
+    for name, body in config_dict.items():
+        if name == INCLUDE_KEY:
+            continue
+        if isinstance(body, dict) and USE_KEY in body:
+            for used_name, used_body in _use(name, body, load_module):
+                _define(definitions, used_name, used_body, body[USE_KEY])
+        else:
+            _define(definitions, name, body, "this layout")
+    return definitions
+
+
+def trace_origins(
+    layout_name: str,
+    config_dict: Dict,
+    modules: Dict[str, Dict],
+    origins: Dict[str, Dict[str, str]],
+) -> Dict[str, str]:
+    """Find the layout that each of a layout's definitions is written in. The layouts
+    that it includes and uses have to be resolved already
+    """
+    traced: Dict[str, str] = dict()
+    for module_name in config_dict.get(INCLUDE_KEY, []):
+        for name in modules[module_name]:
+            if name != ROOT_NAME:
+                traced[name] = origins[module_name][name]
+    for name, body in config_dict.items():
+        if name == INCLUDE_KEY:
+            continue
+        if isinstance(body, dict) and USE_KEY in body:
+            module_name, _, definition_name = body[USE_KEY].partition(
+                REFERENCE_SEPARATOR
+            )
+            for used_name, _ in _use(name, body, modules.__getitem__):
+                original_name = definition_name if used_name == name else used_name
+                traced[used_name] = origins[module_name][original_name]
+        else:
+            traced[name] = layout_name
+    return traced
+
+
+def _use(
+    name: str, body: Dict, load_module: Callable[[str], Dict]
+) -> List[Tuple[str, Dict]]:
+    """Get a definition from another layout under a new name, along with all of its
+    descendants under their own names
+    """
+    if set(body.keys()) != {USE_KEY}:
+        raise config_parser.ConfigError(
+            f"{name} must only define {USE_KEY}", name, USE_KEY
+        )
+    if not isinstance(body[USE_KEY], str):
+        separator = ""
+    else:
+        module_name, separator, definition_name = body[USE_KEY].partition(
+            REFERENCE_SEPARATOR
+        )
+    if not separator:
+        raise config_parser.ConfigError(
+            f"{USE_KEY} must look like <layout>{REFERENCE_SEPARATOR}<definition>"
+            + f" in {name}",
+            name,
+            USE_KEY,
+        )
+    module = load_module(module_name)
+    if definition_name not in module:
+        raise config_parser.ConfigError(
+            f"{module_name} doesn't define {definition_name}", name, USE_KEY
+        )
+    used = [(name, module[definition_name])]
+    name_queue = collections.deque(_children(module[definition_name]))
+    while name_queue:
+        child_name = name_queue.popleft()
+        if isinstance(module.get(child_name), dict):
+            used.append((child_name, module[child_name]))
+            name_queue.extend(_children(module[child_name]))
+    return used
+
+
+def _children(body: Any) -> List[str]:
+    """Get a definition's children. Malformed definitions have none here, and the
+    parser reports them once they've been brought in
+    """
+    children = body.get("children") if isinstance(body, dict) else None
+    if not isinstance(children, list):
+        return []
+    return [child for child in children if isinstance(child, str)]
+
+
+def _define(definitions: Dict[str, Dict], name: str, body: Dict, source: str) -> None:
+    if name in definitions and definitions[name] != body:
+        raise config_parser.ConfigError(
+            f"{name} from {source} conflicts with another definition", name
+        )
+    definitions[name] = body
@@ -0,0 +1,83 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from typing import Dict, Optional, Set
+
+from rezide.utils import interfaces
+
+# inotify(7) constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+
+# Watch directories instead of files so that we see editors that save by writing a
+# temporary file and renaming it over the original
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; ... }
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+class InotifyWatcher(interfaces.FileWatcher):
+    """Watches directories with Linux's inotify API"""
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        self._watched_dirs: Dict[int, str] = dict()
+
+    def watch_directory(self, path: str) -> None:
+        watch_descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), WATCH_MASK
+        )
+        if watch_descriptor < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number), path)
+        self._watched_dirs[watch_descriptor] = path
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, READ_SIZE)
+        changed_paths = set()
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, _, name_length = EVENT_HEADER.unpack_from(
+                data, offset
+            )
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            directory = self._watched_dirs.get(watch_descriptor)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # the directory was deleted, so the kernel dropped the watch
+                del self._watched_dirs[watch_descriptor]
+                continue
+            changed_paths.add(os.path.join(directory, name) if name else directory)
+        return changed_paths
+
+    def close(self) -> None:
+        os.close(self._fd)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import abc
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 from rezide.utils import dtos
 
@@ -39,11 +39,88 @@ class TilingWindowManager(object):
         pass
 
     @abc.abstractmethod
-    def get_tree(self) -> List:
+    def get_tree(self, workspace_name: Optional[str] = None) -> Iterable:
+        """Walk the nodes in a workspace, or in the current workspace if no name is
+        given
+        """
         pass
 
     @abc.abstractmethod
-    def get_window_sizes(self) -> Dict:
+    def get_windows(self, workspace_name: Optional[str] = None) -> Iterable:
+        """Walk the windows in a workspace, or in the current workspace if no name is
+        given
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        """Get the size of every window on every workspace"""
+        pass
+
+    @abc.abstractmethod
+    def wait_for_tree_change(self) -> None:
+        """Block until a window or workspace changes"""
+        pass
+
+    @abc.abstractmethod
+    def get_window_sizes(self, workspace_name: Optional[str] = None) -> Dict:
+        pass
+
+    @abc.abstractmethod
+    def get_workspace_snapshot(self) -> dtos.ContainerSnapshot:
+        """Capture the tiling containers in the current workspace"""
+        pass
+
+    @abc.abstractmethod
+    def switch_workspace(self, workspace_name: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def focus_output(self, output_name: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def spawn_hidden(self, command: str) -> int:
+        """Start a client whose window opens hidden, without taking focus, and return
+        the id of its container. The client has to give its window the hidden app id
+        """
+        pass
+
+    @abc.abstractmethod
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        """Start a window's client now and keep its window hidden until make_window
+        is called for it, which puts the window in place instead of starting another
+        client
+        """
+        pass
+
+    @abc.abstractmethod
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        """Move a hidden window to wherever a new window would open, then mark it"""
+        pass
+
+    @abc.abstractmethod
+    def get_con_ids(self, marks: Iterable[str]) -> Dict[str, int]:
+        """Find the containers with these marks in a single snapshot of the tree.
+        Marks that no container has are left out
+        """
+        pass
+
+    @abc.abstractmethod
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        """Move windows to the scratchpad so that they can be adopted later"""
+        pass
+
+    @abc.abstractmethod
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        """Ask windows to close"""
+        pass
+
+    @abc.abstractmethod
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """Find the processes that own these windows, or every window if no windows
+        are given. Windows that are gone or that don't have a process are left out
+        """
         pass
 
 
@@ -83,10 +160,27 @@ class FileStore(object):
     def read_file(self, path: str) -> str:
         pass
 
+    @abc.abstractmethod
+    def write_file(self, path: str, contents: str) -> None:
+        """Write `contents` to `path`, creating its parent directories if needed"""
+        pass
+
     @abc.abstractmethod
     def list_directory_contents(self, path: str) -> Set[str]:
         pass
 
+    @abc.abstractmethod
+    def make_fifo(self, path: str) -> None:
+        """Create a named pipe at `path`, replacing whatever was there"""
+        pass
+
+    @abc.abstractmethod
+    def write_fifo(self, path: str, contents: str) -> None:
+        """Write to a named pipe without blocking. Raise RuntimeError if nothing is
+        reading from it
+        """
+        pass
+
 
 class TreeNodeInterface(object):
     @abc.abstractmethod
@@ -112,6 +206,12 @@ class TreeNodeInterface(object):
     def data(self) -> Any:
         pass
 
+    @property
+    @abc.abstractmethod
+    def structural_hash(self) -> bytes:
+        """A digest that's equal for identical subtrees"""
+        pass
+
 
 class TreeFactoryInterface(object):
     @abc.abstractmethod
@@ -129,7 +229,31 @@ class ConfigParserInterface(object):
         pass
 
 
+class FileWatcher(object):
+    """Anything that can tell us when files change, like inotify"""
+
+    @abc.abstractmethod
+    def watch_directory(self, path: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def wait_for_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until something changes in a watched directory, then return the paths
+        that changed. Return an empty set if nothing changes before the timeout
+        """
+        pass
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        pass
+
+
 class ConfigDir(object):
+    @property
+    @abc.abstractmethod
+    def path(self) -> str:
+        pass
+
     @abc.abstractmethod
     def list_layouts(self) -> Set[str]:
         pass
@@ -137,3 +261,13 @@ class ConfigDir(object):
     @abc.abstractmethod
     def get_layout_file_path(self, layout_name: str) -> str:
         pass
+
+    @abc.abstractmethod
+    def get_new_layout_file_path(
+        self, layout_name: str, overwrite: bool = False
+    ) -> str:
+        pass
+
+    @abc.abstractmethod
+    def get_session_file_path(self, session_name: str) -> str:
+        pass
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+
+# Starts clients as our own subprocesses instead of through the window manager's exec,
+# so that we know their pids. Windows are matched to the process that opened them, a
+# client that crashes is reported straight away, and windows can say what "ready"
+# means for them before the next window opens.
+
+# how long a window gets to open and pass its readiness probes
+DEFAULT_READY_TIMEOUT = 10.0
+# how often we check on things that don't send events, like sockets and exit codes
+POLL_INTERVAL = 0.05
+PROC_STAT_PATH = "/proc/{pid}/stat"
+
+T = TypeVar("T")
+
+
+class Launcher(object):
+    """Runs clients on an asyncio loop in a background thread. The window manager
+    calls it from its own thread and blocks until each step is done
+    """
+
+    def __init__(
+        self, filestore: interfaces.FileStore, poll_interval: float = POLL_INTERVAL
+    ) -> None:
+        self._filestore = filestore
+        self._poll_interval = poll_interval
+        self._processes: Dict[int, asyncio.subprocess.Process] = dict()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def launch(self, command: str) -> int:
+        """Start a client and return its pid"""
+        logging.debug(f"launching {command}")
+        process = self._run(
+            asyncio.create_subprocess_shell(
+                command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                # clients should outlive rezide, and shouldn't get our signals
+                start_new_session=True,
+            )
+        )
+        self._processes[process.pid] = process
+        return process.pid
+
+    def exit_code(self, pid: int) -> Optional[int]:
+        """Get the exit code of a client that we launched, or None if it's running"""
+        return self._processes[pid].returncode
+
+    def started(self, launched_pid: int, window_pid: Optional[int]) -> bool:
+        """Check if a window's process is the client that we launched or one of its
+        descendants. Shells and wrapper scripts often start the real client as a child
+        """
+        pid = window_pid
+        while pid is not None and pid > 1:
+            if pid == launched_pid:
+                return True
+            pid = self._parent_pid(pid)
+        return False
+
+    def _parent_pid(self, pid: int) -> Optional[int]:
+        stat_path = PROC_STAT_PATH.format(pid=pid)
+        if not self._filestore.exists_as_file(stat_path):
+            return None
+        # the process name is in parentheses and can contain anything, so the fields
+        # we want start after the last closing parenthesis
+        _, _, fields = self._filestore.read_file(stat_path).rpartition(")")
+        return int(fields.split()[1])
+
+    def wait_for_window(
+        self, pid: int, window_events: queue.Queue, deadline: float
+    ) -> Any:
+        """Wait for a launched client to open a window and return its container.
+
+        Window events for other processes are ignored. If the client exits
+        successfully without opening a window, it probably handed off to a client
+        that was already running, so we take the next window that opens instead.
+        """
+        while True:
+            exit_code = self.exit_code(pid)
+            if exit_code not in (None, 0):
+                raise RuntimeError(
+                    f"The client with pid {pid} exited with code {exit_code} before"
+                    + " it opened a window"
+                )
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"The client with pid {pid} never opened a window")
+            try:
+                event = window_events.get(timeout=min(remaining, self._poll_interval))
+            except queue.Empty:
+                continue
+            if event.change != "new":
+                continue
+            if exit_code == 0 or self.started(pid, event.container.pid):
+                return event.container
+            logging.debug(f"ignoring a window from pid {event.container.pid}")
+
+    def wait_until_ready(
+        self,
+        window_details: dtos.WindowDetails,
+        container: Any,
+        window_events: queue.Queue,
+        deadline: float,
+    ) -> None:
+        """Wait for a window's readiness probes to pass. A probe that times out only
+        logs a warning so that a slow client can't hold up the rest of the layout
+        """
+        if window_details.ready_title is not None and not self._wait_for_title(
+            re.compile(window_details.ready_title), container, window_events, deadline
+        ):
+            logging.warning(
+                f"{window_details.mark} never got a title matching"
+                + f" {window_details.ready_title}"
+            )
+        if window_details.ready_socket is not None:
+            socket_path = os.path.expandvars(
+                os.path.expanduser(window_details.ready_socket)
+            )
+            if not self._run(self._wait_for_socket(socket_path, deadline)):
+                logging.warning(
+                    f"{window_details.mark} never opened the socket {socket_path}"
+                )
+
+    def _wait_for_title(
+        self,
+        title: re.Pattern,
+        container: Any,
+        window_events: queue.Queue,
+        deadline: float,
+    ) -> bool:
+        if container.name is not None and title.search(container.name):
+            return True
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                event = window_events.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if (
+                event.change == "title"
+                and event.container.id == container.id
+                and event.container.name is not None
+                and title.search(event.container.name)
+            ):
+                return True
+
+    async def _wait_for_socket(self, socket_path: str, deadline: float) -> bool:
+        while True:
+            try:
+                _, writer = await asyncio.open_unix_connection(socket_path)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    return False
+                await asyncio.sleep(self._poll_interval)
+            else:
+                writer.close()
+                await writer.wait_closed()
+                return True
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self) -> None:
+        """Stop the event loop. Clients keep running"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
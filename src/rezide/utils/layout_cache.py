@@ -0,0 +1,88 @@
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from rezide.utils import config_parser
+from rezide.utils import includes
+from rezide.utils import interfaces
+from rezide.utils import layouts
+from rezide.utils import pool
+
+
+class LayoutCache(object):
+    """Keeps parsed and validated layouts in memory so that opening a layout again
+    doesn't have to read, parse, or validate anything
+    """
+
+    def __init__(
+        self,
+        config_dir: interfaces.ConfigDir,
+        config_reader: interfaces.ConfigReader,
+        tree_factory: interfaces.TreeFactoryInterface,
+        window_manager: interfaces.TilingWindowManager,
+        client_pool: Optional[pool.ClientPool] = None,
+    ) -> None:
+        self._config_dir = config_dir
+        # layouts that include the same layout share its definitions
+        self._modules = includes.ModuleCache(config_dir, config_reader)
+        self._tree_factory = tree_factory
+        self._window_manager = window_manager
+        self._pool = client_pool
+        self._layouts: Dict[str, layouts.LayoutManager] = dict()
+        # the config watcher and the daemon's requests both load and forget layouts.
+        # Layouts load outside of the lock so that several can load at once
+        self._lock = threading.Lock()
+        # goes up whenever layouts are forgotten, so that a load that started before
+        # then doesn't put an old version in the cache
+        self._generation = 0
+
+    def get(self, layout_name: str) -> layouts.LayoutManager:
+        """Get a layout, loading it from the config dir if it isn't cached yet"""
+        with self._lock:
+            if layout_name in self._layouts:
+                return self._layouts[layout_name]
+            generation = self._generation
+        layout_manager = self._load(layout_name)
+        with self._lock:
+            if generation != self._generation:
+                return layout_manager
+            # if another thread loaded the same layout first, everyone gets its copy
+            return self._layouts.setdefault(layout_name, layout_manager)
+
+    def _load(self, layout_name: str) -> layouts.LayoutManager:
+        logging.info(f"loading layout {layout_name}")
+        parser = config_parser.ConfigParser(
+            self._modules.get(layout_name), self._tree_factory
+        )
+        return layouts.LayoutManager(parser, self._window_manager, self._pool)
+
+    def preload(self) -> None:
+        """Load every layout in the config dir. Invalid layouts are logged and skipped
+        so that they can't stop the valid ones from loading
+        """
+        for layout_name in sorted(self._config_dir.list_layouts()):
+            try:
+                self.get(layout_name)
+            except Exception as error:
+                logging.error(f"failed to load layout {layout_name}: {error}")
+
+    def invalidate(self, layout_name: str) -> Set[str]:
+        """Forget a layout and the layouts that include it so that they get loaded
+        again the next time they're used. Returns the layouts that were loaded before
+        """
+        with self._lock:
+            self._generation += 1
+            return {
+                forgotten_name
+                for forgotten_name in self._modules.invalidate(layout_name)
+                if self._layouts.pop(forgotten_name, None) is not None
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._modules.clear()
+            self._layouts.clear()
+
+    def __contains__(self, layout_name: object) -> bool:
+        return layout_name in self._layouts
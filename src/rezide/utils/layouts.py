@@ -1,8 +1,12 @@
 import collections
 import logging
-from typing import Iterable, Set
+from typing import Dict, Iterable, List, Optional, Set
 
+from rezide.utils import dtos
 from rezide.utils import interfaces
+from rezide.utils import pool
+from rezide.utils import scheduling
+from rezide.utils import templates
 
 # We use depth-first traversal to create each leaf node in the tree. We
 # create the leftmost descendant of each parent first so that it can reserve
@@ -14,14 +18,84 @@ class LayoutManager(object):
         self,
         config_parser: interfaces.ConfigParserInterface,
         window_manager: interfaces.TilingWindowManager,
+        client_pool: Optional[pool.ClientPool] = None,
+        startup_times: Optional[Dict[str, float]] = None,
     ) -> None:
         self._window_manager = window_manager
+        self._pool = client_pool
+        # how long each command has taken to open its window before. Slow clients
+        # start before anything else
+        self._startup_times = startup_times or dict()
         # make sure that our configuration is valid
         config_parser.validate()
-        tree = config_parser.get_tree()
-        self._layout = Layout(tree)
+        self._tree = config_parser.get_tree()
+        self._template = templates.LayoutTemplate(self._tree)
 
-    def spawn_windows(self) -> None:
+    @property
+    def parameter_names(self) -> Set[str]:
+        return self._template.parameter_names
+
+    def windows(
+        self, params: Optional[Dict[str, str]] = None
+    ) -> List[dtos.WindowDetails]:
+        """Get the layout's windows in the order that they're opened"""
+        return Layout(self._template.expand(params or dict())).windows()
+
+    def marks(self) -> List[str]:
+        """Get the marks of the layout's windows, which don't depend on parameters"""
+        return [window.mark for window in Layout(self._tree).windows()]
+
+    def spawn_windows(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        adopted: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Open the layout's windows, filling in its parameters first. Windows whose
+        marks are in `adopted` aren't opened. The hidden containers that they map to
+        are moved into place instead
+        """
+        layout = Layout(self._template.expand(params or dict()))
+        # switching layouts checks the workspace before it hides the old windows, and
+        # the windows that it closes may not have closed yet
+        if adopted is None:
+            self._check_workspace()
+        self._adopted = adopted or dict()
+        self._created_windows: Set[str] = set()
+        self._prelaunch(layout)
+        for window in layout.zachstras_traversal():
+            if window.is_parent:
+                self._window_manager.split_and_mark_parent(window.data, "abc")
+            elif window.data.mark in self._created_windows:
+                self._window_manager.focus(window.data)
+            else:
+                self._open_window(window.data)
+                self._created_windows.add(window.data.mark)
+
+    def _prelaunch(self, layout: "Layout") -> None:
+        if not self._startup_times:
+            return
+        # windows that are already open or that run in warm terminals start quickly
+        windows = [
+            window
+            for window in layout.windows()
+            if window.mark not in self._adopted
+            and (self._pool is None or window.terminal_command is None)
+        ]
+        prelaunched = scheduling.plan_prelaunches(windows, self._startup_times)
+        if not prelaunched:
+            return
+        before = scheduling.estimate_build_time(windows, self._startup_times, set())
+        after = scheduling.estimate_build_time(
+            windows, self._startup_times, {window.mark for window in prelaunched}
+        )
+        logging.info(
+            f"starting {len(prelaunched)} slow clients early should take the layout"
+            + f" from {before:.2f}s to {after:.2f}s"
+        )
+        for window in prelaunched:
+            self._window_manager.prelaunch(window)
+
+    def _check_workspace(self) -> None:
         logging.debug(
             f"{self._window_manager.num_workspace_windows} windows"
             + " are open in the current workspace"
@@ -30,26 +104,52 @@ class LayoutManager(object):
             raise RuntimeError(
                 "There are multiple windows open in the current workspace."
             )
-        self._created_windows: Set[str] = set()
-        for window in self._layout.zachstras_traversal():
-            if window.is_parent:
-                self._window_manager.split_and_mark_parent(window.data, "abc")
-            elif window.data.mark in self._created_windows:
-                self._window_manager.focus(window.data)
-            else:
-                self._window_manager.make_window(window.data)
-                self._created_windows.add(window.data.mark)
+
+    def _open_window(self, window_details: dtos.WindowDetails) -> None:
+        """Adopt the window if it's already open, run it in a warm terminal from the
+        pool if it can, or start it from scratch
+        """
+        if window_details.mark in self._adopted:
+            self._window_manager.adopt_window(
+                self._adopted[window_details.mark], window_details
+            )
+            return
+        if self._pool is not None and window_details.terminal_command is not None:
+            client = self._pool.claim()
+            if client is not None:
+                # only put the terminal in place once it's running the command
+                try:
+                    self._pool.run(client, window_details.terminal_command)
+                    self._window_manager.adopt_window(client.con_id, window_details)
+                    return
+                except RuntimeError as error:
+                    logging.warning(
+                        f"couldn't use a warm terminal for {window_details.mark}:"
+                        + f" {error}"
+                    )
+                    # so that it doesn't linger next to the window that replaces it
+                    self._window_manager.close_windows([client.con_id])
+        self._window_manager.make_window(window_details)
 
 
 class Layout(object):
     def __init__(self, tree_: interfaces.TreeNodeInterface) -> None:
         self._tree = tree_
 
+    def windows(self) -> List[dtos.WindowDetails]:
+        """Get each window once, in the order that they're opened"""
+        windows: Dict[str, dtos.WindowDetails] = dict()
+        for node in self.zachstras_traversal():
+            if not node.is_parent:
+                windows.setdefault(node.data.mark, node.data)
+        return list(windows.values())
+
     def zachstras_traversal(self) -> Iterable[interfaces.TreeNodeInterface]:
         node_queue = collections.deque([self._tree])
         while len(node_queue) >= 1:
             current_node = node_queue.popleft()
-            logging.debug(f"dequeuing {current_node}")
+            # formatting a node formats its whole subtree, so only do it when logging
+            logging.debug("dequeuing %s", current_node)
             if current_node.is_parent:
                 yield current_node.children[0].get_leftmost_descendant()
                 yield current_node
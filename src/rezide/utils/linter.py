@@ -0,0 +1,233 @@
+import concurrent.futures
+import functools
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import toml
+
+from rezide.utils import config_dir
+from rezide.utils import config_parser
+from rezide.utils import dtos
+from rezide.utils import filestore
+from rezide.utils import includes
+from rezide.utils import interfaces
+from rezide.utils import tree
+
+# `rzd check` validates layouts without opening them. Each layout is checked in its
+# own process, and layouts whose files haven't changed since the last check get their
+# results from a cache instead.
+
+CACHE_VERSION = 2
+CACHE_FILE_NAME = "check.json"
+# the hash of a file that a layout includes but that doesn't exist
+MISSING_FILE = ""
+
+
+def default_cache_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "rezide", CACHE_FILE_NAME)
+
+
+class _HashingReader(interfaces.ConfigReader):
+    """Reads toml files and remembers the hash of each one. The last path is the
+    file that was being read when something went wrong
+    """
+
+    def __init__(self, filestore_: interfaces.FileStore) -> None:
+        self._filestore = filestore_
+        self.file_hashes: Dict[str, str] = dict()
+        self.last_path: Optional[str] = None
+
+    def read(self, path: str) -> Dict:
+        self.last_path = path
+        toml_str = self._filestore.read_file(path)
+        self.file_hashes[path] = hash_contents(toml_str)
+        return dict(toml.loads(toml_str))
+
+
+class _TrackingConfigDir(config_dir.ConfigDir):
+    """Remembers the layout files that were looked for but don't exist"""
+
+    def __init__(self, filestore_: interfaces.FileStore, path: str) -> None:
+        super().__init__(filestore_, dtos.Env(home="", xdg_config_home=""), path)
+        self.missing_paths: List[str] = []
+
+    def get_layout_file_path(self, layout_name: str) -> str:
+        try:
+            return super().get_layout_file_path(layout_name)
+        except RuntimeError:
+            self.missing_paths.append(_layout_path(self.path, layout_name))
+            raise
+
+
+def _layout_path(config_dir_path: str, layout_name: str) -> str:
+    return os.path.join(config_dir_path, layout_name, config_dir.CONFIG_FILE_NAME)
+
+
+def hash_contents(contents: str) -> str:
+    return hashlib.sha256(contents.encode()).hexdigest()
+
+
+def check_layout(
+    filestore_: interfaces.FileStore, config_dir_path: str, layout_name: str
+) -> dtos.LayoutCheck:
+    """Find every problem with a layout and the files that it's made of. Problems
+    with included definitions are reported in the files that define them
+    """
+    config_directory = _TrackingConfigDir(filestore_, config_dir_path)
+    reader = _HashingReader(filestore_)
+    modules = includes.ModuleCache(config_directory, reader)
+    errors: List[config_parser.ConfigError] = []
+    try:
+        definitions = modules.get(layout_name)
+        parser = config_parser.ConfigParser(definitions, tree.TreeFactory())
+        errors = parser.find_errors()
+        if includes.ROOT_NAME not in definitions:
+            errors.append(
+                config_parser.ConfigError(
+                    "There is no root definition", includes.ROOT_NAME
+                )
+            )
+        elif not errors:
+            parser.get_tree()
+        # validation problems are always in a table, which may be from another file
+        for error in errors:
+            origin = modules.origin(layout_name, error.table or includes.ROOT_NAME)
+            error.path = _layout_path(config_dir_path, origin)
+    except config_parser.ConfigError as error:
+        errors = [error]
+    except (RuntimeError, toml.TomlDecodeError) as error:
+        errors = [config_parser.ConfigError(str(error), path=reader.last_path)]
+    problems = [
+        dtos.ConfigProblem(
+            error.path or _layout_path(config_dir_path, layout_name),
+            error.table,
+            error.key,
+            str(error),
+        )
+        for error in errors
+    ]
+    # a file that shows up later changes the result as much as one that's edited
+    file_hashes = dict(reader.file_hashes)
+    for path in config_directory.missing_paths:
+        file_hashes[path] = MISSING_FILE
+    return dtos.LayoutCheck(layout_name, problems, file_hashes)
+
+
+def _check_layout_locally(config_dir_path: str, layout_name: str) -> dtos.LayoutCheck:
+    """Check a layout in a worker process, which has to open its own filestore"""
+    return check_layout(filestore.LocalFilestore(), config_dir_path, layout_name)
+
+
+class CheckCache(object):
+    """Remembers each layout's problems along with the hashes of its files. A result
+    is only used again if none of the files have changed
+    """
+
+    def __init__(self, filestore_: interfaces.FileStore, cache_path: str) -> None:
+        self._filestore = filestore_
+        self._cache_path = cache_path
+        self._checks: Dict[str, dtos.LayoutCheck] = dict()
+        if not self._filestore.exists_as_file(cache_path):
+            return
+        try:
+            cache_dict = json.loads(self._filestore.read_file(cache_path))
+        except ValueError:
+            logging.warning(f"ignoring the corrupted cache at {cache_path}")
+            return
+        if cache_dict.get("version") != CACHE_VERSION:
+            return
+        for layout_name, check in cache_dict["layouts"].items():
+            self._checks[layout_name] = dtos.LayoutCheck(
+                layout_name,
+                [dtos.ConfigProblem(*problem) for problem in check["problems"]],
+                check["file_hashes"],
+            )
+
+    def get(self, layout_name: str) -> Optional[dtos.LayoutCheck]:
+        check = self._checks.get(layout_name)
+        if check is None or not check.file_hashes:
+            return None
+        for path, file_hash in check.file_hashes.items():
+            exists = self._filestore.exists_as_file(path)
+            if file_hash == MISSING_FILE:
+                if exists:
+                    return None
+            elif not exists:
+                return None
+            elif hash_contents(self._filestore.read_file(path)) != file_hash:
+                return None
+        return check
+
+    def put(self, check: dtos.LayoutCheck) -> None:
+        self._checks[check.layout] = check
+
+    def save(self) -> None:
+        cache_dict = {
+            "version": CACHE_VERSION,
+            "layouts": {
+                layout_name: {
+                    "problems": [list(problem) for problem in check.problems],
+                    "file_hashes": check.file_hashes,
+                }
+                for layout_name, check in self._checks.items()
+            },
+        }
+        self._filestore.write_file(self._cache_path, json.dumps(cache_dict))
+
+
+def check_layouts(
+    filestore_: interfaces.FileStore,
+    config_dir_path: str,
+    layout_names: Iterable[str],
+    cache: Optional[CheckCache] = None,
+    jobs: Optional[int] = None,
+) -> Tuple[List[dtos.LayoutCheck], int]:
+    """Check layouts, in parallel when there's more than one job. Returns the checks
+    in order of layout name and how many of them came from the cache
+    """
+    checks: Dict[str, dtos.LayoutCheck] = dict()
+    unchecked = []
+    for layout_name in sorted(set(layout_names)):
+        cached_check = None if cache is None else cache.get(layout_name)
+        if cached_check is None:
+            unchecked.append(layout_name)
+        else:
+            checks[layout_name] = cached_check
+    cached_count = len(checks)
+    if jobs == 1 or len(unchecked) <= 1:
+        new_checks: Iterable[dtos.LayoutCheck] = [
+            check_layout(filestore_, config_dir_path, layout_name)
+            for layout_name in unchecked
+        ]
+    else:
+        workers = jobs or os.cpu_count() or 1
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            new_checks = list(
+                executor.map(
+                    functools.partial(_check_layout_locally, config_dir_path),
+                    unchecked,
+                    # each check is quick, so send them in batches
+                    chunksize=max(1, len(unchecked) // (4 * workers)),
+                )
+            )
+    for check in new_checks:
+        checks[check.layout] = check
+        if cache is not None:
+            cache.put(check)
+    return [checks[layout_name] for layout_name in sorted(checks)], cached_count
+
+
+def format_problem(problem: dtos.ConfigProblem) -> str:
+    """Describe a problem as `path:table.key: message`"""
+    location = problem.path
+    if problem.table is not None:
+        location += f":{problem.table}"
+        if problem.key is not None:
+            location += f".{problem.key}"
+    return f"{location}: {problem.message}"
@@ -0,0 +1,34 @@
+from typing import Any, Dict, Iterable
+
+
+class MarkIndex(object):
+    """Finds containers by their exact mark.
+
+    Sway's own criteria treat marks as regexes and check every container in the tree,
+    so "a.b" also matches "axb". We walk the tree once to build the index, then each
+    lookup is a single dictionary lookup. Window managers only let one container have
+    each mark, so each mark maps to one container id.
+    """
+
+    def __init__(self, nodes: Iterable[Any] = ()) -> None:
+        self._con_ids: Dict[str, int] = dict()
+        for node in nodes:
+            for mark in node.marks:
+                self._con_ids[mark] = node.id
+
+    def add(self, mark: str, con_id: int) -> None:
+        """Remember a mark that we just added so that we don't have to walk the tree
+        again to find it
+        """
+        self._con_ids[mark] = con_id
+
+    def get(self, mark: str) -> int:
+        if mark not in self._con_ids:
+            raise RuntimeError(f'There are no windows with the mark "{mark}"')
+        return self._con_ids[mark]
+
+    def __contains__(self, mark: object) -> bool:
+        return mark in self._con_ids
+
+    def __len__(self) -> int:
+        return len(self._con_ids)
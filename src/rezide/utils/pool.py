@@ -0,0 +1,130 @@
+import collections
+import itertools
+import logging
+import os
+import shlex
+import tempfile
+import threading
+from typing import Deque, Optional
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+from rezide.utils import sway_commands
+
+# Most of the time spent opening a layout goes to waiting for terminals to start. The
+# daemon can keep a few terminals warm in the scratchpad instead. Each one runs a tiny
+# shell that waits for a command on its own named pipe, so a window that defines
+# `terminal_command` takes a warm terminal, moves it into place, and sends it the
+# command. The pool starts another terminal in the background to replace it.
+
+# the command that opens a terminal and runs the rest of the line in it. The terminal
+# has to give its window the app id, so that sway can hide it
+DEFAULT_TERMINAL = "alacritty --class {app_id} -e"
+APP_ID_PLACEHOLDER = "{app_id}"
+# runs in each warm terminal. The pipe is $1
+WAITING_SHELL = 'read -r command < "$1" && rm -f "$1" && exec sh -c "$command"'
+# warm terminals run this when the pool stops so that they don't linger
+EXIT_COMMAND = "exit"
+
+
+def default_fifo_dir() -> str:
+    """Anyone who can write to the fifos can run commands in our terminals. The runtime
+    dir is already ours alone, but the temp dir is shared, so it gets a dir per user
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "rezide-pool")
+    return os.path.join(tempfile.gettempdir(), f"rezide-pool-{os.getuid()}")
+
+
+class ClientPool(object):
+    """Keeps warm terminals hidden in the scratchpad. Claiming one never waits, and
+    the pool refills itself in the background. The pool should have its own window
+    manager connection so that refilling doesn't get in the way of opening layouts
+    """
+
+    def __init__(
+        self,
+        window_manager: interfaces.TilingWindowManager,
+        filestore: interfaces.FileStore,
+        size: int,
+        terminal: str = DEFAULT_TERMINAL,
+        fifo_dir: Optional[str] = None,
+    ) -> None:
+        self._window_manager = window_manager
+        self._filestore = filestore
+        self._size = size
+        self._terminal = terminal.replace(
+            APP_ID_PLACEHOLDER, sway_commands.HIDDEN_APP_ID
+        )
+        self._fifo_dir = fifo_dir or default_fifo_dir()
+        self._fifo_ids = itertools.count()
+        self._clients: Deque[dtos.PooledClient] = collections.deque()
+        # claims come from the daemon's threads while the pool refills in its own
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._wanted.set()
+        self._thread = threading.Thread(target=self._refill, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refilling and close the terminals that are still warm"""
+        self._stopped.set()
+        self._wanted.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            while self._clients:
+                client = self._clients.popleft()
+                try:
+                    self.run(client, EXIT_COMMAND)
+                except RuntimeError as error:
+                    logging.warning(f"couldn't close pooled terminal: {error}")
+
+    def _refill(self) -> None:
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.fill()
+            except Exception:
+                # try again the next time that a terminal is claimed
+                logging.exception("failed to refill the client pool")
+
+    def fill(self) -> None:
+        """Start terminals until the pool is full"""
+        while len(self) < self._size and not self._stopped.is_set():
+            fifo_path = os.path.join(
+                self._fifo_dir, f"{os.getpid()}-{next(self._fifo_ids)}.fifo"
+            )
+            self._filestore.make_fifo(fifo_path)
+            con_id = self._window_manager.spawn_hidden(self.client_command(fifo_path))
+            logging.debug(f"warmed up terminal {con_id}")
+            with self._lock:
+                self._clients.append(dtos.PooledClient(con_id, fifo_path))
+
+    def client_command(self, fifo_path: str) -> str:
+        return (
+            f"{self._terminal} sh -c {shlex.quote(WAITING_SHELL)} rezide-pool"
+            + f" {shlex.quote(fifo_path)}"
+        )
+
+    def claim(self) -> Optional[dtos.PooledClient]:
+        """Take a warm terminal, or None if the pool is empty"""
+        with self._lock:
+            client = self._clients.popleft() if self._clients else None
+        self._wanted.set()
+        return client
+
+    def run(self, client: dtos.PooledClient, command: str) -> None:
+        self._filestore.write_fifo(client.fifo_path, command + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
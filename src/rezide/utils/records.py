@@ -0,0 +1,174 @@
+import abc
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Machine-readable output for the nodes in the window manager's tree. Each node
+# becomes a flat record that only has the fields that were asked for, and records are
+# written out one at a time while the tree is walked.
+
+GAP_SIDES = ("inner", "outer", "top", "right", "bottom", "left")
+
+
+def _gaps(node: Any) -> Optional[Dict[str, Optional[int]]]:
+    if node.gaps is None:
+        return None
+    return {side: getattr(node.gaps, side, None) for side in GAP_SIDES}
+
+
+def _window_rect(node: Any, dimension: str) -> Optional[int]:
+    window_rect = getattr(node, "window_rect", None)
+    return None if window_rect is None else getattr(window_rect, dimension)
+
+
+FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "id": lambda node: node.id,
+    "name": lambda node: node.name,
+    "type": lambda node: node.type,
+    "app_id": lambda node: node.app_id,
+    "pid": lambda node: node.pid,
+    "focused": lambda node: node.focused,
+    "marks": lambda node: list(node.marks),
+    "x": lambda node: node.rect.x,
+    "y": lambda node: node.rect.y,
+    "width": lambda node: node.rect.width,
+    "height": lambda node: node.rect.height,
+    "window_width": lambda node: _window_rect(node, "width"),
+    "window_height": lambda node: _window_rect(node, "height"),
+    "gaps": _gaps,
+}
+
+TREE_FIELDS = ["id", "name", "x", "y", "width", "height", "gaps", "marks"]
+# watching adds this field to every record to say what happened to its node
+STATUS_FIELD = "status"
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+WINDOW_SIZE_FIELDS = ["id", "marks", "window_width", "window_height"]
+
+
+def parse_fields(fields: str) -> List[str]:
+    """Parse a comma-separated list of field names"""
+    field_names = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown_fields = [field for field in field_names if field not in FIELDS]
+    if unknown_fields:
+        raise RuntimeError(
+            f"Unknown fields: {unknown_fields}. Choose from {list(FIELDS.keys())}"
+        )
+    if not field_names:
+        raise RuntimeError("Choose at least one field")
+    return field_names
+
+
+def make_record(node: Any, fields: List[str]) -> Dict[str, Any]:
+    return {field: FIELDS[field](node) for field in fields}
+
+
+class RecordWriter(abc.ABC):
+    """Writes records as soon as they're made so that nobody has to wait for the
+    whole tree
+    """
+
+    def __init__(self, fields: List[str], write: Callable[[str], None]) -> None:
+        self._fields = fields
+        self._write = write
+
+    @abc.abstractmethod
+    def write_record(self, record: Dict[str, Any]) -> None:  # pragma: no cover
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class NdjsonWriter(RecordWriter):
+    """One json object per line"""
+
+    def write_record(self, record: Dict[str, Any]) -> None:
+        self._write(json.dumps(record) + "\n")
+
+
+class JsonWriter(RecordWriter):
+    """A single json array that's written one element at a time"""
+
+    def __init__(self, fields: List[str], write: Callable[[str], None]) -> None:
+        super().__init__(fields, write)
+        self._separator = "[\n"
+
+    def write_record(self, record: Dict[str, Any]) -> None:
+        self._write(self._separator + json.dumps(record))
+        self._separator = ",\n"
+
+    def close(self) -> None:
+        self._write("[]\n" if self._separator == "[\n" else "\n]\n")
+
+
+class CsvWriter(RecordWriter):
+    """Comma-separated values with a header row. Lists and tables are written as
+    json so that they fit in a single cell
+    """
+
+    def __init__(self, fields: List[str], write: Callable[[str], None]) -> None:
+        super().__init__(fields, write)
+        self._buffer = io.StringIO()
+        self._csv_writer = csv.writer(self._buffer, lineterminator="\n")
+        self._write_row(fields)
+
+    def write_record(self, record: Dict[str, Any]) -> None:
+        self._write_row([_csv_cell(record[field]) for field in self._fields])
+
+    def _write_row(self, row: List[Any]) -> None:
+        self._csv_writer.writerow(row)
+        self._write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+WRITERS: Dict[str, Callable[[List[str], Callable[[str], None]], RecordWriter]] = {
+    "json": JsonWriter,
+    "ndjson": NdjsonWriter,
+    "csv": CsvWriter,
+}
+
+
+def write_records(
+    nodes: Iterable[Any], fields: List[str], writer: RecordWriter
+) -> None:
+    for node in nodes:
+        writer.write_record(make_record(node, fields))
+    writer.close()
+
+
+def changed_records(
+    get_nodes: Callable[[], Iterable[Any]],
+    fields: List[str],
+    wait_for_change: Callable[[], None],
+) -> Iterator[Dict[str, Any]]:
+    """Yield a record for every node, then wait for the tree to change and only yield
+    the records for nodes that are new, different, or gone. Nodes are matched up by
+    their id even if the id isn't one of the fields. Each record's status field says
+    which of those happened, and a removed node's record is the last one it had
+    """
+    previous_records: Dict[Any, Dict[str, Any]] = dict()
+    while True:
+        current_records = dict()
+        for node in get_nodes():
+            record = make_record(node, fields)
+            current_records[node.id] = record
+            previous_record = previous_records.get(node.id)
+            if previous_record is None:
+                yield {**record, STATUS_FIELD: ADDED}
+            elif previous_record != record:
+                yield {**record, STATUS_FIELD: CHANGED}
+        for node_id, record in previous_records.items():
+            if node_id not in current_records:
+                yield {**record, STATUS_FIELD: REMOVED}
+        previous_records = current_records
+        wait_for_change()
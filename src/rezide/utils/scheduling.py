@@ -0,0 +1,49 @@
+from typing import Dict, List, Set
+
+from rezide.utils import dtos
+
+# Windows open one at a time in traversal order because each one opens next to the
+# window before it, so a slow client holds up every window after it. Clients that
+# have been slow to open before can be started at the very beginning instead. Their
+# windows wait in the scratchpad until traversal gets to them, so the layout takes
+# about as long as its slowest client instead of the sum of its clients.
+
+# clients that usually open faster than this aren't worth starting early
+MIN_STARTUP_TIME = 0.5
+
+
+def plan_prelaunches(
+    windows: List[dtos.WindowDetails],
+    startup_times: Dict[str, float],
+    min_startup_time: float = MIN_STARTUP_TIME,
+) -> List[dtos.WindowDetails]:
+    """Pick the windows whose clients should start early, slowest first. Windows
+    are in the order that they're opened, and the first one opens straight away
+    """
+    slow_windows = [
+        window
+        for window in windows[1:]
+        if startup_times.get(window.command, 0) >= min_startup_time
+    ]
+    return sorted(
+        slow_windows, key=lambda window: startup_times[window.command], reverse=True
+    )
+
+
+def estimate_build_time(
+    windows: List[dtos.WindowDetails],
+    startup_times: Dict[str, float],
+    prelaunched: Set[str],
+) -> float:
+    """Estimate how long it takes to open the windows in order. Pre-launched clients
+    start at the beginning, and everything else starts when the window before it is
+    done
+    """
+    elapsed = 0.0
+    for window in windows:
+        startup_time = startup_times.get(window.command, 0)
+        if window.mark in prelaunched:
+            elapsed = max(elapsed, startup_time)
+        else:
+            elapsed += startup_time
+    return elapsed
@@ -0,0 +1,113 @@
+import concurrent.futures
+import itertools
+import logging
+from typing import Callable, Dict, List
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+from rezide.utils import layouts
+
+# A session opens several layouts at once, each on its own workspace:
+#
+#   [[workspaces]]
+#   workspace = "1"
+#   layout = "rezide-ide"
+#   output = "DP-1"  # optional
+#
+#   [[workspaces]]
+#   workspace = "docs"
+#   layout = "rezide-documentation"
+#   params = { repo = "~/workspace/rezide" }  # optional
+
+REQUIRED_KEYS = {"workspace", "layout"}
+ALLOWED_KEYS = REQUIRED_KEYS | {"output", "params"}
+
+
+def parse_session(session_dict: Dict) -> List[dtos.WorkspaceLayout]:
+    """Validate a session file and return the layouts that it wants to open"""
+    if set(session_dict.keys()) != {"workspaces"}:
+        raise RuntimeError("A session must only define a `workspaces` array of tables")
+    workspace_layouts = []
+    for definition in session_dict["workspaces"]:
+        keys = set(definition.keys())
+        if not REQUIRED_KEYS.issubset(keys):
+            raise RuntimeError(
+                f"Each workspace must define workspace and layout. keys defined: {keys}"
+            )
+        extra_keys = keys - ALLOWED_KEYS
+        if extra_keys:
+            raise RuntimeError(
+                f"Each workspace must only define these keys: {ALLOWED_KEYS}. extra"
+                + f" keys defined: {extra_keys}"
+            )
+        params = definition.get("params")
+        if params is not None:
+            if not isinstance(params, dict):
+                raise RuntimeError(f"params must be a table of values: {params}")
+            params = {name: str(value) for name, value in params.items()}
+        workspace_layouts.append(
+            dtos.WorkspaceLayout(
+                workspace=str(definition["workspace"]),
+                layout=definition["layout"],
+                output=definition.get("output"),
+                params=params,
+            )
+        )
+    workspaces = [workspace_layout.workspace for workspace_layout in workspace_layouts]
+    if len(set(workspaces)) != len(workspaces):
+        raise RuntimeError(f"Each workspace can only have one layout: {workspaces}")
+    return workspace_layouts
+
+
+class SessionManager(object):
+    """Opens a layout on each workspace of a session"""
+
+    def __init__(
+        self,
+        workspace_layouts: List[dtos.WorkspaceLayout],
+        load_layout: Callable[[str], layouts.LayoutManager],
+        window_manager: interfaces.TilingWindowManager,
+    ) -> None:
+        self._workspace_layouts = workspace_layouts
+        self._load_layout = load_layout
+        self._window_manager = window_manager
+
+    def open(self) -> None:
+        layout_managers = self._load_layouts()
+        # New windows always open on the focused workspace, so the window manager can
+        # only build one workspace at a time. Visit every workspace on an output
+        # before moving to the next output so that we switch as little as possible.
+        for output, workspace_layouts in itertools.groupby(
+            sorted(self._workspace_layouts, key=_output_sort_key),
+            key=lambda workspace_layout: workspace_layout.output,
+        ):
+            if output is not None:
+                self._window_manager.focus_output(output)
+            for workspace_layout in workspace_layouts:
+                logging.info(
+                    f"opening {workspace_layout.layout} on workspace"
+                    + f" {workspace_layout.workspace}"
+                )
+                self._window_manager.switch_workspace(workspace_layout.workspace)
+                layout_managers[workspace_layout.layout].spawn_windows(
+                    workspace_layout.params
+                )
+
+    def _load_layouts(self) -> Dict[str, layouts.LayoutManager]:
+        """Read, parse, and validate every layout at the same time since none of that
+        touches the desktop. Any invalid layout stops the session before it opens a
+        single window
+        """
+        layout_names = sorted(
+            {workspace_layout.layout for workspace_layout in self._workspace_layouts}
+        )
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            return dict(
+                zip(layout_names, executor.map(self._load_layout, layout_names))
+            )
+
+
+def _output_sort_key(workspace_layout: dtos.WorkspaceLayout) -> str:
+    # workspaces without an output go on whichever output is focused, so open them
+    # first before we move the focus anywhere else
+    return "" if workspace_layout.output is None else f" {workspace_layout.output}"
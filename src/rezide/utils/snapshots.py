@@ -0,0 +1,160 @@
+import collections
+import json
+import logging
+import re
+import shlex
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+
+# Turns a snapshot of a workspace into a layout config. We write the toml ourselves,
+# one table at a time, so that big workspaces never have to be built up into a
+# dictionary and then dumped all at once.
+
+ROOT_NAME = "root"
+BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+PROC_CMDLINE_PATH = "/proc/{pid}/cmdline"
+
+
+class ProcCommandReader(object):
+    """Figures out which command started a window by reading its process's command
+    line from /proc
+    """
+
+    def __init__(self, filestore: interfaces.FileStore) -> None:
+        self._filestore = filestore
+
+    def __call__(self, window: dtos.ContainerSnapshot) -> str:
+        if window.pid is not None:
+            cmdline_path = PROC_CMDLINE_PATH.format(pid=window.pid)
+            if self._filestore.exists_as_file(cmdline_path):
+                arguments = self._filestore.read_file(cmdline_path).split("\0")
+                # the command line ends with a null byte
+                arguments = [argument for argument in arguments if argument]
+                if arguments:
+                    return shlex.join(arguments)
+        if window.app_name:
+            logging.warning(
+                f"couldn't read the command for {window.app_name}, so it will be"
+                + f" started with `{window.app_name}`"
+            )
+            return window.app_name
+        raise RuntimeError(f"Failed to find the command that started {window}")
+
+
+def proportional_sizes(lengths: Sequence[float]) -> List[int]:
+    """Convert lengths into whole percentages that add up to exactly 100. Every child
+    gets at least 1%, and rounding errors go to the children that lost the most
+    """
+    total = sum(lengths)
+    if total <= 0:
+        exact_sizes = [100 / len(lengths)] * len(lengths)
+    else:
+        exact_sizes = [length * 100 / total for length in lengths]
+    sizes = [max(1, int(size)) for size in exact_sizes]
+    by_remainder = sorted(
+        range(len(sizes)),
+        key=lambda index: exact_sizes[index] - sizes[index],
+        reverse=True,
+    )
+    for step in range(100 - sum(sizes)):
+        sizes[by_remainder[step % len(sizes)]] += 1
+    # giving tiny children 1% can push us over 100, so take it from the biggest
+    while sum(sizes) > 100:
+        sizes[sizes.index(max(sizes))] -= 1
+    return sizes
+
+
+def to_toml(
+    workspace: dtos.ContainerSnapshot,
+    get_command: Callable[[dtos.ContainerSnapshot], str],
+) -> str:
+    return "".join(serialize(workspace, get_command))
+
+
+def serialize(
+    workspace: dtos.ContainerSnapshot,
+    get_command: Callable[[dtos.ContainerSnapshot], str],
+) -> Iterator[str]:
+    """Walk the workspace breadth-first and yield one toml table at a time"""
+    root = _collapse(workspace)
+    if root.split is None:
+        raise RuntimeError("A layout needs at least 2 windows")
+    names = _NameGenerator(_find_marks(root))
+    node_queue: Deque[Tuple[str, dtos.ContainerSnapshot]] = collections.deque(
+        [(ROOT_NAME, root)]
+    )
+    while node_queue:
+        name, node = node_queue.popleft()
+        yield f"[{_toml_key(name)}]\n"
+        if node.split is None:
+            yield f"command = {_toml_string(get_command(node))}\n\n"
+            continue
+        if name == ROOT_NAME:
+            yield "is_layout = true\n"
+        children = [_collapse(child) for child in node.children]
+        child_names = [names.name(child) for child in children]
+        yield f"split = {_toml_string(node.split)}\n"
+        yield f"children = [{', '.join(_toml_string(n) for n in child_names)}]\n"
+        yield f"sizes = {proportional_sizes(_lengths(node.split, children))}\n\n"
+        node_queue.extend(zip(child_names, children))
+
+
+def _collapse(node: dtos.ContainerSnapshot) -> dtos.ContainerSnapshot:
+    """Skip over containers that only hold one thing since sections need at least 2
+    children
+    """
+    while len(node.children) == 1:
+        node = node.children[0]
+    if node.split is not None and not node.children:
+        raise RuntimeError("There are no windows in this workspace")
+    return node
+
+
+def _lengths(split: str, children: Iterable[dtos.ContainerSnapshot]) -> List[float]:
+    if split == "horizontal":
+        return [child.width for child in children]
+    return [child.height for child in children]
+
+
+def _find_marks(root: dtos.ContainerSnapshot) -> Set[str]:
+    marks: Set[str] = set()
+    node_queue = collections.deque([root])
+    while node_queue:
+        node = node_queue.popleft()
+        marks.update(node.marks)
+        node_queue.extend(node.children)
+    return marks
+
+
+class _NameGenerator(object):
+    """Names windows after their marks so that they keep them when the layout is
+    opened. Everything else gets a generated name that no mark is using
+    """
+
+    def __init__(self, marks: Set[str]) -> None:
+        self._taken = marks | {ROOT_NAME}
+        self._counts: Dict[str, int] = collections.defaultdict(int)
+
+    def name(self, node: dtos.ContainerSnapshot) -> str:
+        if node.split is None and node.marks and node.marks[0] != ROOT_NAME:
+            return node.marks[0]
+        prefix = "window" if node.split is None else "section"
+        while True:
+            self._counts[prefix] += 1
+            name = f"{prefix}-{self._counts[prefix]}"
+            if name not in self._taken:
+                self._taken.add(name)
+                return name
+
+
+def _toml_key(key: str) -> str:
+    if BARE_KEY.fullmatch(key):
+        return key
+    return _toml_string(key)
+
+
+def _toml_string(value: str) -> str:
+    # toml's basic strings use the same escapes as json's strings
+    return json.dumps(value, ensure_ascii=False)
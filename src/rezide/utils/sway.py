@@ -1,11 +1,17 @@
 import logging
+import queue
+import threading
 import time
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import i3ipc
 
 from rezide.utils import dtos
 from rezide.utils import interfaces
+from rezide.utils import launcher
+from rezide.utils import mark_index
+from rezide.utils import sway_commands
+from rezide.utils import sway_ipc
 
 """We need to sleep for a short time since processes take time to start.
 If we don't sleep, then we may be focusing on a different window by the
@@ -16,6 +22,8 @@ split.
 # WINDOW_MARK_EVENT = i3ipc.Event.WINDOW_MARK
 # WINDOW_FOCUS_EVENT = i3ipc.Event.WINDOW_FOCUS
 NEW_WINDOW_EVENT = i3ipc.Event.WINDOW_NEW
+# any change to any window or workspace
+TREE_CHANGE_EVENTS = (i3ipc.Event.WINDOW, i3ipc.Event.WORKSPACE)
 
 # marking and focusing are such quick actions that we can't just fire and wait.
 # python isn't fast enough to catch up to them!
@@ -29,19 +37,72 @@ SPLIT_SLEEP_TIME = 0.25
 
 # TODO: add logging for commands
 
+# rezide can only split horizontally or vertically, so tabs and stacks become the
+# split that shows their windows side by side
+LAYOUT_SPLITS = {
+    "splith": "horizontal",
+    "tabbed": "horizontal",
+    "splitv": "vertical",
+    "stacked": "vertical",
+}
+
 
 class Sway(interfaces.TilingWindowManager):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        keep_event_subscription: bool = False,
+        client_launcher: Optional[launcher.Launcher] = None,
+        lean_ipc: bool = False,
+    ) -> None:
         self._sway = i3ipc.Connection()
+        # commands and mark lookups can skip i3ipc's containers. Everything that reads
+        # a workspace still goes through i3ipc
+        self._lean_ipc = sway_ipc.connect() if lean_ipc else None
+        self._new_window_events: Optional[queue.Queue] = None
+        # with a launcher, we start clients ourselves and watch every window event
+        self._launcher = client_launcher
+        self._window_events: Optional[queue.Queue] = None
+        self._tree_change_events: Optional[queue.Queue] = None
+        # built the first time that we look up a mark
+        self._marks: Optional[mark_index.MarkIndex] = None
+        # the container that we last created or focused. New windows open next to it
+        self._focused_con_id: Optional[int] = None
+        # whether sway has been told to hide windows with the hidden app id
+        self._hiding_windows = False
+        # the marks of windows whose clients started early
+        self._prelaunched: Set[str] = set()
+        if keep_event_subscription:
+            self._new_window_events = self._subscribe(NEW_WINDOW_EVENT)
+
+    def _subscribe(self, *events: i3ipc.Event) -> queue.Queue:
+        """Listen for events for as long as this object lives.
+
+        Long-running processes use this so that they don't have to subscribe again for
+        every event. The events arrive on a separate connection so that they never get
+        mixed up with replies to our commands.
+        """
+        event_queue: queue.Queue = queue.Queue()
+        event_connection = i3ipc.Connection()
+        for event in events:
+            event_connection.on(
+                event,
+                lambda connection, event: event_queue.put(event),
+            )
+        threading.Thread(target=event_connection.main, daemon=True).start()
+        return event_queue
 
-    def sleep_until_event(self, event: i3ipc.events.IpcBaseEvent) -> None:
-        """Sleep until a certain IPC event is detected"""
+    def sleep_until_event(
+        self, event: i3ipc.events.IpcBaseEvent
+    ) -> i3ipc.events.IpcBaseEvent:
+        """Sleep until a certain IPC event is detected, then return it"""
+        received_events = []
 
         def wake_up(
             connection: i3ipc.connection.Connection, event: i3ipc.events.IpcBaseEvent
         ) -> None:
             """Callback function that ends the sleep"""
             logging.debug(f"detected {event.change} event")
+            received_events.append(event)
             connection.main_quit()
 
         # set up the wakeup callback
@@ -51,70 +112,289 @@ class Sway(interfaces.TilingWindowManager):
         self._sway.main()
         # unsubscribe the handler so we don't have anything hanging around
         self._sway.off(wake_up)
+        return received_events[0]
 
     def make_window(self, window_details: dtos.WindowDetails) -> None:
         """Create a window then mark it"""
         logging.debug(f"creating window with command {window_details.command}")
-        self._sway.command(f"exec {window_details.command}")
-        self.sleep_until_event(NEW_WINDOW_EVENT)
+        if window_details.mark in self._prelaunched:
+            self._place_prelaunched_window(window_details)
+            return
+        if self._launcher is not None:
+            self._make_supervised_window(self._launcher, window_details)
+            return
+        if _has_probes(window_details):
+            logging.warning(
+                f"readiness probes for {window_details.mark} only run with a launcher"
+            )
+        if self._new_window_events is not None:
+            # forget about windows that were opened before this one
+            while not self._new_window_events.empty():
+                self._new_window_events.get_nowait()
+        self._send(sway_commands.exec_(window_details.command))
+        # the event already tells us which container the window is in, and sway always
+        # focuses new windows
+        self._focused_con_id = self._wait_for_new_window().id
         logging.debug(f"marking window with mark {window_details.mark}")
-        self._get_focused_window().command(f"mark {window_details.mark}")
-        time.sleep(MARK_SLEEP_TIME)
+        self._mark(self._focused_con_id, window_details.mark)
+
+    def _wait_for_new_window(self) -> i3ipc.Con:
+        """Wait for the next window to open, skipping hidden windows because they
+        belong to a warm pool
+        """
+        while True:
+            if self._new_window_events is None:
+                new_window_event = self.sleep_until_event(NEW_WINDOW_EVENT)
+            else:
+                new_window_event = self._new_window_events.get()
+            if new_window_event.container.app_id != sway_commands.HIDDEN_APP_ID:
+                return new_window_event.container
+
+    def spawn_hidden(self, command: str) -> int:
+        """Start a client whose window goes straight to the scratchpad"""
+        if self._new_window_events is None:
+            self._new_window_events = self._subscribe(NEW_WINDOW_EVENT)
+        if not self._hiding_windows:
+            for hide_command in sway_commands.hide_new_windows(
+                sway_commands.HIDDEN_APP_ID
+            ):
+                self._run(hide_command)
+            self._hiding_windows = True
+        self._send(sway_commands.exec_(command))
+        deadline = time.monotonic() + launcher.DEFAULT_READY_TIMEOUT
+        while True:
+            try:
+                new_window_event = self._new_window_events.get(
+                    timeout=max(0, deadline - time.monotonic())
+                )
+            except queue.Empty:
+                raise RuntimeError(
+                    f"{command} didn't open a hidden window in time"
+                ) from None
+            if new_window_event.container.app_id == sway_commands.HIDDEN_APP_ID:
+                return new_window_event.container.id
+
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        """Start a client from a workspace of its own. Sway sends the windows of the
+        client and its children there even after we've left it, so they stay out of
+        the layout until it's their turn
+        """
+        if self._window_events is None:
+            self._window_events = self._subscribe(i3ipc.Event.WINDOW)
+        logging.debug(f"starting {window_details.mark} early")
+        self._run(
+            sway_commands.exec_on_workspace(
+                sway_commands.prelaunch_workspace(window_details.mark),
+                window_details.command,
+            )
+        )
+        self._prelaunched.add(window_details.mark)
+
+    def _place_prelaunched_window(self, window_details: dtos.WindowDetails) -> None:
+        self._prelaunched.discard(window_details.mark)
+        ready_timeout = window_details.ready_timeout or launcher.DEFAULT_READY_TIMEOUT
+        deadline = time.monotonic() + ready_timeout
+        if self._window_events is None:
+            self._window_events = self._subscribe(i3ipc.Event.WINDOW)
+        container = self._wait_for_prelaunched_window(
+            window_details, self._window_events, deadline
+        )
+        # going through the scratchpad puts the window next to the focused container
+        self._run(sway_commands.hide(container.id))
+        self.adopt_window(container.id, window_details)
+        if self._launcher is not None and _has_probes(window_details):
+            self._launcher.wait_until_ready(
+                window_details, container, self._window_events, deadline
+            )
+
+    def _wait_for_prelaunched_window(
+        self,
+        window_details: dtos.WindowDetails,
+        window_events: queue.Queue,
+        deadline: float,
+    ) -> i3ipc.Con:
+        """Wait for a window to open on the client's own workspace. Window events
+        only tell us when to look again
+        """
+        workspace_name = sway_commands.prelaunch_workspace(window_details.mark)
+        while True:
+            while not window_events.empty():
+                window_events.get_nowait()
+            for workspace in self._sway.get_tree().workspaces():
+                if workspace.name == workspace_name and workspace.leaves():
+                    return workspace.leaves()[0]
+            try:
+                window_events.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise RuntimeError(
+                    f"{window_details.mark} was started early but never opened a"
+                    + " window"
+                ) from None
 
-    def focus(self, target_window: dtos.WindowDetails) -> i3ipc.Con:
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        """Bring a window out of the scratchpad. Tiling it puts it next to the
+        container that we last focused, just like a new window
+        """
+        logging.debug(f"adopting window {con_id} as {window_details.mark}")
+        self._run(sway_commands.show_hidden(con_id))
+        self._run(sway_commands.tile(con_id))
+        self._focused_con_id = con_id
+        self._mark(con_id, window_details.mark)
+
+    def get_con_ids(self, marks: Iterable[str]) -> Dict[str, int]:
+        # a fresh index also picks up marks that other clients added
+        self._marks = mark_index.MarkIndex(self._get_all_nodes())
+        return {mark: self._marks.get(mark) for mark in marks if mark in self._marks}
+
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        self._run_all(sway_commands.hide(con_id) for con_id in con_ids)
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        self._run_all(sway_commands.kill(con_id) for con_id in con_ids)
+
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        wanted = None if con_ids is None else set(con_ids)
+        return {
+            node.id: node.pid
+            for node in self._get_all_nodes()
+            if (wanted is None or node.id in wanted) and node.pid
+        }
+
+    def _make_supervised_window(
+        self, client_launcher: launcher.Launcher, window_details: dtos.WindowDetails
+    ) -> None:
+        """Launch the client ourselves, mark the window that its process opens, then
+        wait for it to be ready
+        """
+        if self._window_events is None:
+            self._window_events = self._subscribe(i3ipc.Event.WINDOW)
+        while not self._window_events.empty():
+            self._window_events.get_nowait()
+        ready_timeout = window_details.ready_timeout or launcher.DEFAULT_READY_TIMEOUT
+        deadline = time.monotonic() + ready_timeout
+        pid = client_launcher.launch(window_details.command)
+        container = client_launcher.wait_for_window(pid, self._window_events, deadline)
+        self._focused_con_id = container.id
+        logging.debug(f"marking window with mark {window_details.mark}")
+        self._mark(container.id, window_details.mark)
+        client_launcher.wait_until_ready(
+            window_details, container, self._window_events, deadline
+        )
+
+    def focus(self, target_window: dtos.WindowDetails) -> None:
         logging.debug(f"focusing window with mark {target_window.mark}")
-        window = self._get_window(target_window.mark)
-        window.command("focus")
+        con_id = self._get_con_id(target_window.mark)
+        self._run(sway_commands.focus(con_id))
+        self._focused_con_id = con_id
         time.sleep(FOCUS_SLEEP_TIME)
-        return window
 
     def split_and_mark_parent(self, split_type: str, mark: str) -> None:
+        """Split the focused container and mark the container that the split creates.
+        Each command targets a container by id so that focus never has to move
+        """
         logging.debug(
             f"splitting the parent of the focused node and marking the container with {mark}"
         )
-        focused = self._get_focused_window()
-        if split_type == "vertical":
-            focused.command("split vertical")
-        elif split_type == "horizontal":
-            focused.command("split horizontal")
-        else:
+        if split_type not in ("vertical", "horizontal"):
             raise RuntimeError(f"invalid split type: {split_type}")
+        if self._focused_con_id is None:
+            self._focused_con_id = self._get_focused_window().id
+        self._run(sway_commands.split(self._focused_con_id, split_type))
         time.sleep(SPLIT_SLEEP_TIME)
-        focused.command("focus parent")
-        time.sleep(FOCUS_SLEEP_TIME)
-        parent = self._get_focused_window()
-        parent.command(f"mark {mark}")
-        time.sleep(MARK_SLEEP_TIME)
-        # need to give focus back to the window that we just focused
-        focused.command("focus")
-        time.sleep(FOCUS_SLEEP_TIME)
+        self._mark(self._get_parent_id(self._focused_con_id), mark)
+
+    def _get_parent_id(self, con_id: int) -> int:
+        parent: Any
+        if self._lean_ipc is not None:
+            parent = sway_ipc.find_parent(self._lean_ipc.get_tree(), con_id)
+        else:
+            container = self._sway.get_tree().find_by_id(con_id)
+            parent = container.parent if container is not None else None
+        if parent is None:
+            raise RuntimeError("The focused window closed while it was being split")
+        return parent.id
 
     def resize_width(
         self, target_window: dtos.WindowDetails, section_percentage: int
     ) -> None:
-        window = self.focus(target_window)
-        time.sleep(FOCUS_SLEEP_TIME)
-        window.command(f"resize set width {section_percentage} ppt")
+        con_id = self._get_con_id(target_window.mark)
+        self._run(sway_commands.resize(con_id, "width", section_percentage))
 
     def resize_height(
         self, target_window: dtos.WindowDetails, section_percentage: int
     ) -> None:
-        window = self.focus(target_window)
-        time.sleep(FOCUS_SLEEP_TIME)
-        window.command(f"resize set height {section_percentage} ppt")
+        con_id = self._get_con_id(target_window.mark)
+        self._run(sway_commands.resize(con_id, "height", section_percentage))
 
-    def get_window_sizes(self) -> Dict[Tuple, Dict[str, float]]:
+    def get_window_sizes(
+        self, workspace_name: Optional[str] = None
+    ) -> Dict[Tuple, Dict[str, float]]:
         return {
             tuple(window.marks): {
                 "width": window.window_rect.width,
                 "height": window.window_rect.height,
             }
-            for window in self._get_windows_in_current_workspace()
+            for window in self.get_windows(workspace_name)
         }
 
-    def get_tree(self) -> List:
-        current_workspace = self._get_focused_window().workspace()
-        return current_workspace.descendants()
+    def get_tree(self, workspace_name: Optional[str] = None) -> Iterator[i3ipc.Con]:
+        # iterating over a container walks its descendants breadth-first without
+        # copying them into a list first
+        return iter(self._get_workspace(workspace_name))
+
+    def get_windows(self, workspace_name: Optional[str] = None) -> Iterator[i3ipc.Con]:
+        return (
+            node
+            for node in self._get_workspace(workspace_name)
+            if node.type == "con" and not node.nodes
+        )
+
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        focused_workspace = ""
+        windows = []
+        for workspace in self._sway.get_tree().workspaces():
+            if workspace.focused:
+                focused_workspace = workspace.name
+            # walk each workspace once, picking up its windows and noticing whether
+            # it holds the focused container along the way
+            for node in workspace:
+                if node.focused:
+                    focused_workspace = workspace.name
+                if node.type == "con" and not node.nodes:
+                    windows.append(
+                        dtos.WindowGeometry(
+                            id=node.id,
+                            workspace=workspace.name,
+                            marks=tuple(node.marks),
+                            width=node.window_rect.width,
+                            height=node.window_rect.height,
+                        )
+                    )
+        return dtos.GeometrySnapshot(focused_workspace, windows)
+
+    def wait_for_tree_change(self) -> None:
+        if self._tree_change_events is None:
+            self._tree_change_events = self._subscribe(*TREE_CHANGE_EVENTS)
+        self._tree_change_events.get()
+        # a single action can send a burst of events, so only report it once
+        while not self._tree_change_events.empty():
+            self._tree_change_events.get_nowait()
+
+    def _get_workspace(self, workspace_name: Optional[str]) -> i3ipc.Con:
+        if workspace_name is None:
+            return _find_focused_workspace(self._sway.get_tree())
+        for workspace in self._sway.get_tree().workspaces():
+            if workspace.name == workspace_name:
+                return workspace
+        raise RuntimeError(f"There is no workspace named {workspace_name}")
+
+    def get_workspace_snapshot(self) -> dtos.ContainerSnapshot:
+        """Capture the tiling containers in the current workspace. Floating windows
+        aren't part of a layout, so they're left out
+        """
+        if self._lean_ipc is not None:
+            return _snapshot(self._lean_ipc.get_focused_workspace())
+        return _snapshot(_find_focused_workspace(self._sway.get_tree()))
 
     def _get_focused_window(self) -> i3ipc.Con:
         tree = self._sway.get_tree()
@@ -123,46 +403,113 @@ class Sway(interfaces.TilingWindowManager):
             raise RuntimeError("There is no focused window")
         return focused
 
-    def _get_window(self, mark: str) -> i3ipc.Con:
-        tree = self._sway.get_tree()
-        windows = tree.find_marked(mark)
-        logging.debug(f'searching for mark "{mark}"')
-        logging.debug(f"windows are {windows}")
-        if len(windows) > 1:
-            raise RuntimeError(
-                f'There is more than 1 window that matches the regex "{mark}"'
-            )
-        if len(windows) < 1:
-            raise RuntimeError(f'There are no windows that matches the regex "{mark}"')
-        return windows[0]
+    def _mark(self, con_id: int, mark: str) -> None:
+        self._run(sway_commands.mark(con_id, mark))
+        time.sleep(MARK_SLEEP_TIME)
+        if self._marks is not None:
+            self._marks.add(mark, con_id)
 
-    def _get_windows_in_current_workspace(self) -> List[i3ipc.Con]:
-        current_workspace_num = self._get_current_workspace_num()
-        windows_in_current_workspace = []
-        for section in self._sway.get_tree().leaves():
-            logging.debug(
-                f'"{section.name}" is in workspace {section.workspace().num} with '
-                + f'marks "{section.marks}"'
-            )
-            if section.workspace().num == current_workspace_num:
-                windows_in_current_workspace.append(section)
-        return windows_in_current_workspace
+    def _get_con_id(self, mark: str) -> int:
+        """Look up a mark in the index. Someone else may have added the mark since we
+        built the index, so build it again before giving up
+        """
+        if self._marks is None or mark not in self._marks:
+            self._marks = mark_index.MarkIndex(self._get_all_nodes())
+            logging.debug("indexed %d marks", len(self._marks))
+        return self._marks.get(mark)
 
-    def _get_current_workspace_num(self) -> i3ipc.Con:
-        workspaces = self._sway.get_workspaces()
-        for workspace in workspaces:
-            if workspace.focused:
-                if workspace.num == -1:
-                    raise RuntimeError("The current workspace is a named workspace")
-                return workspace.num
-        else:
-            raise RuntimeError("There is no current workspace")
+    def _get_all_nodes(self) -> Iterator[Any]:
+        """Walk every container in the tree. Only their ids, marks, and pids are
+        the same for both IPC clients
+        """
+        if self._lean_ipc is not None:
+            return sway_ipc.walk(self._lean_ipc.get_tree())
+        return iter(self._sway.get_tree())
+
+    def _send(self, command: str) -> List[Any]:
+        if self._lean_ipc is not None:
+            return self._lean_ipc.command(command)
+        return self._sway.command(command)
+
+    def _run(self, command: str) -> None:
+        for reply in self._send(command):
+            if not reply.success:
+                raise RuntimeError(f"sway failed to run `{command}`: {reply.error}")
+
+    def _run_all(self, commands: Iterable[str]) -> None:
+        """Run commands in a single round trip"""
+        command = sway_commands.chain(commands)
+        if command:
+            self._run(command)
+
+    def _get_windows_in_current_workspace(self) -> List[i3ipc.Con]:
+        # only walk the focused workspace instead of every window on every output
+        current_workspace = self._get_workspace(None)
+        windows = current_workspace.leaves()
+        logging.debug(
+            "%d windows are in workspace %s", len(windows), current_workspace.name
+        )
+        return windows
 
     @property
     def num_workspace_windows(self) -> int:
-        """Get the number of windows open on the current workspace
-
-        The current workspace must not be a "named workspace"
-        https://i3ipc-python.readthedocs.io/en/latest/replies.html#i3ipc.WorkspaceReply
-        """
+        """Get the number of windows open on the current workspace"""
+        if self._lean_ipc is not None:
+            return len(sway_ipc.leaves(self._lean_ipc.get_focused_workspace()))
         return len(self._get_windows_in_current_workspace())
+
+    def switch_workspace(self, workspace_name: str) -> None:
+        logging.debug(f"switching to workspace {workspace_name}")
+        self._send(sway_commands.workspace(workspace_name))
+
+    def focus_output(self, output_name: str) -> None:
+        logging.debug(f"focusing output {output_name}")
+        self._send(sway_commands.focus_output(output_name))
+
+
+def _find_focused_workspace(root: i3ipc.Con) -> i3ipc.Con:
+    """Follow each container's most recently focused child from the root down to the
+    focused workspace, the same way as `sway_ipc.find_focused_workspace`, so that we
+    never look at the windows on other workspaces
+    """
+    node = root
+    while node.type != "workspace":
+        focus = node.focus or [None]
+        for child in node.nodes:
+            if child.id == focus[0]:
+                node = child
+                break
+        else:
+            raise RuntimeError("There is no focused workspace")
+    return node
+
+
+def _snapshot(container: Union[i3ipc.Con, dtos.SwayNode]) -> dtos.ContainerSnapshot:
+    """Works with both i3ipc's containers and the lean IPC client's nodes"""
+    if container.type == "con" and not container.nodes:
+        return dtos.ContainerSnapshot(
+            split=None,
+            width=container.rect.width,
+            height=container.rect.height,
+            marks=tuple(container.marks),
+            pid=container.pid,
+            app_name=container.app_id or container.window_class,
+        )
+    split = LAYOUT_SPLITS.get(container.layout or "")
+    if split is None:
+        logging.warning(f"treating {container.layout} layout as a horizontal split")
+        split = "horizontal"
+    return dtos.ContainerSnapshot(
+        split=split,
+        width=container.rect.width,
+        height=container.rect.height,
+        marks=tuple(container.marks),
+        children=tuple(_snapshot(child) for child in container.nodes),
+    )
+
+
+def _has_probes(window_details: dtos.WindowDetails) -> bool:
+    return (
+        window_details.ready_title is not None
+        or window_details.ready_socket is not None
+    )
@@ -0,0 +1,86 @@
+from typing import Iterable, List
+
+# The commands that we send to sway. They live here so that a dry run can print
+# exactly what a real run would send without connecting to sway.
+
+# clients that are started hidden give their windows this app id. Sway moves them to
+# the scratchpad as soon as they open
+HIDDEN_APP_ID = "rezide-hidden"
+# clients that start early open their windows on a workspace of their own
+PRELAUNCH_WORKSPACE = "rezide-prelaunch-{mark}"
+
+
+def quote(argument: str) -> str:
+    """Quote an argument so that sway reads it as a single word"""
+    escaped = argument.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def exec_(command: str) -> str:
+    return f"exec {command}"
+
+
+def exec_on_workspace(workspace_name: str, command: str) -> str:
+    """Start a client from another workspace without staying there. Sway remembers
+    where it was started, so its windows open on that workspace however late they map
+    """
+    return chain(
+        [workspace(workspace_name), exec_(command), "workspace back_and_forth"]
+    )
+
+
+def prelaunch_workspace(mark_name: str) -> str:
+    return PRELAUNCH_WORKSPACE.format(mark=mark_name)
+
+
+def mark(con_id: int, mark_name: str) -> str:
+    return f"[con_id={con_id}] mark {quote(mark_name)}"
+
+
+def focus(con_id: int) -> str:
+    return f"[con_id={con_id}] focus"
+
+
+def split(con_id: int, split_type: str) -> str:
+    return f"[con_id={con_id}] split {split_type}"
+
+
+def resize(con_id: int, dimension: str, section_percentage: int) -> str:
+    return f"[con_id={con_id}] resize set {dimension} {section_percentage} ppt"
+
+
+def workspace(workspace_name: str) -> str:
+    return f"workspace {quote(workspace_name)}"
+
+
+def focus_output(output_name: str) -> str:
+    return f"focus output {quote(output_name)}"
+
+
+def hide_new_windows(app_id: str) -> List[str]:
+    """Send new windows with this app id to the scratchpad without focusing them"""
+    criteria = f"[app_id={quote('^' + app_id + '$')}]"
+    return [f"no_focus {criteria}", f"for_window {criteria} move scratchpad"]
+
+
+def show_hidden(con_id: int) -> str:
+    return f"[con_id={con_id}] scratchpad show"
+
+
+def tile(con_id: int) -> str:
+    return f"[con_id={con_id}] floating disable"
+
+
+def hide(con_id: int) -> str:
+    return f"[con_id={con_id}] move scratchpad"
+
+
+def kill(con_id: int) -> str:
+    return f"[con_id={con_id}] kill"
+
+
+def chain(commands: Iterable[str]) -> str:
+    """Join commands so that sway runs them all from one message. Each command keeps
+    its own criteria
+    """
+    return "; ".join(commands)
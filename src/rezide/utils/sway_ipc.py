@@ -0,0 +1,181 @@
+import collections
+import itertools
+import json
+import os
+import socket
+import struct
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from rezide.utils import dtos
+
+# A small client for sway's IPC protocol. i3ipc turns every GET_TREE reply into a
+# graph of containers that link to their parents and carry every attribute that sway
+# sends, even when we only want to find one mark. This client reads each reply into
+# one buffer that it reuses, decodes it with orjson when it's installed, and only keeps
+# the fields that rezide reads.
+#
+# Every message starts with the magic string, the payload's length, and the message
+# type. The integers use the machine's byte order:
+# https://man.archlinux.org/man/sway-ipc.7
+
+MAGIC = b"i3-ipc"
+HEADER = struct.Struct("=6sII")
+RUN_COMMAND = 0
+GET_TREE = 4
+# big enough for the trees of most desktops, so the buffer rarely has to grow
+INITIAL_BUFFER_SIZE = 64 * 1024
+
+_Payload = Union[bytes, bytearray, memoryview]
+
+try:
+    import orjson
+
+    # orjson reads straight out of the buffer
+    loads: Callable[[_Payload], Any] = orjson.loads
+except ImportError:  # pragma: no cover
+
+    def loads(payload: _Payload) -> Any:
+        return json.loads(bytes(payload))
+
+
+NO_RECT = dtos.Rect(0, 0, 0, 0)
+
+
+def socket_path() -> str:
+    path = os.environ.get("SWAYSOCK") or os.environ.get("I3SOCK")
+    if not path:
+        raise RuntimeError("Couldn't find sway's IPC socket. Is SWAYSOCK set?")
+    return path
+
+
+def connect(path: Optional[str] = None) -> "Connection":
+    sway_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sway_socket.connect(path or socket_path())
+    return Connection(sway_socket)
+
+
+class Connection(object):
+    def __init__(self, sway_socket: socket.socket) -> None:
+        self._socket = sway_socket
+        self._header = bytearray(HEADER.size)
+        self._buffer = bytearray(INITIAL_BUFFER_SIZE)
+
+    def command(self, command: str) -> List[dtos.CommandReply]:
+        """Run one or more commands, separated by semicolons"""
+        return [
+            dtos.CommandReply(reply["success"], reply.get("error"))
+            for reply in self._request(RUN_COMMAND, command.encode())
+        ]
+
+    def get_tree(self) -> dtos.SwayNode:
+        return self._request(GET_TREE, b"", parse_node)
+
+    def get_focused_workspace(self) -> dtos.SwayNode:
+        """Get the focused workspace without building nodes for the rest of the tree"""
+        return self._request(
+            GET_TREE, b"", lambda data: parse_node(find_focused_workspace(data))
+        )
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def _request(
+        self,
+        message_type: int,
+        payload: bytes,
+        parse: Callable[[Any], Any] = lambda reply: reply,
+    ) -> Any:
+        self._socket.sendall(HEADER.pack(MAGIC, len(payload), message_type) + payload)
+        self._read_into(memoryview(self._header))
+        magic, length, reply_type = HEADER.unpack_from(self._header)
+        if magic != MAGIC:
+            raise RuntimeError(f"sway sent a reply that doesn't start with {MAGIC!r}")
+        if reply_type != message_type:
+            raise RuntimeError(
+                f"sway replied to message {message_type} with message {reply_type}"
+            )
+        if length > len(self._buffer):
+            # replace the buffer instead of resizing it so that old views can't stop us
+            self._buffer = bytearray(max(length, 2 * len(self._buffer)))
+        with memoryview(self._buffer) as view:
+            reply = view[:length]
+            self._read_into(reply)
+            return parse(loads(reply))
+
+    def _read_into(self, view: memoryview) -> None:
+        while view:
+            num_bytes = self._socket.recv_into(view)
+            if num_bytes == 0:
+                raise RuntimeError("sway closed the IPC connection")
+            view = view[num_bytes:]
+
+
+def parse_node(data: Dict[str, Any]) -> dtos.SwayNode:
+    return dtos.SwayNode(
+        id=data["id"],
+        type=data["type"],
+        name=data.get("name"),
+        marks=tuple(data.get("marks", ())),
+        focused=data.get("focused", False),
+        layout=data.get("layout"),
+        pid=data.get("pid"),
+        app_id=data.get("app_id"),
+        window_class=(data.get("window_properties") or {}).get("class"),
+        rect=_parse_rect(data.get("rect")),
+        window_rect=_parse_rect(data.get("window_rect")),
+        nodes=tuple(parse_node(child) for child in data.get("nodes", ())),
+        floating_nodes=tuple(
+            parse_node(child) for child in data.get("floating_nodes", ())
+        ),
+    )
+
+
+def find_focused_workspace(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Find the focused workspace in a decoded GET_TREE reply. Each container lists
+    its children's ids with the most recently focused one first, so we only have to
+    follow the first id from the root down to an output and then to its workspace
+    """
+    node = data
+    while node["type"] != "workspace":
+        focus = node.get("focus") or [None]
+        for child in node.get("nodes", ()):
+            if child["id"] == focus[0]:
+                node = child
+                break
+        else:
+            raise RuntimeError("There is no focused workspace")
+    return node
+
+
+def _parse_rect(data: Optional[Dict[str, int]]) -> dtos.Rect:
+    if data is None:
+        return NO_RECT
+    return dtos.Rect(data["x"], data["y"], data["width"], data["height"])
+
+
+def walk(root: dtos.SwayNode) -> Iterator[dtos.SwayNode]:
+    """Walk the root's descendants breadth-first, like iterating over an i3ipc
+    container does
+    """
+    node_queue = collections.deque([root])
+    while node_queue:
+        node = node_queue.popleft()
+        for child in node.nodes + node.floating_nodes:
+            yield child
+            node_queue.append(child)
+
+
+def leaves(root: dtos.SwayNode) -> List[dtos.SwayNode]:
+    """Get the windows below the root, leaving out floating windows just like i3ipc"""
+    return [node for node in walk(root) if node.type == "con" and not node.nodes]
+
+
+def find_by_id(root: dtos.SwayNode, con_id: int) -> Optional[dtos.SwayNode]:
+    return next((node for node in walk(root) if node.id == con_id), None)
+
+
+def find_parent(root: dtos.SwayNode, con_id: int) -> Optional[dtos.SwayNode]:
+    for node in itertools.chain([root], walk(root)):
+        if any(child.id == con_id for child in node.nodes + node.floating_nodes):
+            return node
+    return None
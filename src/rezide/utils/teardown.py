@@ -0,0 +1,99 @@
+import logging
+import os
+import signal
+import time
+from typing import Callable, Dict, List
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+
+# `rzd close` asks every window in a layout to close with one batched command. Windows
+# get a while to close on their own, for example to ask about unsaved changes. With
+# --force, the processes of windows that are still open get SIGTERM after that, and
+# SIGKILL if their windows still don't close. A process that also owns windows outside
+# of the layout, like a terminal or editor server, is never killed.
+
+DEFAULT_TIMEOUT = 5.0
+POLL_INTERVAL = 0.05
+
+
+class LayoutCloser(object):
+    def __init__(
+        self,
+        window_manager: interfaces.TilingWindowManager,
+        kill_process: Callable[[int, int], None] = os.kill,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._window_manager = window_manager
+        self._kill_process = kill_process
+        self._clock = clock
+        self._sleep = sleep
+
+    def close(
+        self, marks: List[str], timeout: float = DEFAULT_TIMEOUT, force: bool = False
+    ) -> dtos.TeardownReport:
+        """Close the windows with these marks and wait for them to go away"""
+        con_ids = self._window_manager.get_con_ids(marks)
+        missing = [mark for mark in marks if mark not in con_ids]
+        self._window_manager.close_windows(con_ids.values())
+        survivors = self._wait_for_windows(con_ids, timeout)
+        if survivors and force:
+            survivors = self._kill_survivors(survivors, timeout)
+        closed = [mark for mark in con_ids if mark not in survivors]
+        return dtos.TeardownReport(closed, list(survivors), missing)
+
+    def _wait_for_windows(
+        self, con_ids: Dict[str, int], timeout: float
+    ) -> Dict[str, int]:
+        """Wait for windows to close. Returns the windows that are still open"""
+        if not con_ids:
+            return dict()
+        deadline = self._clock() + timeout
+        while True:
+            # marks can move to other windows, so only the same containers count
+            still_open = {
+                mark: con_id
+                for mark, con_id in self._window_manager.get_con_ids(con_ids).items()
+                if con_ids[mark] == con_id
+            }
+            if not still_open or self._clock() >= deadline:
+                return still_open
+            self._sleep(POLL_INTERVAL)
+
+    def _kill_survivors(
+        self, survivors: Dict[str, int], timeout: float
+    ) -> Dict[str, int]:
+        """Stop the processes of windows that are still open, first politely. Returns
+        the windows that are still open after that
+        """
+        window_pids = self._window_manager.get_pids()
+        survivor_con_ids = set(survivors.values())
+        shared_pids = {
+            pid for con_id, pid in window_pids.items() if con_id not in survivor_con_ids
+        }
+        pids: Dict[str, int] = dict()
+        for mark, con_id in survivors.items():
+            pid = window_pids.get(con_id)
+            if pid in shared_pids:
+                logging.warning(
+                    f"not killing {mark}: process {pid} has windows outside the layout"
+                )
+            elif pid is not None:
+                pids[mark] = pid
+        for signal_number in (signal.SIGTERM, signal.SIGKILL):
+            survivor_pids = {pids[mark] for mark in survivors if mark in pids}
+            if not survivor_pids:
+                break
+            for pid in sorted(survivor_pids):
+                logging.info(f"sending {signal_number.name} to process {pid}")
+                self._kill(pid, signal_number)
+            survivors = self._wait_for_windows(survivors, timeout)
+        return survivors
+
+    def _kill(self, pid: int, signal_number: int) -> None:
+        try:
+            self._kill_process(pid, signal_number)
+        except ProcessLookupError:
+            # it exited on its own in the meantime
+            pass
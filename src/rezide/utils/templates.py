@@ -0,0 +1,135 @@
+import collections
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+from rezide.utils import tree
+
+# Layouts can leave parts of their windows' strings to be filled in when they're
+# opened, so that one layout works for many projects:
+#
+#   [editor]
+#   command = "alacritty --working-directory {{repo}} -e kak"
+#
+#   rzd open ide --param repo=~/workspace/rezide
+#
+# Values are pasted in exactly as they're given, so quote them in the command if they
+# might contain spaces.
+
+PARAMETER_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+PLACEHOLDER = re.compile(r"\{\{\s*(" + PARAMETER_NAME.pattern + r")\s*\}\}")
+TEMPLATED_FIELDS = ("command", "ready_title", "ready_socket", "terminal_command")
+# the daemon keeps templates for as long as it runs, so only the most recently used
+# sets of parameters stay filled in
+MAX_EXPANSIONS = 64
+
+# literal text at even indexes and parameter names at odd indexes
+_Pieces = Tuple[str, ...]
+# parameters sorted by name
+_ParamKey = Tuple[Tuple[str, str], ...]
+
+
+class _WindowPlan(NamedTuple):
+    details: dtos.WindowDetails
+    # only the fields that have placeholders in them
+    fields: Dict[str, _Pieces]
+
+
+class _SectionPlan(NamedTuple):
+    split: str
+    sizes: List[int]
+    children: List["_Plan"]
+
+
+_Plan = Union[_WindowPlan, _SectionPlan]
+
+
+def parse_params(pairs: Iterable[str]) -> Dict[str, str]:
+    """Parse parameters from strings like `name=value`"""
+    params = dict()
+    for pair in pairs:
+        name, separator, value = pair.partition("=")
+        if not separator or not PARAMETER_NAME.fullmatch(name):
+            raise RuntimeError(f"Parameters must look like name=value: {pair}")
+        params[name] = value
+    return params
+
+
+class LayoutTemplate(object):
+    """A validated layout whose placeholders are found once, up front. Filling it in
+    only copies the tree and joins strings, and the `max_expansions` most recently
+    used sets of parameters are only filled in once
+    """
+
+    def __init__(
+        self, tree_: interfaces.TreeNodeInterface, max_expansions: int = MAX_EXPANSIONS
+    ) -> None:
+        self._tree = tree_
+        self._names: Set[str] = set()
+        self._plan = self._compile(tree_)
+        self._max_expansions = max_expansions
+        self._expanded: collections.OrderedDict[
+            _ParamKey, interfaces.TreeNodeInterface
+        ] = collections.OrderedDict()
+
+    @property
+    def parameter_names(self) -> Set[str]:
+        return set(self._names)
+
+    def expand(self, params: Dict[str, str]) -> interfaces.TreeNodeInterface:
+        """Get the tree with every placeholder filled in"""
+        missing_names = self._names - params.keys()
+        if missing_names:
+            raise RuntimeError(
+                f"This layout needs values for these parameters: {sorted(missing_names)}"
+            )
+        unknown_names = params.keys() - self._names
+        if unknown_names:
+            raise RuntimeError(
+                f"This layout doesn't have these parameters: {sorted(unknown_names)}"
+            )
+        if not self._names:
+            return self._tree
+        param_key = tuple(sorted(params.items()))
+        if param_key not in self._expanded:
+            self._expanded[param_key] = _expand(self._plan, params)
+            if len(self._expanded) > self._max_expansions:
+                self._expanded.popitem(last=False)
+        self._expanded.move_to_end(param_key)
+        return self._expanded[param_key]
+
+    def _compile(self, node: interfaces.TreeNodeInterface) -> _Plan:
+        if isinstance(node, tree.Section):
+            return _SectionPlan(
+                node.data,
+                node.child_sizes,
+                [self._compile(child) for child in node.children],
+            )
+        fields = dict()
+        for field in TEMPLATED_FIELDS:
+            value = getattr(node.data, field)
+            if value is None:
+                continue
+            pieces = tuple(PLACEHOLDER.split(value))
+            if len(pieces) > 1:
+                fields[field] = pieces
+                self._names.update(pieces[1::2])
+        return _WindowPlan(node.data, fields)
+
+
+def _expand(
+    plan: _Plan, params: Dict[str, str], parent: Optional[tree.Section] = None
+) -> tree.TreeNode:
+    if isinstance(plan, _SectionPlan):
+        section = tree.Section(plan.split, plan.sizes, parent=parent)
+        for child in plan.children:
+            _expand(child, params, parent=section)
+        return section
+    filled_in: Dict[str, Any] = {
+        field: "".join(
+            params[piece] if index % 2 else piece for index, piece in enumerate(pieces)
+        )
+        for field, pieces in plan.fields.items()
+    }
+    return tree.Window(plan.details._replace(**filled_in), parent=parent)
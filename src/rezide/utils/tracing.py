@@ -0,0 +1,218 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+
+# Traces are written in the Chrome trace-event format so that they can be opened in
+# Perfetto (https://ui.perfetto.dev) or chrome://tracing
+# https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+
+
+class Tracer(object):
+    """Records how long each step of a run takes"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._events: List[Dict[str, Any]] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        """Record the time spent inside of the `with` block as a complete event"""
+        start = self._clock()
+        try:
+            yield
+        except BaseException as error:
+            args["error"] = type(error).__name__
+            raise
+        finally:
+            end = self._clock()
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start * 1_000_000,
+                    "dur": (end - start) * 1_000_000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        return self._events
+
+    def to_json(self) -> str:
+        process_name = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "args": {"name": "rezide"},
+        }
+        return json.dumps(
+            {"traceEvents": [process_name] + self._events, "displayTimeUnit": "ms"}
+        )
+
+    def write(self, filestore: interfaces.FileStore, path: str) -> None:
+        filestore.write_file(path, self.to_json())
+
+
+class TracingConfigReader(interfaces.ConfigReader):
+    def __init__(self, config_reader: interfaces.ConfigReader, tracer: Tracer) -> None:
+        self._config_reader = config_reader
+        self._tracer = tracer
+
+    def read(self, path: str) -> Dict:
+        with self._tracer.span("parse", "config", path=path):
+            return self._config_reader.read(path)
+
+
+class TracingConfigParser(interfaces.ConfigParserInterface):
+    def __init__(
+        self, config_parser: interfaces.ConfigParserInterface, tracer: Tracer
+    ) -> None:
+        self._config_parser = config_parser
+        self._tracer = tracer
+
+    def validate(self) -> None:
+        with self._tracer.span("validate", "config"):
+            self._config_parser.validate()
+
+    def get_tree(self) -> interfaces.TreeNodeInterface:
+        with self._tracer.span("get_tree", "config"):
+            return self._config_parser.get_tree()
+
+
+class TracingTreeFactory(interfaces.TreeFactoryInterface):
+    def __init__(
+        self, tree_factory: interfaces.TreeFactoryInterface, tracer: Tracer
+    ) -> None:
+        self._tree_factory = tree_factory
+        self._tracer = tracer
+
+    def create_tree(self, root_node: Dict) -> interfaces.TreeNodeInterface:
+        with self._tracer.span("create_tree", "tree"):
+            return self._tree_factory.create_tree(root_node)
+
+
+class TracingWindowManager(interfaces.TilingWindowManager):
+    """Records a span for every call that we make to the window manager"""
+
+    def __init__(
+        self, window_manager: interfaces.TilingWindowManager, tracer: Tracer
+    ) -> None:
+        self._window_manager = window_manager
+        self._tracer = tracer
+        # a pre-launched window only has to be put in place, which doesn't say how
+        # long its client takes to start, so it gets its own span name
+        self._prelaunched: Set[str] = set()
+
+    def make_window(self, window_details: dtos.WindowDetails) -> None:
+        span_name = "make_window"
+        if window_details.mark in self._prelaunched:
+            self._prelaunched.discard(window_details.mark)
+            span_name = "place_prelaunched"
+        with self._tracer.span(
+            span_name,
+            "ipc",
+            mark=window_details.mark,
+            command=window_details.command,
+        ):
+            self._window_manager.make_window(window_details)
+
+    def resize_width(
+        self, target_window: dtos.WindowDetails, section_percentage: int
+    ) -> None:
+        with self._tracer.span("resize_width", "ipc", mark=target_window.mark):
+            self._window_manager.resize_width(target_window, section_percentage)
+
+    def resize_height(
+        self, target_window: dtos.WindowDetails, section_percentage: int
+    ) -> None:
+        with self._tracer.span("resize_height", "ipc", mark=target_window.mark):
+            self._window_manager.resize_height(target_window, section_percentage)
+
+    def focus(self, target_window: dtos.WindowDetails) -> None:
+        with self._tracer.span("focus", "ipc", mark=target_window.mark):
+            self._window_manager.focus(target_window)
+
+    def split_and_mark_parent(self, split_type: str, mark: str) -> None:
+        with self._tracer.span("split_and_mark_parent", "ipc", split=split_type):
+            self._window_manager.split_and_mark_parent(split_type, mark)
+
+    @property
+    def num_workspace_windows(self) -> int:
+        with self._tracer.span("num_workspace_windows", "ipc"):
+            return self._window_manager.num_workspace_windows
+
+    def get_tree(self, workspace_name: Optional[str] = None) -> Iterable:
+        with self._tracer.span("get_tree", "ipc", workspace=workspace_name):
+            return self._window_manager.get_tree(workspace_name)
+
+    def get_windows(self, workspace_name: Optional[str] = None) -> Iterable:
+        with self._tracer.span("get_windows", "ipc", workspace=workspace_name):
+            return self._window_manager.get_windows(workspace_name)
+
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        with self._tracer.span("get_window_geometries", "ipc"):
+            return self._window_manager.get_window_geometries()
+
+    def wait_for_tree_change(self) -> None:
+        with self._tracer.span("wait_for_tree_change", "ipc"):
+            self._window_manager.wait_for_tree_change()
+
+    def get_window_sizes(self, workspace_name: Optional[str] = None) -> Dict:
+        with self._tracer.span("get_window_sizes", "ipc", workspace=workspace_name):
+            return self._window_manager.get_window_sizes(workspace_name)
+
+    def get_workspace_snapshot(self) -> dtos.ContainerSnapshot:
+        with self._tracer.span("get_workspace_snapshot", "ipc"):
+            return self._window_manager.get_workspace_snapshot()
+
+    def switch_workspace(self, workspace_name: str) -> None:
+        with self._tracer.span("switch_workspace", "ipc", workspace=workspace_name):
+            self._window_manager.switch_workspace(workspace_name)
+
+    def focus_output(self, output_name: str) -> None:
+        with self._tracer.span("focus_output", "ipc", output=output_name):
+            self._window_manager.focus_output(output_name)
+
+    def spawn_hidden(self, command: str) -> int:
+        with self._tracer.span("spawn_hidden", "ipc", command=command):
+            return self._window_manager.spawn_hidden(command)
+
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        with self._tracer.span(
+            "prelaunch",
+            "ipc",
+            mark=window_details.mark,
+            command=window_details.command,
+        ):
+            self._window_manager.prelaunch(window_details)
+        self._prelaunched.add(window_details.mark)
+
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        with self._tracer.span("adopt_window", "ipc", mark=window_details.mark):
+            self._window_manager.adopt_window(con_id, window_details)
+
+    def get_con_ids(self, marks: Iterable[str]) -> Dict[str, int]:
+        with self._tracer.span("get_con_ids", "ipc"):
+            return self._window_manager.get_con_ids(marks)
+
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        with self._tracer.span("hide_windows", "ipc"):
+            self._window_manager.hide_windows(con_ids)
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        with self._tracer.span("close_windows", "ipc"):
+            self._window_manager.close_windows(con_ids)
+
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        with self._tracer.span("get_pids", "ipc"):
+            return self._window_manager.get_pids(con_ids)
@@ -0,0 +1,99 @@
+import collections
+import logging
+from typing import Deque, Dict, List, Optional
+
+from rezide.utils import dtos
+from rezide.utils import interfaces
+from rezide.utils import layouts
+
+# `rzd switch` turns one open layout into another without starting clients that are
+# already running. Each window in the new layout takes a window from the old layout
+# with the same reuse key, or the same command if it doesn't have one. The old
+# layout's windows are hidden in the scratchpad, the windows that nobody took are
+# closed, and the new layout adopts the hidden windows instead of opening them again.
+
+
+def reuse_key(window_details: dtos.WindowDetails) -> str:
+    return window_details.reuse or window_details.command
+
+
+def plan_transition(
+    old_windows: List[dtos.WindowDetails], new_windows: List[dtos.WindowDetails]
+) -> dtos.TransitionPlan:
+    """Match windows between two layouts. Windows with the same key are matched in
+    the order that they're opened
+    """
+    available: Dict[str, Deque[str]] = collections.defaultdict(collections.deque)
+    for window in old_windows:
+        available[reuse_key(window)].append(window.mark)
+    reused = dict()
+    for window in new_windows:
+        old_marks = available.get(reuse_key(window))
+        if old_marks:
+            reused[window.mark] = old_marks.popleft()
+    taken = set(reused.values())
+    dropped = [window.mark for window in old_windows if window.mark not in taken]
+    return dtos.TransitionPlan(reused, dropped)
+
+
+class LayoutSwitcher(object):
+    def __init__(self, window_manager: interfaces.TilingWindowManager) -> None:
+        self._window_manager = window_manager
+
+    def switch(
+        self,
+        old_layout: layouts.LayoutManager,
+        new_layout: layouts.LayoutManager,
+        params: Optional[Dict[str, str]] = None,
+    ) -> dtos.TransitionPlan:
+        """Replace the old layout in the current workspace with the new one. Each
+        layout gets the params that it defines. Returns the plan after leaving out the
+        old windows that were already closed
+        """
+        params = params or dict()
+        unknown_names = (
+            params.keys() - old_layout.parameter_names - new_layout.parameter_names
+        )
+        if unknown_names:
+            raise RuntimeError(
+                f"Neither layout has these parameters: {sorted(unknown_names)}"
+            )
+        new_params = _params_for(new_layout, params)
+        old_windows = old_layout.windows(_params_for(old_layout, params))
+        con_ids = self._window_manager.get_con_ids(
+            window.mark for window in old_windows
+        )
+        # the new layout only tolerates one stray window, just like `rzd open`
+        stray_windows = self._window_manager.num_workspace_windows - len(con_ids)
+        if stray_windows > 1:
+            raise RuntimeError(
+                f"There are {stray_windows} windows open in the current workspace that"
+                + " aren't part of the old layout."
+            )
+        plan = plan_transition(
+            [window for window in old_windows if window.mark in con_ids],
+            new_layout.windows(new_params),
+        )
+        logging.debug(f"switching layouts with {plan}")
+        self._window_manager.hide_windows(
+            con_ids[old_mark] for old_mark in plan.reused.values()
+        )
+        self._window_manager.close_windows(
+            con_ids[old_mark] for old_mark in plan.dropped
+        )
+        new_layout.spawn_windows(
+            new_params,
+            adopted={
+                new_mark: con_ids[old_mark]
+                for new_mark, old_mark in plan.reused.items()
+            },
+        )
+        return plan
+
+
+def _params_for(
+    layout: layouts.LayoutManager, params: Dict[str, str]
+) -> Dict[str, str]:
+    return {
+        name: value for name, value in params.items() if name in layout.parameter_names
+    }
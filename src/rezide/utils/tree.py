@@ -1,40 +1,144 @@
 # https://stackoverflow.com/questions/36286894/name-not-defined-in-type-annotation
 from __future__ import annotations
 
+import abc
+import collections
+import hashlib
 import logging
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterable, List, Optional
 
 from rezide.utils import dtos
 from rezide.utils import interfaces
 
+# Every node has a structural hash that covers everything below it: a window's hash
+# covers its details, and a section's hash covers its split, its sizes, and its
+# children's hashes. Comparing two trees then means comparing two digests, and
+# identical subtrees can be found without walking them.
+
+HASH_SIZE = 16
+# the daemon keeps one factory for as long as it runs, so only the most recently used
+# subtrees are kept around for sharing
+MAX_SUBTREES = 10_000
+
+
+def window_hash(window_details: dtos.WindowDetails) -> bytes:
+    return hashlib.blake2b(
+        repr(("window", tuple(window_details))).encode(), digest_size=HASH_SIZE
+    ).digest()
+
+
+def section_hash(
+    split_orientation: str, child_sizes: List[int], child_hashes: Iterable[bytes]
+) -> bytes:
+    digest = hashlib.blake2b(
+        repr(("section", split_orientation, tuple(child_sizes))).encode(),
+        digest_size=HASH_SIZE,
+    )
+    # the child hashes all have the same size, so they can't run into each other
+    for child_hash in child_hashes:
+        digest.update(child_hash)
+    return digest.digest()
+
 
 class TreeFactory(interfaces.TreeFactoryInterface):
+    """Builds trees out of nested definitions. Identical subtrees are only built once
+    and then shared, so layouts that include the same fragment share its nodes. Only
+    the `max_subtrees` most recently used subtrees are remembered
+    """
+
+    def __init__(self, max_subtrees: int = MAX_SUBTREES) -> None:
+        self._max_subtrees = max_subtrees
+        self._subtrees: collections.OrderedDict[bytes, TreeNode] = (
+            collections.OrderedDict()
+        )
+        # the daemon's layout cache builds layouts from several threads at once
+        self._lock = threading.Lock()
+
     def create_tree(self, tree_dict: Dict) -> interfaces.TreeNodeInterface:
-        return self._create_subtree(tree_dict)
+        with self._lock:
+            return self._create_subtree(tree_dict)
 
-    def _create_subtree(self, node: Dict, parent: Optional[Section] = None) -> TreeNode:
+    def _create_subtree(self, node: Dict) -> TreeNode:
         """Recursively create the subtree of the current node and everything below it"""
-        current_node: TreeNode
         if "command" in node:
-            current_node = Window(
-                dtos.WindowDetails(mark=node["mark"], command=node["command"]),
-                parent=parent,
+            window_details = dtos.WindowDetails(
+                mark=node["mark"],
+                command=node["command"],
+                ready_title=node.get("ready_title"),
+                ready_socket=node.get("ready_socket"),
+                ready_timeout=node.get("ready_timeout"),
+                terminal_command=node.get("terminal_command"),
+                reuse=node.get("reuse"),
             )
+            key = window_hash(window_details)
+            if key not in self._subtrees:
+                self._remember(key, Window(window_details))
         elif "children" in node:
-            current_node = Section(node["split"], node["sizes"], parent=parent)
             if len(node["children"]) <= 1:
                 raise RuntimeError("each parent needs at least 2 children")
-            for child in node["children"]:
-                self._create_subtree(child, parent=current_node)
+            children = [self._create_subtree(child) for child in node["children"]]
+            key = section_hash(
+                node["split"],
+                node["sizes"],
+                (child.structural_hash for child in children),
+            )
+            if key not in self._subtrees:
+                # the children are finished, so they don't need to know their parent
+                section = Section(node["split"], node["sizes"], children=children)
+                self._remember(key, section)
         else:
             logging.error(node)
             raise RuntimeError("invalid config file")
-        return current_node
+        self._subtrees.move_to_end(key)
+        return self._subtrees[key]
+
+    def _remember(self, key: bytes, subtree: TreeNode) -> None:
+        self._subtrees[key] = subtree
+        if len(self._subtrees) > self._max_subtrees:
+            # trees that use the forgotten subtree keep it, it just won't be shared
+            self._subtrees.popitem(last=False)
 
 
 class TreeNode(interfaces.TreeNodeInterface):
-    def __eq__(self, other: object) -> bool:  # pragma: nocover
-        raise NotImplementedError("Can't compare base TreeNodes!")
+    def __init__(self) -> None:
+        self._structural_hash: Optional[bytes] = None
+        # the sections that this node was added to with add_child. Sections that
+        # start out with their children, like shared ones, aren't listed here
+        self._parents: List[Section] = []
+
+    @property
+    def structural_hash(self) -> bytes:
+        """Computed the first time that it's needed, which should be after the
+        subtree is built. Adding a child forgets the hashes of every section above it
+        that it was added to, and a section that starts out with its children never
+        changes
+        """
+        if self._structural_hash is None:
+            self._structural_hash = self._compute_hash()
+        return self._structural_hash
+
+    @abc.abstractmethod
+    def _compute_hash(self) -> bytes:  # pragma: no cover
+        pass
+
+    def _forget_hash(self) -> None:
+        stale: List[TreeNode] = [self]
+        while stale:
+            node = stale.pop()
+            # a node without a hash can't have ancestors with one, since hashing an
+            # ancestor hashes the node too
+            if node._structural_hash is not None:
+                node._structural_hash = None
+                stale.extend(node._parents)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TreeNode):
+            return NotImplemented
+        return self is other or self.structural_hash == other.structural_hash
+
+    def __hash__(self) -> int:
+        return hash(self.structural_hash)
 
 
 class Section(TreeNode):
@@ -43,10 +147,16 @@ class Section(TreeNode):
         split_orientation: str,
         child_sizes: List[int],
         parent: Optional[Section] = None,
+        children: Iterable[interfaces.TreeNodeInterface] = (),
     ) -> None:
+        """`children` are subtrees that are already built. They don't keep a
+        reference back to this section, so they can be shared by as many sections as
+        use them without keeping old trees alive
+        """
+        super().__init__()
         self._split_orientation = split_orientation
         self._child_sizes = child_sizes
-        self._children: List[interfaces.TreeNodeInterface] = []
+        self._children: List[interfaces.TreeNodeInterface] = list(children)
         if parent:
             parent.add_child(self)
 
@@ -55,6 +165,9 @@ class Section(TreeNode):
 
     def add_child(self, node: interfaces.TreeNodeInterface) -> None:
         self._children.append(node)
+        if isinstance(node, TreeNode):
+            node._parents.append(self)
+        self._forget_hash()
 
     @property
     def is_parent(self) -> bool:
@@ -64,9 +177,8 @@ class Section(TreeNode):
     def children(self) -> List[interfaces.TreeNodeInterface]:
         return self._children
 
-    # probably should add coverage here eventually
     @property
-    def child_sizes(self) -> List[int]:  # pragma: nocover
+    def child_sizes(self) -> List[int]:
         return self._child_sizes
 
     @property
@@ -74,26 +186,25 @@ class Section(TreeNode):
         return self._split_orientation
 
     def __str__(self) -> str:
-        return f"Section({self._children})"
+        # only one level down, since deep layouts would run into the recursion limit
+        return f"Section({self._split_orientation}, {len(self._children)} children)"
 
     def __repr__(self) -> str:
         return str(self)
 
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Section):
-            return False
-        if len(self.children) != len(other.children):
-            return False
-        for my_child, other_child in zip(self.children, other.children):
-            if my_child != other_child:
-                return False
-        return self.data == other.data
+    def _compute_hash(self) -> bytes:
+        return section_hash(
+            self._split_orientation,
+            self._child_sizes,
+            (child.structural_hash for child in self._children),
+        )
 
 
 class Window(TreeNode):
     def __init__(
         self, window_details: dtos.WindowDetails, parent: Optional[Section] = None
     ) -> None:
+        super().__init__()
         self._window_details = window_details
         if parent:
             parent.add_child(self)
@@ -122,7 +233,5 @@ class Window(TreeNode):
     def __repr__(self) -> str:
         return str(self)
 
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Window):
-            return False
-        return self.data == other.data
+    def _compute_hash(self) -> bytes:
+        return window_hash(self._window_details)
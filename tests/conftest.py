@@ -1,7 +1,29 @@
+from typing import Dict
+from unittest import mock
+
 import click.testing
 import pytest
 
+from rezide.utils import config_readers
+from tests import fakes
+
 
 @pytest.fixture(scope="session")
 def click_runner():
     return click.testing.CliRunner()
+
+
+@pytest.fixture
+def files() -> Dict[str, str]:
+    """The files that `filestore` starts with. Test modules override this"""
+    return dict()
+
+
+@pytest.fixture
+def filestore(files):
+    return fakes.FakeFilestore(files)
+
+
+@pytest.fixture
+def spy_reader(filestore):
+    return mock.Mock(wraps=config_readers.TomlReader(filestore))
@@ -1,4 +1,4 @@
-from typing import Dict, List, NamedTuple, Optional, Set, Type
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Type
 
 from pyfakefs import fake_filesystem
 
@@ -23,6 +23,13 @@ class FakeFilestore(interfaces.FileStore):
         with self._open(path) as infile:
             return infile.read()
 
+    def write_file(self, path: str, contents: str) -> None:
+        parent_dir = self._os_module.path.dirname(path)
+        if parent_dir:
+            self._os_module.makedirs(parent_dir, exist_ok=True)
+        with self._open(path, "wb") as outfile:
+            outfile.write(contents.encode())
+
     def exists_as_dir(self, path: str) -> bool:
         return self.path_exists(path) and self._os_module.path.isdir(path)
 
@@ -32,6 +39,53 @@ class FakeFilestore(interfaces.FileStore):
     def list_directory_contents(self, path: str) -> Set[str]:
         return set(self._os_module.listdir(path))
 
+    def make_fifo(self, path: str) -> None:
+        """Pipes are plain files here"""
+        self.write_file(path, "")
+
+    def write_fifo(self, path: str, contents: str) -> None:
+        """Pipes are read as soon as they're written, so only the last write is kept"""
+        if not self.path_exists(path):
+            raise RuntimeError(f"Nothing is reading from {path}")
+        self.write_file(path, contents)
+
+
+class FakeClock(object):
+    """A clock that only moves when something sleeps, or by `step` every time that
+    it's read
+    """
+
+    def __init__(self, step: float = 0.0) -> None:
+        self.time = 0.0
+        self._step = step
+
+    def __call__(self) -> float:
+        self.time += self._step
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        self.time += seconds
+
+
+class FakeFileWatcher(interfaces.FileWatcher):
+    """Reports each batch of changes once, then reports nothing"""
+
+    def __init__(self, batches: Optional[List[Set[str]]] = None) -> None:
+        self._batches = list(batches or [])
+        self.watched_dirs: Set[str] = set()
+        self.closed = False
+
+    def watch_directory(self, path: str) -> None:
+        self.watched_dirs.add(path)
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        if self._batches:
+            return self._batches.pop(0)
+        return set()
+
+    def close(self) -> None:
+        self.closed = True
+
 
 class FakeTreeFactory(interfaces.TreeFactoryInterface):
     def __init__(self, tree_root: tree.TreeNode):
@@ -72,11 +126,18 @@ class FakeRect(NamedTuple):
     height: int
 
 
+class FakeGaps(NamedTuple):
+    inner: int
+    outer: int
+
+
 class FakeNode(NamedTuple):
     name: str
     rect: FakeRect
-    gaps: Optional[str]
+    gaps: Optional[FakeGaps]
     marks: List
+    id: int = 0
+    window_rect: Optional[FakeRect] = None
 
 
 class FakeWindowManager(interfaces.TilingWindowManager):
@@ -85,12 +146,25 @@ class FakeWindowManager(interfaces.TilingWindowManager):
         tree: Optional[List[FakeNode]] = None,
         window_sizes: Optional[Dict] = None,
         num_workspace_windows: int = 0,
+        workspace_snapshot: Optional[dtos.ContainerSnapshot] = None,
+        tree_changes: Optional[List[List[FakeNode]]] = None,
+        window_geometries: Optional[dtos.GeometrySnapshot] = None,
+        con_ids: Optional[Dict[str, int]] = None,
     ):
+        """Each call to wait_for_tree_change replaces the tree with the next one in
+        tree_changes
+        """
         if tree:
             self._tree = tree
+        self._tree_changes = list(tree_changes or [])
+        self._window_geometries = window_geometries
+        self.requested_workspaces: List[Optional[str]] = []
+        self.hidden_commands: List[str] = []
+        self._con_ids = con_ids or dict()
         if window_sizes:
             self._window_sizes = window_sizes
         self._num_workspace_windows = num_workspace_windows
+        self._workspace_snapshot = workspace_snapshot
 
     def make_window(self, window_details: dtos.WindowDetails) -> None:
         pass
@@ -116,12 +190,59 @@ class FakeWindowManager(interfaces.TilingWindowManager):
         """Count the windows on the current workspace"""
         return self._num_workspace_windows
 
-    def get_tree(self) -> List[FakeNode]:
+    def get_tree(self, workspace_name: Optional[str] = None) -> List[FakeNode]:
+        self.requested_workspaces.append(workspace_name)
         return self._tree
 
-    def get_window_sizes(self):
+    def get_windows(self, workspace_name: Optional[str] = None) -> List[FakeNode]:
+        self.requested_workspaces.append(workspace_name)
+        return self._tree
+
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        if self._window_geometries is None:
+            raise RuntimeError("No window geometries to report")
+        return self._window_geometries
+
+    def wait_for_tree_change(self) -> None:
+        self._tree = self._tree_changes.pop(0)
+
+    def get_window_sizes(self, workspace_name: Optional[str] = None):
         return self._window_sizes
 
+    def get_workspace_snapshot(self) -> dtos.ContainerSnapshot:
+        if self._workspace_snapshot is None:
+            raise RuntimeError("No workspace is focused")
+        return self._workspace_snapshot
+
+    def switch_workspace(self, workspace_name: str) -> None:
+        pass
+
+    def focus_output(self, output_name: str) -> None:
+        pass
+
+    def spawn_hidden(self, command: str) -> int:
+        """Hidden windows get the ids 1, 2, 3, ... in the order that they're started"""
+        self.hidden_commands.append(command)
+        return len(self.hidden_commands)
+
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        pass
+
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        pass
+
+    def get_con_ids(self, marks: Iterable[str]) -> Dict[str, int]:
+        return {mark: self._con_ids[mark] for mark in marks if mark in self._con_ids}
+
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        pass
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        pass
+
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        return dict()
+
 
 class SpyWindowManager(FakeWindowManager):
     """Gets passed into LayoutManagers using dependency injection and spies on their
@@ -158,3 +279,23 @@ class SpyWindowManager(FakeWindowManager):
     # todo: add the mark to the call
     def split_and_mark_parent(self, split_type: str, mark: str) -> None:
         self._calls.append(dtos.WindowManagerCall("split", arg=split_type))
+
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        self._calls.append(
+            dtos.WindowManagerCall("adopt", arg=(con_id, window_details))
+        )
+
+    def prelaunch(self, window_details: dtos.WindowDetails) -> None:
+        self._calls.append(dtos.WindowManagerCall("prelaunch", arg=window_details))
+
+    def hide_windows(self, con_ids: Iterable[int]) -> None:
+        self._calls.append(dtos.WindowManagerCall("hide", arg=list(con_ids)))
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        self._calls.append(dtos.WindowManagerCall("close", arg=list(con_ids)))
+
+    def switch_workspace(self, workspace_name: str) -> None:
+        self._calls.append(dtos.WindowManagerCall("workspace", arg=workspace_name))
+
+    def focus_output(self, output_name: str) -> None:
+        self._calls.append(dtos.WindowManagerCall("output", arg=output_name))
@@ -213,3 +213,42 @@ def test_cant_find_layout(test_env):
     dir = config_dir.ConfigDir(filestore, test_env)
     with pytest.raises(RuntimeError):
         dir.get_layout_file_path("def")
+
+
+def test_get_session_file_path(test_env):
+    """Sessions live next to layouts in the config dir"""
+    filestore = fakes.FakeFilestore(
+        {
+            "/home/test/.config/rezide/alpha/config.toml": "",
+            "/home/test/.config/rezide/work/session.toml": "",
+        }
+    )
+    dir = config_dir.ConfigDir(filestore, test_env)
+    actual_path = dir.get_session_file_path("work")
+    assert actual_path == "/home/test/.config/rezide/work/session.toml"
+    assert dir.list_layouts() == {"alpha"}
+
+
+def test_cant_find_session(test_env):
+    """Raise an error if the session can't be found in the config dir"""
+    filestore = fakes.FakeFilestore({"/home/test/.config/rezide/abc/config.toml": ""})
+    dir = config_dir.ConfigDir(filestore, test_env)
+    with pytest.raises(RuntimeError):
+        dir.get_session_file_path("abc")
+
+
+def test_get_new_layout_file_path(test_env):
+    filestore = fakes.FakeFilestore({"/home/test/.config/rezide/abc/config.toml": ""})
+    dir = config_dir.ConfigDir(filestore, test_env)
+    actual_path = dir.get_new_layout_file_path("def")
+    assert actual_path == "/home/test/.config/rezide/def/config.toml"
+
+
+def test_new_layout_cant_replace_existing_layout(test_env):
+    """Refuse to replace a layout unless we're told to overwrite it"""
+    filestore = fakes.FakeFilestore({"/home/test/.config/rezide/abc/config.toml": ""})
+    dir = config_dir.ConfigDir(filestore, test_env)
+    with pytest.raises(RuntimeError):
+        dir.get_new_layout_file_path("abc")
+    actual_path = dir.get_new_layout_file_path("abc", overwrite=True)
+    assert actual_path == "/home/test/.config/rezide/abc/config.toml"
@@ -1,3 +1,4 @@
+import pickle
 from typing import Dict, NamedTuple, Type
 from unittest import mock
 
@@ -287,6 +288,42 @@ validation_test_cases = [
         },
         expected_error_class=RuntimeError,
     ),
+    # readiness probe that isn't a valid regex
+    ConfigParserExceptionTestCase(
+        config_dict={
+            "ide": {
+                "split": "horizontal",
+                "children": ["left", "right"],
+                "sizes": [50, 50],
+            },
+            "left": {
+                "command": 'alacritty -e sh -c "echo left window!"',
+                "ready_title": "(unclosed",
+            },
+            "right": {
+                "command": 'alacritty -e sh -c "echo right window!"',
+            },
+        },
+        expected_error_class=RuntimeError,
+    ),
+    # readiness timeout that isn't positive
+    ConfigParserExceptionTestCase(
+        config_dict={
+            "ide": {
+                "split": "horizontal",
+                "children": ["left", "right"],
+                "sizes": [50, 50],
+            },
+            "left": {
+                "command": 'alacritty -e sh -c "echo left window!"',
+                "ready_timeout": 0,
+            },
+            "right": {
+                "command": 'alacritty -e sh -c "echo right window!"',
+            },
+        },
+        expected_error_class=RuntimeError,
+    ),
     # extra junk in section
     ConfigParserExceptionTestCase(
         config_dict={
@@ -416,3 +453,50 @@ def test_parser_validation_happy_path():
     )
     # no exception raised
     parser.validate()
+
+
+def test_parser_validation_accepts_readiness_probes():
+    config_dict = {
+        "ide": {
+            "split": "horizontal",
+            "children": ["left window", "right window"],
+            "sizes": [50, 50],
+            "is_layout": True,
+        },
+        "left window": {
+            "command": "nvim --listen /tmp/nvim.sock",
+            "ready_socket": "/tmp/nvim.sock",
+            "ready_timeout": 2.5,
+        },
+        "right window": {
+            "command": "alacritty",
+            "ready_title": "^~/code",
+            "terminal_command": "$SHELL",
+            "reuse": "shell",
+        },
+    }
+    parser = config_parser.ConfigParser(
+        config_dict, fakes.FakeTreeFactory(mock.MagicMock())
+    )
+    # no exception raised
+    parser.validate()
+
+
+def test_find_errors_checks_every_definition():
+    parser = config_parser.ConfigParser(
+        {
+            "root": {"split": "horizontal", "children": ["a", "b"], "sizes": [50, 50]},
+            "a": {"command": "kak", "ready_timeout": -1},
+            "b": "alacritty",
+            "c": {"split": "vertical", "children": ["a", "b"]},
+        },
+        fakes.FakeTreeFactory(mock.MagicMock()),
+    )
+    errors = parser.find_errors()
+    assert [(error.table, error.key) for error in errors] == [
+        ("a", "ready_timeout"),
+        ("b", None),
+        ("c", "sizes"),
+    ]
+    assert str(errors[1]) == "This definition is not a table: b"
+    assert pickle.loads(pickle.dumps(errors[0])).key == "ready_timeout"
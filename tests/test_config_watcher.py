@@ -0,0 +1,227 @@
+import time
+from unittest import mock
+
+import pytest
+
+from rezide.utils import config_dir
+from rezide.utils import config_readers
+from rezide.utils import config_watcher
+from rezide.utils import dtos
+from rezide.utils import layout_cache
+from rezide.utils import tree
+from tests import fakes
+
+valid_layout = """
+[root]
+split = "horizontal"
+children = ["left", "right"]
+sizes = [50, 50]
+
+[left]
+command = "alacritty"
+
+[right]
+command = "alacritty"
+"""
+
+invalid_layout = """
+[root]
+split = "horizontal"
+children = ["left", "right"]
+sizes = [50, 49]
+
+[left]
+command = "alacritty"
+
+[right]
+command = "alacritty"
+"""
+
+including_layout = """
+include = ["alpha"]
+
+[root]
+split = "vertical"
+children = ["top", "left"]
+sizes = [50, 50]
+
+[top]
+command = "kak"
+"""
+
+
+@pytest.fixture
+def files():
+    return {
+        "/home/test/.rezide/alpha/config.toml": valid_layout,
+        "/home/test/.rezide/beta/config.toml": valid_layout,
+        "/home/test/.rezide/README.md": "",
+    }
+
+
+@pytest.fixture
+def directory(filestore):
+    env = dtos.Env(home="/home/test", xdg_config_home="")
+    return config_dir.ConfigDir(filestore, env)
+
+
+@pytest.fixture
+def layouts(filestore, directory):
+    return layout_cache.LayoutCache(
+        directory,
+        config_readers.TomlReader(filestore),
+        tree.TreeFactory(),
+        fakes.FakeWindowManager(),
+    )
+
+
+@pytest.fixture
+def file_watcher():
+    return fakes.FakeFileWatcher()
+
+
+@pytest.fixture
+def on_error():
+    return mock.MagicMock()
+
+
+@pytest.fixture
+def watcher(directory, filestore, file_watcher, layouts, on_error):
+    return config_watcher.ConfigWatcher(
+        directory, filestore, file_watcher, layouts, on_error
+    )
+
+
+def test_watches_config_dir_and_layout_dirs(watcher, file_watcher):
+    watcher.start()
+    watcher.stop()
+    assert file_watcher.watched_dirs == {
+        "/home/test/.rezide",
+        "/home/test/.rezide/alpha",
+        "/home/test/.rezide/beta",
+    }
+    assert file_watcher.closed
+
+
+def test_reloads_only_the_changed_layout(watcher, layouts, filestore):
+    layouts.preload()
+    alpha = layouts.get("alpha")
+    beta = layouts.get("beta")
+    watcher.handle_changes({"/home/test/.rezide/alpha/config.toml"})
+    # alpha was reloaded ahead of time, so it's in the cache already
+    assert "alpha" in layouts
+    assert layouts.get("alpha") is not alpha
+    assert layouts.get("beta") is beta
+
+
+def test_reloads_once_per_layout(watcher, filestore, file_watcher, on_error):
+    layouts = mock.MagicMock()
+    layouts.invalidate.return_value = {"alpha"}
+    watcher = config_watcher.ConfigWatcher(
+        config_dir.ConfigDir(filestore, dtos.Env("/home/test", "")),
+        filestore,
+        file_watcher,
+        layouts,
+        on_error,
+    )
+    watcher.handle_changes(
+        {
+            "/home/test/.rezide/alpha/config.toml",
+            "/home/test/.rezide/alpha/.config.toml.swp",
+            "/home/test/.rezide/alpha",
+            "/home/test/.rezide",
+        }
+    )
+    layouts.invalidate.assert_called_once_with("alpha")
+    layouts.get.assert_called_once_with("alpha")
+
+
+def test_reports_invalid_layouts_right_away(watcher, layouts, filestore, on_error):
+    layouts.preload()
+    filestore.write_file("/home/test/.rezide/alpha/config.toml", invalid_layout)
+    watcher.handle_changes({"/home/test/.rezide/alpha/config.toml"})
+    on_error.assert_called_once()
+    layout_name, error = on_error.call_args.args
+    assert layout_name == "alpha"
+    assert isinstance(error, RuntimeError)
+    # don't keep the old version of the layout around
+    assert "alpha" not in layouts
+
+
+def test_new_layout_dirs_are_watched(watcher, layouts, filestore, file_watcher):
+    filestore.write_file("/home/test/.rezide/gamma/config.toml", valid_layout)
+    watcher.handle_changes({"/home/test/.rezide/gamma"})
+    assert "/home/test/.rezide/gamma" in file_watcher.watched_dirs
+    assert "gamma" in layouts
+
+
+def test_new_layout_dir_without_config(watcher, layouts, filestore, file_watcher):
+    filestore.write_file("/home/test/.rezide/gamma/notes.md", "")
+    watcher.handle_changes({"/home/test/.rezide/gamma"})
+    assert "/home/test/.rezide/gamma" in file_watcher.watched_dirs
+    assert "gamma" not in layouts
+
+
+def test_removed_layouts_are_forgotten(watcher, filestore, file_watcher):
+    layouts = mock.MagicMock()
+    layouts.invalidate.return_value = {"delta"}
+    watcher = config_watcher.ConfigWatcher(
+        config_dir.ConfigDir(filestore, dtos.Env("/home/test", "")),
+        filestore,
+        file_watcher,
+        layouts,
+    )
+    watcher.handle_changes({"/home/test/.rezide/delta"})
+    assert "/home/test/.rezide/delta" not in file_watcher.watched_dirs
+    layouts.invalidate.assert_called_once_with("delta")
+    layouts.get.assert_not_called()
+
+
+def test_layouts_that_include_the_changed_one_are_reloaded(
+    watcher, layouts, filestore, on_error
+):
+    filestore.write_file("/home/test/.rezide/gamma/config.toml", including_layout)
+    layouts.preload()
+    gamma = layouts.get("gamma")
+    beta = layouts.get("beta")
+    watcher.handle_changes({"/home/test/.rezide/alpha/config.toml"})
+    # gamma was parsed again ahead of time instead of when it's next opened
+    assert "gamma" in layouts
+    assert layouts.get("gamma") is not gamma
+    assert layouts.get("beta") is beta
+    on_error.assert_not_called()
+
+
+def test_errors_in_layouts_that_include_the_changed_one_are_reported(
+    watcher, layouts, filestore, on_error
+):
+    filestore.write_file("/home/test/.rezide/gamma/config.toml", including_layout)
+    layouts.preload()
+    filestore.write_file("/home/test/.rezide/alpha/config.toml", "[root]\n")
+    watcher.handle_changes({"/home/test/.rezide/alpha/config.toml"})
+    assert [call.args[0] for call in on_error.call_args_list] == ["alpha", "gamma"]
+    assert "gamma" not in layouts
+
+
+def test_changes_are_handled_in_the_background(directory, filestore, layouts, on_error):
+    file_watcher = fakes.FakeFileWatcher([{"/home/test/.rezide/alpha/config.toml"}])
+    watcher = config_watcher.ConfigWatcher(
+        directory, filestore, file_watcher, layouts, on_error
+    )
+    watcher.start()
+    deadline = time.monotonic() + 5
+    while "alpha" not in layouts and time.monotonic() < deadline:
+        time.sleep(0.01)
+    watcher.stop()
+    assert "alpha" in layouts
+
+
+def test_stop_without_start(watcher, file_watcher):
+    watcher.stop()
+    assert file_watcher.closed
+
+
+def test_log_error(caplog):
+    config_watcher.log_error("alpha", RuntimeError("Sum of sizes is not 100: root"))
+    assert "alpha" in caplog.text
+    assert "Sum of sizes is not 100" in caplog.text
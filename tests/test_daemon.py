@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+from unittest import mock
+
+import pytest
+
+from rezide.utils import daemon
+from rezide.utils import dtos
+from rezide.utils import geometry
+
+
+@pytest.fixture
+def layouts():
+    return mock.MagicMock()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "rezide.sock")
+
+
+@pytest.fixture
+def running_daemon(socket_path, layouts):
+    server = daemon.Daemon(socket_path, layouts)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_open_spawns_windows(running_daemon, socket_path, layouts):
+    assert daemon.send_request(socket_path, "open rice") == "ok"
+    layouts.get.assert_called_once_with("rice")
+    layouts.get.return_value.spawn_windows.assert_called_once_with({})
+
+
+def test_open_with_params(running_daemon, socket_path, layouts):
+    request = "open ide repo='~/my code' branch=main"
+    assert daemon.send_request(socket_path, request) == "ok"
+    layouts.get.assert_called_once_with("ide")
+    layouts.get.return_value.spawn_windows.assert_called_once_with(
+        {"repo": "~/my code", "branch": "main"}
+    )
+
+
+@pytest.mark.parametrize("request_", ["open", "open ide repo"])
+def test_open_with_bad_arguments(running_daemon, socket_path, layouts, request_):
+    assert daemon.send_request(socket_path, request_).startswith("error ")
+    layouts.get.return_value.spawn_windows.assert_not_called()
+
+
+def test_errors_are_sent_back(running_daemon, socket_path, layouts):
+    layouts.get.side_effect = RuntimeError("Layout 'rice' doesn't exist")
+    response = daemon.send_request(socket_path, "open rice")
+    assert response == "error Layout 'rice' doesn't exist"
+
+
+def test_reload_one_layout(running_daemon, socket_path, layouts):
+    assert daemon.send_request(socket_path, "reload rice") == "ok"
+    layouts.invalidate.assert_called_once_with("rice")
+
+
+def test_reload_all_layouts(running_daemon, socket_path, layouts):
+    assert daemon.send_request(socket_path, "reload") == "ok"
+    layouts.clear.assert_called_once_with()
+
+
+def test_ping(running_daemon, socket_path):
+    assert daemon.send_request(socket_path, "ping") == "ok"
+
+
+def test_unknown_request(running_daemon, socket_path):
+    assert daemon.send_request(socket_path, "dance").startswith("error")
+
+
+def test_refuses_to_start_twice(running_daemon, socket_path, layouts):
+    with pytest.raises(RuntimeError):
+        daemon.Daemon(socket_path, layouts)
+
+
+def test_removes_stale_socket(socket_path, layouts):
+    server = daemon.Daemon(socket_path, layouts)
+    # simulate a daemon that crashed without cleaning up its socket
+    server.socket.close()
+    assert os.path.exists(socket_path)
+    daemon.Daemon(socket_path, layouts).server_close()
+    assert not os.path.exists(socket_path)
+
+
+def test_socket_is_removed_on_close(socket_path, layouts):
+    daemon.Daemon(socket_path, layouts).server_close()
+    assert not os.path.exists(socket_path)
+
+
+def test_close_after_socket_was_removed(socket_path, layouts):
+    server = daemon.Daemon(socket_path, layouts)
+    os.unlink(socket_path)
+    server.server_close()
+
+
+def test_default_socket_path_uses_runtime_dir(monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert daemon.default_socket_path() == "/run/user/1000/rezide.sock"
+
+
+def test_default_socket_path_without_runtime_dir(monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert daemon.default_socket_path() == f"/tmp/rezide-{os.getuid()}.sock"
+
+
+def test_query_window_sizes(socket_path, layouts):
+    model = geometry.GeometryModel(clock=lambda: 5.0)
+    model.update(
+        dtos.GeometrySnapshot(
+            "1",
+            [
+                dtos.WindowGeometry(1, "1", ("editor",), 800, 600),
+                dtos.WindowGeometry(2, "2", (), 1200, 600),
+            ],
+        )
+    )
+    server = daemon.Daemon(socket_path, layouts, model)
+    try:
+        status, _, sizes = server.respond("sizes").partition(" ")
+        assert status == "ok"
+        assert json.loads(sizes) == [
+            {
+                "id": 1,
+                "workspace": "1",
+                "marks": ["editor"],
+                "width": 800,
+                "height": 600,
+            }
+        ]
+        _, _, sizes = server.respond("sizes 2").partition(" ")
+        assert [window["id"] for window in json.loads(sizes)] == [2]
+        _, _, history = server.respond("history editor").partition(" ")
+        assert json.loads(history) == [{"time": 5.0, "width": 800, "height": 600}]
+        assert server.respond("history tests").startswith("error")
+    finally:
+        server.server_close()
+
+
+def test_query_without_geometry(running_daemon, socket_path):
+    assert daemon.send_request(socket_path, "sizes").startswith("error")
@@ -0,0 +1,199 @@
+import json
+
+import pytest
+
+from rezide.utils import dry_run
+from rezide.utils import dtos
+from rezide.utils import sway_commands
+
+LATENCY = dtos.LatencyModel(spawn=1.0, split=0.5, focus=0.25, resize=0.125)
+
+
+@pytest.fixture
+def recorder():
+    return dry_run.RecordingWindowManager()
+
+
+def window(mark):
+    return dtos.WindowDetails(mark=mark, command=f"open {mark}")
+
+
+def test_commands_are_recorded(recorder):
+    recorder.make_window(window("editor"))
+    recorder.split_and_mark_parent("vertical", "abc")
+    recorder.make_window(window("terminal"))
+    recorder.focus(window("editor"))
+    recorder.resize_width(window("editor"), 70)
+    recorder.resize_height(window("terminal"), 40)
+    assert recorder.commands == [
+        ("spawn", "exec open editor"),
+        ("spawn", '[con_id=1] mark "editor"'),
+        ("split", "[con_id=1] split vertical"),
+        ("split", '[con_id=2] mark "abc"'),
+        ("spawn", "exec open terminal"),
+        ("spawn", '[con_id=3] mark "terminal"'),
+        ("focus", "[con_id=1] focus"),
+        ("resize", "[con_id=1] resize set width 70 ppt"),
+        ("resize", "[con_id=3] resize set height 40 ppt"),
+    ]
+    assert recorder.operation_counts == {
+        "spawn": 2,
+        "split": 1,
+        "focus": 1,
+        "resize": 2,
+    }
+    assert dry_run.estimate(recorder.operation_counts, LATENCY) == 3.0
+
+
+def test_workspace_commands_are_free(recorder):
+    recorder.focus_output("DP-1")
+    recorder.switch_workspace("my ide")
+    assert recorder.commands == [
+        ("workspace", 'focus output "DP-1"'),
+        ("workspace", 'workspace "my ide"'),
+    ]
+    assert dry_run.estimate(recorder.operation_counts, LATENCY) == 0
+
+
+def test_adopting_hidden_windows(recorder):
+    con_id = recorder.spawn_hidden("foot")
+    recorder.adopt_window(con_id, window("editor"))
+    recorder.split_and_mark_parent("horizontal", "abc")
+    assert recorder.commands == [
+        ("hidden", "exec foot"),
+        ("adopt", "[con_id=1] scratchpad show"),
+        ("adopt", "[con_id=1] floating disable"),
+        ("adopt", '[con_id=1] mark "editor"'),
+        ("split", "[con_id=1] split horizontal"),
+        ("split", '[con_id=2] mark "abc"'),
+    ]
+    assert recorder.operation_counts == {"split": 1}
+
+
+def test_prelaunched_windows_are_put_in_place(recorder):
+    recorder.make_window(window("editor"))
+    recorder.prelaunch(window("browser"))
+    recorder.split_and_mark_parent("horizontal", "abc")
+    recorder.make_window(window("browser"))
+    assert recorder.commands == [
+        ("spawn", "exec open editor"),
+        ("spawn", '[con_id=1] mark "editor"'),
+        (
+            "prelaunch",
+            'workspace "rezide-prelaunch-browser"; exec open browser;'
+            + " workspace back_and_forth",
+        ),
+        ("split", "[con_id=1] split horizontal"),
+        ("split", '[con_id=3] mark "abc"'),
+        ("adopt", "[con_id=2] move scratchpad"),
+        ("adopt", "[con_id=2] scratchpad show"),
+        ("adopt", "[con_id=2] floating disable"),
+        ("adopt", '[con_id=2] mark "browser"'),
+    ]
+    assert recorder.operation_counts == {"spawn": 2, "split": 1}
+
+
+def test_switching_layouts(recorder):
+    recorder.make_window(window("editor"))
+    recorder.split_and_mark_parent("horizontal", "abc")
+    recorder.make_window(window("tests"))
+    con_ids = recorder.get_con_ids(["editor", "tests", "missing"])
+    assert con_ids == {"editor": 1, "tests": 3}
+    assert recorder.get_pids([1, 3]) == {}
+    recorder.hide_windows([1])
+    recorder.close_windows([3])
+    recorder.close_windows([])
+    assert recorder.commands[-2:] == [
+        ("hide", "[con_id=1] move scratchpad"),
+        ("close", "[con_id=3] kill"),
+    ]
+
+
+def test_chain():
+    assert (
+        sway_commands.chain(["[con_id=1] kill", "[con_id=2] kill"])
+        == "[con_id=1] kill; [con_id=2] kill"
+    )
+
+
+def test_hide_new_windows():
+    assert sway_commands.hide_new_windows("rezide-hidden") == [
+        'no_focus [app_id="^rezide-hidden$"]',
+        'for_window [app_id="^rezide-hidden$"] move scratchpad',
+    ]
+
+
+def test_the_workspace_starts_empty(recorder):
+    assert recorder.num_workspace_windows == 0
+    assert recorder.get_tree() == []
+    assert recorder.get_windows() == []
+    assert recorder.get_window_sizes() == {}
+    for query in (
+        recorder.get_window_geometries,
+        recorder.get_workspace_snapshot,
+        recorder.wait_for_tree_change,
+    ):
+        with pytest.raises(RuntimeError):
+            query()
+
+
+def test_mistakes_fail_like_they_would_in_sway(recorder):
+    with pytest.raises(RuntimeError, match="no focused window"):
+        recorder.split_and_mark_parent("vertical", "abc")
+    recorder.make_window(window("editor"))
+    with pytest.raises(RuntimeError, match="invalid split type"):
+        recorder.split_and_mark_parent("diagonal", "abc")
+    with pytest.raises(RuntimeError, match="No window is marked missing"):
+        recorder.focus(window("missing"))
+
+
+def test_parse_latency():
+    assert dry_run.parse_latency(["spawn=2", "focus=0.5"], LATENCY) == LATENCY._replace(
+        spawn=2.0, focus=0.5
+    )
+    assert dry_run.parse_latency([]) == dry_run.DEFAULT_LATENCY
+
+
+@pytest.mark.parametrize("pair", ["spawn", "launch=1", "spawn=fast", "spawn=-1"])
+def test_invalid_latencies(pair):
+    with pytest.raises(RuntimeError):
+        dry_run.parse_latency([pair])
+
+
+def test_latency_from_trace():
+    trace_json = json.dumps(
+        {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "args": {"name": "rezide"}},
+                {"name": "make_window", "dur": 400_000},
+                {"name": "make_window", "dur": 600_000},
+                {"name": "resize_width", "dur": 1_000},
+                {"name": "resize_height", "dur": 3_000},
+                {"name": "connect", "dur": 5_000},
+            ]
+        }
+    )
+    assert dry_run.latency_from_trace(trace_json, LATENCY) == LATENCY._replace(
+        spawn=0.5, resize=0.002
+    )
+
+
+@pytest.mark.parametrize("trace_json", ["not json", "{}", "[]"])
+def test_unreadable_traces(trace_json):
+    with pytest.raises(RuntimeError):
+        dry_run.latency_from_trace(trace_json)
+
+
+def test_describe_estimate():
+    assert (
+        dry_run.describe_estimate({"spawn": 3, "split": 2}, LATENCY)
+        == "estimated 4.00s: 3 spawn, 2 split, 0 focus, 0 resize"
+    )
+
+
+@pytest.mark.parametrize(
+    "argument,expected",
+    [("DP-1", '"DP-1"'), ('say "hi"', '"say \\"hi\\""'), ("a\\b", '"a\\\\b"')],
+)
+def test_quote(argument, expected):
+    assert sway_commands.quote(argument) == expected
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from rezide.utils import filestore
+
+
+def test_fifos_go_in_a_private_dir(tmp_path):
+    fifo_path = str(tmp_path / "rezide-pool" / "1")
+    filestore.LocalFilestore().make_fifo(fifo_path)
+    assert os.stat(tmp_path / "rezide-pool").st_mode & 0o777 == 0o700
+    assert filestore.LocalFilestore().exists_as_dir(str(tmp_path / "rezide-pool"))
+
+
+def test_dirs_that_others_can_use_are_refused(tmp_path):
+    (tmp_path / "rezide-pool").mkdir()
+    os.chmod(tmp_path / "rezide-pool", 0o777)
+    with pytest.raises(RuntimeError, match="can be used by other users"):
+        filestore.make_private_dir(str(tmp_path / "rezide-pool"))
+
+
+def test_dirs_that_belong_to_others_are_refused(tmp_path, monkeypatch):
+    monkeypatch.setattr("os.getuid", lambda: os.stat(tmp_path).st_uid + 1)
+    with pytest.raises(RuntimeError, match="belongs to another user"):
+        filestore.make_private_dir(str(tmp_path / "rezide-pool"))
+
+
+def test_links_are_refused(tmp_path):
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    (tmp_path / "rezide-pool").symlink_to(tmp_path / "elsewhere")
+    with pytest.raises(RuntimeError, match="is not a directory"):
+        filestore.make_private_dir(str(tmp_path / "rezide-pool"))
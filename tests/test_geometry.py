@@ -0,0 +1,142 @@
+import queue
+import time
+from typing import List
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import geometry
+from tests import fakes
+
+
+def snapshot(
+    *windows: dtos.WindowGeometry, focused_workspace: str = "1"
+) -> dtos.GeometrySnapshot:
+    return dtos.GeometrySnapshot(focused_workspace, list(windows))
+
+
+editor = dtos.WindowGeometry(1, "1", ("editor",), 800, 600)
+tests = dtos.WindowGeometry(2, "1", ("tests",), 400, 600)
+browser = dtos.WindowGeometry(3, "2", (), 1200, 600)
+
+
+@pytest.fixture
+def clock():
+    return fakes.FakeClock()
+
+
+@pytest.fixture
+def model(clock):
+    return geometry.GeometryModel(clock=clock)
+
+
+def test_window_sizes_come_from_current_workspace(model):
+    model.update(snapshot(editor, tests, browser))
+    assert model.window_sizes() == [editor, tests]
+    assert model.window_sizes("2") == [browser]
+    assert model.window_sizes("3") == []
+
+
+def test_history_only_records_resizes(model, clock):
+    model.update(snapshot(editor))
+    clock.time = 1
+    # the window moved to another workspace but kept its size
+    model.update(snapshot(editor._replace(workspace="2")))
+    clock.time = 2
+    model.update(snapshot(editor._replace(width=400)))
+    assert model.history("editor") == [
+        dtos.Resize(0, 800, 600),
+        dtos.Resize(2, 400, 600),
+    ]
+
+
+def test_history_is_limited(clock):
+    model = geometry.GeometryModel(history_length=2, clock=clock)
+    for width in (100, 200, 300):
+        clock.time = width
+        model.update(snapshot(editor._replace(width=width)))
+    assert model.history("editor") == [
+        dtos.Resize(200, 200, 600),
+        dtos.Resize(300, 300, 600),
+    ]
+
+
+def test_closed_windows_are_forgotten(model):
+    model.update(snapshot(editor, tests))
+    model.update(snapshot(tests))
+    with pytest.raises(RuntimeError):
+        model.history("editor")
+    # a new window with the same mark starts a new history
+    model.update(snapshot(tests, editor._replace(id=4, width=10)))
+    assert model.history("editor") == [dtos.Resize(0, 10, 600)]
+
+
+class EventWindowManager(fakes.FakeWindowManager):
+    """Sends a new snapshot whenever one is put in its queue"""
+
+    def __init__(self, first_snapshot: dtos.GeometrySnapshot) -> None:
+        super().__init__()
+        self.snapshots: queue.Queue = queue.Queue()
+        self._snapshot = first_snapshot
+        self.fetches: List[dtos.GeometrySnapshot] = []
+
+    def get_window_geometries(self) -> dtos.GeometrySnapshot:
+        self.fetches.append(self._snapshot)
+        return self._snapshot
+
+    def wait_for_tree_change(self) -> None:
+        self._snapshot = self.snapshots.get()
+
+
+def wait_until(condition) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_monitor_updates_model_when_tree_changes(model):
+    window_manager = EventWindowManager(snapshot(editor))
+    monitor = geometry.GeometryMonitor(window_manager, model)
+    monitor.start()
+    assert model.window_sizes() == [editor]
+    window_manager.snapshots.put(snapshot(editor, tests))
+    wait_until(lambda: model.window_sizes() == [editor, tests])
+    # queries never touch the window manager
+    for _ in range(1000):
+        model.window_sizes()
+    assert len(window_manager.fetches) == 2
+    monitor.stop()
+    window_manager.snapshots.put(snapshot())
+    assert monitor._thread is not None
+    monitor._thread.join(5)
+    assert not monitor._thread.is_alive()
+    assert model.window_sizes() == [editor, tests]
+
+
+def test_monitor_keeps_running_after_errors(model, caplog):
+    class BrokenWindowManager(EventWindowManager):
+        def get_window_geometries(self) -> dtos.GeometrySnapshot:
+            if self._snapshot is None:
+                raise RuntimeError("sway went away")
+            return super().get_window_geometries()
+
+    window_manager = BrokenWindowManager(snapshot(editor))
+    monitor = geometry.GeometryMonitor(window_manager, model)
+    monitor.start()
+    window_manager.snapshots.put(None)
+    window_manager.snapshots.put(snapshot(tests))
+    wait_until(lambda: model.window_sizes() == [tests])
+    assert "failed to update window sizes" in caplog.text
+    monitor.stop()
+    window_manager.snapshots.put(snapshot())
+    assert monitor._thread is not None
+    monitor._thread.join(5)
+
+
+def test_stop_before_next_change(model):
+    window_manager = EventWindowManager(snapshot(editor))
+    monitor = geometry.GeometryMonitor(window_manager, model)
+    monitor.stop()
+    monitor._watch()
+    assert window_manager.fetches == []
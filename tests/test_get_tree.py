@@ -3,6 +3,11 @@ import pytest
 from rezide import get_tree
 from tests import fakes
 
+tree = [
+    fakes.FakeNode("alacritty", fakes.FakeRect(0, 0, 100, 200), None, ["editor"], id=1),
+    fakes.FakeNode("alacritty", fakes.FakeRect(0, 0, 100, 200), None, ["tests"], id=2),
+]
+
 
 @pytest.fixture
 def mock_window_manager(mocker):
@@ -30,7 +35,52 @@ def test_get_tree(click_runner):
 
 def test_click_handles_options(click_runner, mock_window_manager, mock_print_tree):
     click_runner.invoke(get_tree.main)
-    mock_print_tree.assert_called_once_with(mock_window_manager())
+    mock_print_tree.assert_called_once_with(mock_window_manager(), None)
+
+
+def test_print_tree_as_ndjson(click_runner, mock_window_manager):
+    mock_window_manager.return_value = fakes.FakeWindowManager(tree=tree)
+    result = click_runner.invoke(
+        get_tree.main,
+        ["--format", "ndjson", "--fields", "id,marks", "--workspace", "2"],
+    )
+    assert result.exit_code == 0, result.exception
+    assert result.output.splitlines() == [
+        '{"id": 1, "marks": ["editor"]}',
+        '{"id": 2, "marks": ["tests"]}',
+    ]
+    assert mock_window_manager.return_value.requested_workspaces == ["2"]
+
+
+def test_watch_tree(click_runner, mocker, mock_window_manager):
+    """Watching only stops when the user stops it"""
+    mock_window_manager.return_value = fakes.FakeWindowManager(tree=tree)
+    mock_changed_records = mocker.patch("rezide.utils.records.changed_records")
+    mock_changed_records.return_value = [
+        {"id": 1, "name": "alacritty", "status": "added"}
+    ]
+    result = click_runner.invoke(
+        get_tree.main, ["--format", "csv", "--fields", "id,name", "--watch"]
+    )
+    assert result.exit_code == 0, result.exception
+    assert result.output == "id,name,status\n1,alacritty,added\n"
+    _, _, wait_for_change = mock_changed_records.call_args.args
+    assert wait_for_change == mock_window_manager.return_value.wait_for_tree_change
+
+
+@pytest.mark.parametrize(
+    "cli_args",
+    [
+        ["--watch"],
+        ["--format", "json", "--watch"],
+        ["--format", "json", "--fields", "id,colour"],
+        ["--format", "json", "--fields", ","],
+        ["--format", "xml"],
+    ],
+)
+def test_invalid_options(click_runner, mock_window_manager, cli_args):
+    result = click_runner.invoke(get_tree.main, cli_args)
+    assert result.exit_code == 2
 
 
 def test_print_tree_runs():
@@ -3,6 +3,7 @@ from unittest import mock
 import pytest
 
 from rezide import get_window_sizes
+from tests import fakes
 
 
 @pytest.fixture
@@ -27,11 +28,32 @@ def test_click_handles_options(
     """Click should handle the user's input and specified flags to pass in the right
     details to the print_window_sizes function
     """
-    click_runner.invoke(get_window_sizes.main)
-    mock_print_window_sizes.assert_called_once_with(mock_window_manager())
+    click_runner.invoke(get_window_sizes.main, ["--workspace", "2"])
+    mock_print_window_sizes.assert_called_once_with(mock_window_manager(), "2")
+
+
+def test_print_window_sizes_as_csv(click_runner, mock_window_manager):
+    mock_window_manager.return_value = fakes.FakeWindowManager(
+        tree=[
+            fakes.FakeNode(
+                "alacritty",
+                fakes.FakeRect(0, 0, 100, 200),
+                None,
+                ["editor", "main"],
+                id=1,
+                window_rect=fakes.FakeRect(2, 2, 96, 196),
+            )
+        ]
+    )
+    result = click_runner.invoke(get_window_sizes.main, ["--format", "csv"])
+    assert result.exit_code == 0, result.exception
+    assert result.output.splitlines() == [
+        "id,marks,window_width,window_height",
+        '1,"[""editor"", ""main""]",96,196',
+    ]
 
 
 def test_calls_window_manager():
     window_manager = mock.MagicMock()
     get_window_sizes.print_window_sizes(window_manager)
-    window_manager.get_window_sizes.assert_called_once_with()
+    window_manager.get_window_sizes.assert_called_once_with(None)
@@ -0,0 +1,191 @@
+import sqlite3
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import history
+
+
+def span(name, start, duration, **args):
+    return {"name": name, "ts": start * 1e6, "dur": duration * 1e6, "args": args}
+
+
+def run_events(editor_duration=1.0, browser_duration=2.0):
+    return [
+        span("config discovery", 0, 0.5),
+        span("make_window", 0.5, editor_duration, mark="editor"),
+        span("split_and_mark_parent", 0.5 + editor_duration, 0.25, split="vertical"),
+        span("make_window", 0.75 + editor_duration, browser_duration, mark="browser"),
+    ]
+
+
+@pytest.fixture
+def run_history(tmp_path):
+    return history.RunHistory(str(tmp_path / "state" / "history.sqlite3"), lambda: 100)
+
+
+def test_default_history_path(monkeypatch):
+    monkeypatch.setenv("XDG_STATE_HOME", "/state")
+    assert history.default_history_path() == "/state/rezide/history.sqlite3"
+    monkeypatch.delenv("XDG_STATE_HOME")
+    monkeypatch.setenv("HOME", "/home/me")
+    assert (
+        history.default_history_path() == "/home/me/.local/state/rezide/history.sqlite3"
+    )
+
+
+def test_steps_from_trace():
+    events = [span("make_window", 0, 1.5, mark="editor"), span("focus", 1.5, 0.5)]
+    events[1]["args"]["error"] = "RuntimeError"
+    assert history.steps_from_trace(events) == [
+        dtos.RunStep("make_window", "editor", 1.5, "ok"),
+        dtos.RunStep("focus", None, 0.5, "error"),
+    ]
+
+
+def test_commands_are_saved_with_their_steps():
+    events = [span("make_window", 0, 1.5, mark="editor", command="kak")]
+    assert history.steps_from_trace(events) == [
+        dtos.RunStep("make_window", "editor", 1.5, "ok", "kak")
+    ]
+
+
+def test_startup_times(run_history):
+    for duration in (1.0, 3.0, 2.0):
+        run_history.record(
+            "coding",
+            "ok",
+            [
+                span("make_window", 0, duration, mark="editor", command="kak"),
+                span("make_window", duration, 0.5, mark="notes", command="vim"),
+                span("place_prelaunched", duration, 0.1, mark="web", command="ff"),
+            ],
+        )
+    failed = span("make_window", 0, 9.0, mark="browser", command="firefox")
+    failed["args"]["error"] = "RuntimeError"
+    run_history.record("coding", "error", [failed, span("make_window", 0, 9.0)])
+    assert run_history.startup_times() == {"kak": 2.0, "vim": 0.5}
+
+
+def test_startup_times_without_history(run_history):
+    assert run_history.startup_times() == {}
+
+
+def test_old_histories_are_migrated(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.executescript(history.MIGRATIONS[0])
+    connection.execute("PRAGMA user_version = 1")
+    connection.execute("INSERT INTO runs VALUES (1, 'coding', 0, 1.0, 'ok')")
+    connection.execute("INSERT INTO steps VALUES (1, 'make_window', 'a', 1.0, 'ok')")
+    connection.commit()
+    connection.close()
+    run_history = history.RunHistory(str(path))
+    run_history.record("coding", "ok", [span("make_window", 0, 2.0, command="kak")])
+    assert run_history.startup_times() == {"kak": 2.0}
+    assert run_history.report().runs.samples == 2
+
+
+def test_trace_duration():
+    assert history.trace_duration(run_events()) == 3.75
+    assert history.trace_duration([]) == 0
+
+
+def test_summarize():
+    summary = history.summarize([float(value) for value in range(11, 0, -1)])
+    assert summary[:3] == (11, 6.0, 10.0)
+    assert summary.p99 == pytest.approx(10.9)
+    assert history.summarize([2.0]) == dtos.DurationSummary(1, 2.0, 2.0, 2.0)
+
+
+def test_runs_are_saved_in_one_transaction(run_history, tmp_path):
+    run_history.record("coding", "ok", run_events())
+    connection = sqlite3.connect(tmp_path / "state" / "history.sqlite3")
+    assert connection.execute("SELECT * FROM runs").fetchall() == [
+        (1, "coding", 96.25, 3.75, "ok")
+    ]
+    assert connection.execute("SELECT COUNT(*) FROM steps").fetchone() == (4,)
+    connection.close()
+
+
+def test_report(run_history):
+    for _ in range(3):
+        run_history.record("coding", "ok", run_events())
+    run_history.record("coding", "error", run_events(browser_duration=9))
+    run_history.record("review", "ok", run_events(editor_duration=0.5))
+    report = run_history.report()
+    assert report.runs.samples == 4
+    assert report.failed_runs == 1
+    assert report.steps["config discovery"] == dtos.DurationSummary(5, 0.5, 0.5, 0.5)
+    assert report.regressions == []
+    assert report.slowest_clients == [
+        dtos.ClientTiming("browser", 2.0, 5),
+        dtos.ClientTiming("editor", 1.0, 5),
+    ]
+    assert run_history.report("review").runs == dtos.DurationSummary(
+        1, 3.25, 3.25, 3.25
+    )
+
+
+def test_regressions(run_history):
+    for editor_duration in [1.0] * 5 + [3.0] * 5:
+        run_history.record("coding", "ok", run_events(editor_duration))
+    assert run_history.report().regressions == [dtos.Regression("coding", 5.75, 3.75)]
+
+
+def test_a_few_slow_runs_arent_a_regression(run_history):
+    for editor_duration in [1.0] * 8 + [3.0] * 2:
+        run_history.record("coding", "ok", run_events(editor_duration))
+    assert run_history.report().regressions == []
+
+
+def test_report_without_history(run_history):
+    report = run_history.report()
+    assert report.runs.samples == 0
+    assert history.describe_report(report) == ["no runs recorded yet"]
+
+
+def test_failing_to_save_is_only_logged(tmp_path, caplog):
+    # the history's directory can't be created inside of a file
+    (tmp_path / "state").write_text("")
+    run_history = history.RunHistory(str(tmp_path / "state" / "history.sqlite3"))
+    run_history.record("coding", "ok", run_events())
+    assert "couldn't save this run to the history" in caplog.text
+
+
+def test_failing_to_write_rows_is_only_logged(run_history, caplog):
+    run_history.record("coding", "ok", [span("focus", 0, 1, mark=["not", "text"])])
+    assert "couldn't save this run to the history" in caplog.text
+    assert run_history.report().failed_runs == 0
+
+
+def test_describe_report(run_history):
+    for editor_duration in [1.0] * 5 + [3.0] * 5:
+        run_history.record("coding", "ok", run_events(editor_duration))
+    run_history.record("coding", "error", run_events())
+    assert history.describe_report(run_history.report()) == [
+        "11 runs (1 failed): p50 4.75s, p90 5.75s, p99 5.75s",
+        "steps:",
+        "  make_window            p50 2.00s, p90 3.00s, p99 3.00s (22)",
+        "  config discovery       p50 0.50s, p90 0.50s, p99 0.50s (11)",
+        "  split_and_mark_parent  p50 0.25s, p90 0.25s, p99 0.25s (11)",
+        "regressions:",
+        "  coding: the last 5 runs took 5.75s, up from 3.75s",
+        "slowest clients:",
+        "  browser: 2.00s over 11 runs",
+        "  editor: 1.00s over 11 runs",
+    ]
+
+
+def test_describe_report_without_steps():
+    report = dtos.HistoryReport(dtos.DurationSummary(1, 2.0, 2.0, 2.0), 0, {}, [], [])
+    assert history.describe_report(report) == [
+        "1 runs (0 failed): p50 2.00s, p90 2.00s, p99 2.00s"
+    ]
+
+
+def test_history_in_the_current_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_history = history.RunHistory("history.sqlite3")
+    run_history.record("coding", "ok", run_events())
+    assert run_history.report().runs.samples == 1
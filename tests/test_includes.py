@@ -0,0 +1,204 @@
+import pytest
+
+from rezide.utils import config_dir
+from rezide.utils import config_readers
+from rezide.utils import dtos
+from rezide.utils import includes
+from tests import fakes
+
+common_layout = """
+[root]
+split = "horizontal"
+children = ["linters", "test-runner"]
+sizes = [50, 50]
+
+[linters]
+split = "vertical"
+children = ["flake8", "mypy"]
+sizes = [50, 50]
+
+[flake8]
+command = "watch flake8"
+
+[mypy]
+command = "watch mypy"
+
+[test-runner]
+command = "ptw"
+"""
+
+ide_layout = """
+include = ["common"]
+
+[root]
+split = "horizontal"
+children = ["editor", "linters"]
+sizes = [70, 30]
+
+[editor]
+command = "kak"
+"""
+
+docs_layout = """
+[root]
+split = "horizontal"
+children = ["editor", "checks"]
+sizes = [70, 30]
+
+[editor]
+command = "kak"
+
+[checks]
+use = "common:linters"
+"""
+
+
+@pytest.fixture
+def files():
+    return {
+        "/home/test/.rezide/common/config.toml": common_layout,
+        "/home/test/.rezide/ide/config.toml": ide_layout,
+        "/home/test/.rezide/docs/config.toml": docs_layout,
+    }
+
+
+@pytest.fixture
+def modules(filestore, spy_reader):
+    env = dtos.Env(home="/home/test", xdg_config_home="")
+    return includes.ModuleCache(config_dir.ConfigDir(filestore, env), spy_reader)
+
+
+def test_include(modules):
+    assert modules.get("ide") == {
+        "root": {
+            "split": "horizontal",
+            "children": ["editor", "linters"],
+            "sizes": [70, 30],
+        },
+        "editor": {"command": "kak"},
+        "linters": {
+            "split": "vertical",
+            "children": ["flake8", "mypy"],
+            "sizes": [50, 50],
+        },
+        "flake8": {"command": "watch flake8"},
+        "mypy": {"command": "watch mypy"},
+        "test-runner": {"command": "ptw"},
+    }
+
+
+def test_use(modules):
+    assert modules.get("docs") == {
+        "root": {
+            "split": "horizontal",
+            "children": ["editor", "checks"],
+            "sizes": [70, 30],
+        },
+        "editor": {"command": "kak"},
+        "checks": {
+            "split": "vertical",
+            "children": ["flake8", "mypy"],
+            "sizes": [50, 50],
+        },
+        "flake8": {"command": "watch flake8"},
+        "mypy": {"command": "watch mypy"},
+    }
+
+
+def test_origins(modules):
+    modules.get("ide")
+    modules.get("docs")
+    assert modules.origin("ide", "editor") == "ide"
+    assert modules.origin("ide", "flake8") == "common"
+    # used definitions are written in the layout that they're used from
+    assert modules.origin("docs", "checks") == "common"
+    assert modules.origin("docs", "mypy") == "common"
+    assert modules.origin("unloaded", "editor") == "unloaded"
+    modules.invalidate("common")
+    assert modules.origin("ide", "flake8") == "ide"
+
+
+def test_modules_are_only_read_once(modules, spy_reader):
+    modules.get("ide")
+    modules.get("docs")
+    assert modules.get("common") is modules.get("common")
+    assert spy_reader.read.call_count == 3
+
+
+def test_invalidate_forgets_dependents(modules, spy_reader):
+    modules.get("ide")
+    modules.get("docs")
+    assert modules.invalidate("common") == {"common", "ide", "docs"}
+    assert "ide" not in modules
+    modules.get("ide")
+    assert spy_reader.read.call_count == 5
+
+
+def test_invalidate_keeps_unrelated_layouts(modules):
+    modules.get("ide")
+    modules.get("docs")
+    assert modules.invalidate("ide") == {"ide"}
+    assert "docs" in modules
+    assert "common" in modules
+
+
+def test_clear(modules):
+    modules.get("ide")
+    modules.clear()
+    assert "ide" not in modules
+    assert "common" not in modules
+
+
+def load_from(module_dicts):
+    return lambda module_name: module_dicts[module_name]
+
+
+def test_identical_definitions_are_merged():
+    resolved = includes.resolve(
+        {"include": ["a"], "editor": {"command": "kak"}},
+        load_from({"a": {"root": {"split": "vertical"}, "editor": {"command": "kak"}}}),
+    )
+    assert resolved == {"editor": {"command": "kak"}}
+
+
+def test_missing_children_are_left_for_validation():
+    resolved = includes.resolve(
+        {"pair": {"use": "a:pair"}},
+        load_from({"a": {"pair": {"children": ["missing", "here"]}, "here": {}}}),
+    )
+    assert resolved == {"pair": {"children": ["missing", "here"]}, "here": {}}
+
+
+@pytest.mark.parametrize(
+    "config_dict",
+    [
+        # conflicting definitions
+        {"include": ["a"], "editor": {"command": "vim"}},
+        # include isn't a list of names
+        {"include": "a"},
+        {"include": [1]},
+        # use has to be the only key
+        {"checks": {"use": "a:editor", "command": "kak"}},
+        # use needs a layout and a definition
+        {"checks": {"use": "editor"}},
+        {"checks": {"use": "a:missing"}},
+    ],
+)
+def test_invalid_directives(config_dict):
+    with pytest.raises(RuntimeError):
+        includes.resolve(config_dict, load_from({"a": {"editor": {"command": "kak"}}}))
+
+
+def test_include_cycles_are_rejected():
+    filestore = fakes.FakeFilestore(
+        {
+            "/home/test/.rezide/a/config.toml": 'include = ["b"]',
+            "/home/test/.rezide/b/config.toml": 'include = ["a"]',
+        }
+    )
+    env = dtos.Env(home="/home/test", xdg_config_home="")
+    modules = includes.ModuleCache(
+        config_dir.ConfigDir(filestore, env), config_readers.TomlReader(filestore)
+    )
+    with pytest.raises(RuntimeError, match="a -> b -> a"):
+        modules.get("a")
@@ -0,0 +1,162 @@
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import launcher
+from tests import fakes
+
+
+class FakeContainer(NamedTuple):
+    id: int
+    pid: Optional[int] = None
+    name: Optional[str] = None
+
+
+class FakeWindowEvent(NamedTuple):
+    change: str
+    container: FakeContainer
+
+
+def stat(pid: int, parent_pid: int, name: str = "sh") -> str:
+    return f"{pid} ({name}) S {parent_pid} {pid} {pid} 0 -1"
+
+
+def soon(seconds: float = 2.0) -> float:
+    return time.monotonic() + seconds
+
+
+@pytest.fixture
+def client_launcher():
+    filestore = fakes.FakeFilestore(
+        {
+            # a wrapper script that started a client, with a process name that
+            # looks like the end of the name
+            "/proc/20/stat": stat(20, 10, name="wrap) S 1"),
+            "/proc/30/stat": stat(30, 20),
+            "/proc/40/stat": stat(40, 1),
+        }
+    )
+    client_launcher = launcher.Launcher(filestore, poll_interval=0.01)
+    yield client_launcher
+    client_launcher.close()
+
+
+def test_launch_tracks_exit_codes(client_launcher):
+    pid = client_launcher.launch("exit 3")
+    deadline = soon()
+    while client_launcher.exit_code(pid) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client_launcher.exit_code(pid) == 3
+
+
+@pytest.mark.parametrize(
+    "window_pid,expected",
+    [(10, True), (20, True), (30, True), (40, False), (50, False), (None, False)],
+)
+def test_started(client_launcher, window_pid, expected):
+    assert client_launcher.started(10, window_pid) == expected
+
+
+def test_wait_for_window_skips_other_processes(client_launcher, mocker):
+    pid = client_launcher.launch("sleep 5")
+    mocker.patch.object(
+        client_launcher, "started", side_effect=lambda launched, window: window == pid
+    )
+    events: queue.Queue = queue.Queue()
+    events.put(FakeWindowEvent("focus", FakeContainer(1, pid=pid)))
+    events.put(FakeWindowEvent("new", FakeContainer(2, pid=12345)))
+    events.put(FakeWindowEvent("new", FakeContainer(3, pid=pid)))
+    assert client_launcher.wait_for_window(pid, events, soon()).id == 3
+
+
+def test_wait_for_window_fails_when_the_client_crashes(client_launcher):
+    pid = client_launcher.launch("exit 3")
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        client_launcher.wait_for_window(pid, queue.Queue(), soon())
+
+
+def test_wait_for_window_accepts_a_handed_off_window(client_launcher):
+    pid = client_launcher.launch("true")
+    deadline = soon()
+    while client_launcher.exit_code(pid) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    events: queue.Queue = queue.Queue()
+    events.put(FakeWindowEvent("new", FakeContainer(7, pid=12345)))
+    assert client_launcher.wait_for_window(pid, events, soon()).id == 7
+
+
+def test_wait_for_window_times_out(client_launcher):
+    pid = client_launcher.launch("sleep 5")
+    with pytest.raises(RuntimeError, match="never opened a window"):
+        client_launcher.wait_for_window(pid, queue.Queue(), soon(0.05))
+
+
+def test_wait_until_ready_without_probes(client_launcher):
+    details = dtos.WindowDetails(mark="a", command="alacritty")
+    client_launcher.wait_until_ready(details, FakeContainer(1), queue.Queue(), soon())
+
+
+def test_title_that_already_matches(client_launcher, caplog):
+    details = dtos.WindowDetails(mark="a", command="alacritty", ready_title="vim$")
+    container = FakeContainer(1, name="main.py - nvim")
+    client_launcher.wait_until_ready(details, container, queue.Queue(), soon(0))
+    assert caplog.records == []
+
+
+def test_title_from_a_later_event(client_launcher, caplog):
+    details = dtos.WindowDetails(mark="a", command="alacritty", ready_title="vim$")
+    events: queue.Queue = queue.Queue()
+    events.put(FakeWindowEvent("title", FakeContainer(2, name="nvim")))
+    events.put(FakeWindowEvent("title", FakeContainer(1, name=None)))
+    events.put(FakeWindowEvent("title", FakeContainer(1, name="nvim")))
+    client_launcher.wait_until_ready(details, FakeContainer(1), events, soon())
+    assert caplog.records == []
+    assert events.empty()
+
+
+@pytest.mark.parametrize("timeout", [0, 0.05])
+def test_title_times_out(client_launcher, caplog, timeout):
+    details = dtos.WindowDetails(mark="a", command="alacritty", ready_title="vim$")
+    with caplog.at_level(logging.WARNING):
+        client_launcher.wait_until_ready(
+            details, FakeContainer(1, name="bash"), queue.Queue(), soon(timeout)
+        )
+    assert "never got a title" in caplog.text
+
+
+def test_socket_that_opens_later(client_launcher, caplog, tmp_path, monkeypatch):
+    monkeypatch.setenv("REZIDE_TEST_DIR", str(tmp_path))
+    details = dtos.WindowDetails(
+        mark="a", command="nvim", ready_socket="$REZIDE_TEST_DIR/ready.sock"
+    )
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+
+        def listen() -> None:
+            server.bind(os.path.join(tmp_path, "ready.sock"))
+            server.listen()
+
+        timer = threading.Timer(0.05, listen)
+        timer.start()
+        client_launcher.wait_until_ready(
+            details, FakeContainer(1), queue.Queue(), soon()
+        )
+        timer.join()
+    assert caplog.records == []
+
+
+def test_socket_times_out(client_launcher, caplog, tmp_path):
+    details = dtos.WindowDetails(
+        mark="a", command="nvim", ready_socket=os.path.join(tmp_path, "never.sock")
+    )
+    with caplog.at_level(logging.WARNING):
+        client_launcher.wait_until_ready(
+            details, FakeContainer(1), queue.Queue(), soon(0.05)
+        )
+    assert "never opened the socket" in caplog.text
@@ -0,0 +1,141 @@
+import concurrent.futures
+import threading
+
+import pytest
+
+from rezide.utils import config_dir
+from rezide.utils import dtos
+from rezide.utils import layout_cache
+from rezide.utils import tree
+from tests import fakes
+
+valid_layout = """
+[root]
+split = "horizontal"
+children = ["left", "right"]
+sizes = [50, 50]
+
+[left]
+command = "alacritty"
+
+[right]
+command = "alacritty"
+"""
+
+invalid_layout = """
+[root]
+split = "horizontal"
+children = ["left"]
+sizes = [100]
+
+[left]
+command = "alacritty"
+"""
+
+
+including_layout = """
+include = ["valid"]
+
+[root]
+split = "vertical"
+children = ["top", "right"]
+sizes = [50, 50]
+
+[top]
+command = "kak"
+"""
+
+
+@pytest.fixture
+def files():
+    return {
+        "/home/test/.rezide/valid/config.toml": valid_layout,
+        "/home/test/.rezide/invalid/config.toml": invalid_layout,
+        "/home/test/.rezide/including/config.toml": including_layout,
+    }
+
+
+@pytest.fixture
+def cache(filestore, spy_reader):
+    env = dtos.Env(home="/home/test", xdg_config_home="")
+    return layout_cache.LayoutCache(
+        config_dir.ConfigDir(filestore, env),
+        spy_reader,
+        tree.TreeFactory(),
+        fakes.SpyWindowManager(),
+    )
+
+
+def test_layouts_are_only_read_once(cache, spy_reader):
+    assert cache.get("valid") is cache.get("valid")
+    spy_reader.read.assert_called_once_with("/home/test/.rezide/valid/config.toml")
+
+
+def test_invalid_layouts_raise_errors(cache):
+    with pytest.raises(RuntimeError):
+        cache.get("invalid")
+    assert "invalid" not in cache
+
+
+def test_preload_skips_invalid_layouts(cache, spy_reader):
+    cache.preload()
+    assert "valid" in cache
+    assert "invalid" not in cache
+    assert spy_reader.read.call_count == 3
+
+
+def test_invalidate_forces_a_reload(cache, spy_reader):
+    cache.get("valid")
+    cache.invalidate("valid")
+    assert "valid" not in cache
+    cache.get("valid")
+    assert spy_reader.read.call_count == 2
+
+
+def test_clear_forgets_everything(cache):
+    cache.preload()
+    cache.clear()
+    assert "valid" not in cache
+
+
+def test_layouts_load_at_the_same_time(filestore, spy_reader):
+    # each tree is only built once both layouts have started building theirs
+    both_loading = threading.Barrier(2, timeout=5)
+
+    class WaitingTreeFactory(tree.TreeFactory):
+        def create_tree(self, tree_dict):
+            both_loading.wait()
+            return super().create_tree(tree_dict)
+
+    env = dtos.Env(home="/home/test", xdg_config_home="")
+    cache = layout_cache.LayoutCache(
+        config_dir.ConfigDir(filestore, env),
+        spy_reader,
+        WaitingTreeFactory(),
+        fakes.SpyWindowManager(),
+    )
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        loaded = list(executor.map(cache.get, ["valid", "including"]))
+    assert loaded == [cache.get("valid"), cache.get("including")]
+
+
+def test_layouts_that_change_while_loading_arent_cached(cache, mocker):
+    load = cache._load
+
+    def load_then_change(layout_name):
+        layout_manager = load(layout_name)
+        cache.invalidate(layout_name)
+        return layout_manager
+
+    mocker.patch.object(cache, "_load", side_effect=load_then_change)
+    cache.get("valid")
+    assert "valid" not in cache
+
+
+def test_invalidate_forgets_layouts_that_include_it(cache, spy_reader):
+    cache.get("including")
+    # only layouts that were loaded before need loading again
+    assert cache.invalidate("valid") == {"including"}
+    assert "including" not in cache
+    cache.get("including")
+    assert spy_reader.read.call_count == 4
@@ -4,6 +4,7 @@ import pytest
 
 from rezide.utils import dtos
 from rezide.utils import layouts
+from rezide.utils import pool
 from tests import fakes
 
 
@@ -255,6 +256,165 @@ def test_layout_calls_window_manager(test_case):
     assert spy_window_manager.calls == test_case.expected_call_args
 
 
+pooled_layout = {
+    "split": "horizontal",
+    "sizes": [50, 50],
+    "children": [
+        {"mark": "editor", "command": "alacritty -e kak", "terminal_command": "kak"},
+        {"mark": "browser", "command": "firefox"},
+    ],
+}
+editor = dtos.WindowDetails(
+    mark="editor", command="alacritty -e kak", terminal_command="kak"
+)
+browser = dtos.WindowDetails(mark="browser", command="firefox")
+
+
+@pytest.fixture
+def client_pool():
+    filestore = fakes.FakeFilestore({})
+    client_pool = pool.ClientPool(
+        fakes.FakeWindowManager(), filestore, 1, "foot", "/run/pool"
+    )
+    client_pool.fill()
+    return client_pool
+
+
+def test_windows_run_in_warm_terminals(client_pool):
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(pooled_layout), spy_window_manager, client_pool
+    )
+    layout.spawn_windows()
+    assert spy_window_manager.calls == [
+        dtos.WindowManagerCall("adopt", (1, editor)),
+        dtos.WindowManagerCall("split", "horizontal"),
+        dtos.WindowManagerCall("make", browser),
+    ]
+    assert len(client_pool) == 0
+
+
+def test_windows_start_from_scratch_when_the_pool_is_empty(client_pool):
+    client_pool.claim()
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(pooled_layout), spy_window_manager, client_pool
+    )
+    layout.spawn_windows()
+    assert spy_window_manager.calls[0] == dtos.WindowManagerCall("make", editor)
+
+
+def test_marks():
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(pooled_layout), fakes.FakeWindowManager()
+    )
+    assert layout.marks() == ["editor", "browser"]
+
+
+slow_layout = {
+    "split": "horizontal",
+    "sizes": [50, 50],
+    "children": [
+        {"mark": "editor", "command": "alacritty -e kak", "terminal_command": "kak"},
+        {
+            "split": "vertical",
+            "sizes": [50, 50],
+            "children": [
+                {"mark": "browser", "command": "firefox"},
+                {"mark": "ide", "command": "idea"},
+            ],
+        },
+    ],
+}
+startup_times = {"firefox": 2.0, "idea": 8.0, "alacritty -e kak": 1.0}
+slow_editor = dtos.WindowDetails(
+    mark="editor", command="alacritty -e kak", terminal_command="kak"
+)
+slow_browser = dtos.WindowDetails(mark="browser", command="firefox")
+slow_ide = dtos.WindowDetails(mark="ide", command="idea")
+
+
+def test_slow_clients_are_started_first():
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(slow_layout),
+        spy_window_manager,
+        startup_times=startup_times,
+    )
+    layout.spawn_windows()
+    assert spy_window_manager.calls[:3] == [
+        dtos.WindowManagerCall("prelaunch", slow_ide),
+        dtos.WindowManagerCall("prelaunch", slow_browser),
+        dtos.WindowManagerCall("make", slow_editor),
+    ]
+    assert dtos.WindowManagerCall("make", slow_ide) in spy_window_manager.calls
+
+
+def test_adopted_and_pooled_windows_arent_started_early(client_pool):
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(slow_layout),
+        spy_window_manager,
+        client_pool,
+        startup_times={**startup_times, "alacritty -e kak": 9.0},
+    )
+    layout.spawn_windows(adopted={"ide": 7})
+    assert all(call.command != "prelaunch" for call in spy_window_manager.calls)
+
+
+def test_nothing_is_started_early_when_every_client_is_fast():
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(slow_layout),
+        spy_window_manager,
+        startup_times={"idea": 0.1},
+    )
+    layout.spawn_windows()
+    assert all(call.command != "prelaunch" for call in spy_window_manager.calls)
+
+
+class ClosedTerminalWindowManager(fakes.SpyWindowManager):
+    def adopt_window(self, con_id: int, window_details: dtos.WindowDetails) -> None:
+        raise RuntimeError("sway failed to run `scratchpad show`: No matching node")
+
+
+def test_windows_start_from_scratch_when_a_warm_terminal_closed(client_pool, caplog):
+    spy_window_manager = ClosedTerminalWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(pooled_layout), spy_window_manager, client_pool
+    )
+    layout.spawn_windows()
+    assert spy_window_manager.calls[:2] == [
+        dtos.WindowManagerCall("close", [1]),
+        dtos.WindowManagerCall("make", editor),
+    ]
+    assert "couldn't use a warm terminal for editor" in caplog.text
+
+
+class BrokenPipeFilestore(fakes.FakeFilestore):
+    def write_fifo(self, path: str, contents: str) -> None:
+        raise RuntimeError(f"Nothing is reading from {path}")
+
+
+def test_warm_terminals_that_cant_run_the_command_are_never_placed(caplog):
+    client_pool = pool.ClientPool(
+        fakes.FakeWindowManager(), BrokenPipeFilestore({}), 1, "foot", "/run/pool"
+    )
+    client_pool.fill()
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(pooled_layout), spy_window_manager, client_pool
+    )
+    layout.spawn_windows()
+    # the empty terminal is closed instead of ending up next to the new window
+    assert spy_window_manager.calls[:2] == [
+        dtos.WindowManagerCall("close", [1]),
+        dtos.WindowManagerCall("make", editor),
+    ]
+    assert all(call.command != "adopt" for call in spy_window_manager.calls)
+    assert "couldn't use a warm terminal for editor" in caplog.text
+
+
 @pytest.mark.parametrize("num_children", [2, 5, 20])
 def test_doesnt_raise_exception_when_2_or_more_children(num_children):
     """no exception raised with same config as above, but multiple children"""
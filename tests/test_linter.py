@@ -0,0 +1,229 @@
+import json
+import os
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import filestore
+from rezide.utils import linter
+from tests import fakes
+
+CONFIG_DIR = "/home/test/.rezide"
+
+valid_layout = """
+[root]
+split = "horizontal"
+children = ["left", "right"]
+sizes = [50, 50]
+
+[left]
+command = "alacritty"
+
+[right]
+command = "alacritty"
+"""
+
+invalid_layout = """
+[root]
+split = "horizontal"
+children = ["left", "missing"]
+sizes = [50, 40]
+
+[left]
+command = "alacritty"
+mark = "left"
+"""
+
+
+def layout_path(layout_name: str) -> str:
+    return f"{CONFIG_DIR}/{layout_name}/config.toml"
+
+
+@pytest.fixture
+def files():
+    return {
+        layout_path("valid"): valid_layout,
+        layout_path("invalid"): invalid_layout,
+        layout_path("no-root"): '[left]\ncommand = "kak"\n',
+        layout_path("broken-toml"): "[root\n",
+        layout_path("bad-include"): 'include = ["broken-toml"]\n',
+        layout_path("bad-use"): '[checks]\nuse = "valid:nothing"\n',
+        layout_path("includes-invalid"): 'include = ["invalid"]\n'
+        + '[root]\nsplit = "vertical"\nchildren = ["left", "top"]\nsizes = [50, 50]\n'
+        + '[top]\ncommand = "kak"\n',
+        layout_path("includes-missing"): 'include = ["later"]\n',
+        layout_path("sizes-string"): malformed_layout('["left", "right"]', '"50,50"'),
+        layout_path("sizes-strings"): malformed_layout(
+            '["left", "right"]', '["50", "50"]'
+        ),
+        layout_path("children-string"): malformed_layout('"left"', "[50, 50]"),
+        layout_path("children-numbers"): malformed_layout("[1, 2]", "[50, 50]"),
+        layout_path("uses-malformed"): malformed_layout('["left", "right"]', "[50, 50]")
+        + '[other]\nuse = "children-string:root"\n',
+        layout_path("use-number"): "[checks]\nuse = 5\n",
+    }
+
+
+def malformed_layout(children: str, sizes: str) -> str:
+    return (
+        f'[root]\nsplit = "horizontal"\nchildren = {children}\nsizes = {sizes}\n'
+        + '[left]\ncommand = "kak"\n[right]\ncommand = "kak"\n'
+    )
+
+
+@pytest.fixture
+def local_filestore(files):
+    return fakes.FakeFilestore(files)
+
+
+def check(local_filestore, layout_name):
+    return linter.check_layout(local_filestore, CONFIG_DIR, layout_name)
+
+
+def test_valid_layout(local_filestore):
+    layout_check = check(local_filestore, "valid")
+    assert layout_check.problems == []
+    assert layout_check.file_hashes == {
+        layout_path("valid"): linter.hash_contents(valid_layout)
+    }
+
+
+def test_every_problem_is_reported(local_filestore):
+    problems = check(local_filestore, "invalid").problems
+    assert [problem[:3] for problem in problems] == [
+        (layout_path("invalid"), "root", "sizes"),
+        (layout_path("invalid"), "left", "mark"),
+    ]
+    assert problems[0].message == "Sum of sizes is not 100: root"
+
+
+@pytest.mark.parametrize(
+    "layout_name,expected_path,expected_table,expected_key",
+    [
+        ("no-root", layout_path("no-root"), "root", None),
+        ("broken-toml", layout_path("broken-toml"), None, None),
+        # the problem is in the included file
+        ("bad-include", layout_path("broken-toml"), None, None),
+        ("bad-use", layout_path("bad-use"), "checks", "use"),
+        ("missing", layout_path("missing"), None, None),
+        ("sizes-string", layout_path("sizes-string"), "root", "sizes"),
+        ("sizes-strings", layout_path("sizes-strings"), "root", "sizes"),
+        ("children-string", layout_path("children-string"), "root", "children"),
+        ("children-numbers", layout_path("children-numbers"), "root", "children"),
+        # the problem is in the file that the malformed definition came from
+        ("uses-malformed", layout_path("children-string"), "other", "children"),
+        ("use-number", layout_path("use-number"), "checks", "use"),
+    ],
+)
+def test_problem_locations(
+    local_filestore, layout_name, expected_path, expected_table, expected_key
+):
+    problems = check(local_filestore, layout_name).problems
+    assert len(problems) == 1
+    assert problems[0].path == expected_path
+    assert problems[0].table == expected_table
+    assert problems[0].key == expected_key
+
+
+@pytest.mark.parametrize(
+    "problem,expected",
+    [
+        (dtos.ConfigProblem("a.toml", None, None, "oops"), "a.toml: oops"),
+        (dtos.ConfigProblem("a.toml", "root", None, "oops"), "a.toml:root: oops"),
+        (
+            dtos.ConfigProblem("a.toml", "root", "sizes", "oops"),
+            "a.toml:root.sizes: oops",
+        ),
+    ],
+)
+def test_format_problem(problem, expected):
+    assert linter.format_problem(problem) == expected
+
+
+def test_cache_skips_unchanged_layouts(local_filestore):
+    cache = linter.CheckCache(local_filestore, "/cache/check.json")
+    checks, cached_count = linter.check_layouts(
+        local_filestore, CONFIG_DIR, ["valid", "invalid"], cache, jobs=1
+    )
+    assert cached_count == 0
+    cache.save()
+    local_filestore.write_file(layout_path("valid"), valid_layout + "\n")
+
+    reloaded_cache = linter.CheckCache(local_filestore, "/cache/check.json")
+    rechecked, cached_count = linter.check_layouts(
+        local_filestore, CONFIG_DIR, ["valid", "invalid"], reloaded_cache, jobs=1
+    )
+    assert cached_count == 1
+    assert rechecked[0] == checks[0]
+    assert rechecked[1].layout == "valid"
+    assert rechecked[1].file_hashes != checks[1].file_hashes
+
+
+def test_included_problems_are_reported_where_they_are(local_filestore):
+    problems = check(local_filestore, "includes-invalid").problems
+    assert [problem[:3] for problem in problems] == [
+        (layout_path("invalid"), "left", "mark")
+    ]
+
+
+def test_a_missing_root_is_reported_with_other_problems(local_filestore):
+    local_filestore.write_file(layout_path("no-root"), '[left]\ncommand = "kak"\nx=1')
+    problems = check(local_filestore, "no-root").problems
+    assert [problem[1:3] for problem in problems] == [("left", "x"), ("root", None)]
+
+
+def test_missing_includes_are_part_of_the_cache_key(local_filestore):
+    cache = linter.CheckCache(local_filestore, "/cache/check.json")
+    layout_check = check(local_filestore, "includes-missing")
+    assert layout_check.file_hashes[layout_path("later")] == linter.MISSING_FILE
+    assert len(layout_check.problems) == 1
+    cache.put(layout_check)
+    assert cache.get("includes-missing") == layout_check
+    local_filestore.write_file(layout_path("later"), valid_layout)
+    assert cache.get("includes-missing") is None
+
+
+def test_cache_misses(local_filestore):
+    cache = linter.CheckCache(local_filestore, "/cache/check.json")
+    # layouts that couldn't be read at all are always checked again
+    cache.put(dtos.LayoutCheck("missing", [], {}))
+    assert cache.get("missing") is None
+    # so are layouts whose files were deleted
+    cache.put(dtos.LayoutCheck("deleted", [], {layout_path("deleted"): "abc"}))
+    assert cache.get("deleted") is None
+
+
+@pytest.mark.parametrize(
+    "contents", ["not json", json.dumps({"version": 0, "layouts": {"a": {}}})]
+)
+def test_unusable_caches_are_ignored(local_filestore, contents):
+    local_filestore.write_file("/cache/check.json", contents)
+    cache = linter.CheckCache(local_filestore, "/cache/check.json")
+    assert cache.get("a") is None
+
+
+def test_layouts_are_checked_in_parallel(tmp_path, files):
+    config_dir_path = os.path.join(tmp_path, "rezide")
+    local_filestore = filestore.LocalFilestore()
+    for path, contents in files.items():
+        local_filestore.write_file(path.replace(CONFIG_DIR, config_dir_path), contents)
+    checks, cached_count = linter.check_layouts(
+        local_filestore, config_dir_path, ["valid", "invalid", "no-root"], jobs=2
+    )
+    assert cached_count == 0
+    assert [layout_check.layout for layout_check in checks] == [
+        "invalid",
+        "no-root",
+        "valid",
+    ]
+    assert [len(layout_check.problems) for layout_check in checks] == [2, 1, 0]
+    # coverage can't see into the worker processes
+    assert linter._check_layout_locally(config_dir_path, "valid") == checks[2]
+
+
+def test_default_cache_path(monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg-cache")
+    assert linter.default_cache_path() == "/xdg-cache/rezide/check.json"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", "/home/test")
+    assert linter.default_cache_path() == "/home/test/.cache/rezide/check.json"
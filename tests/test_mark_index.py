@@ -0,0 +1,45 @@
+import pytest
+
+from rezide.utils import mark_index
+from tests import fakes
+
+
+def node(id: int, *marks: str) -> fakes.FakeNode:
+    return fakes.FakeNode(
+        "alacritty", fakes.FakeRect(0, 0, 1, 1), None, list(marks), id
+    )
+
+
+@pytest.fixture
+def index():
+    return mark_index.MarkIndex([node(1, "editor"), node(2), node(3, "a.b", "tests")])
+
+
+def test_get(index):
+    assert index.get("editor") == 1
+    assert index.get("tests") == 3
+    assert len(index) == 3
+
+
+def test_marks_arent_regexes(index):
+    """Sway's criteria would match both of these to "a.b" """
+    assert index.get("a.b") == 3
+    assert "axb" not in index
+    assert "a" not in index
+    with pytest.raises(RuntimeError):
+        index.get("a.*")
+
+
+def test_add(index):
+    index.add("docs", 4)
+    assert index.get("docs") == 4
+    # marks can only be on one container, so adding a mark moves it
+    index.add("editor", 5)
+    assert index.get("editor") == 5
+
+
+def test_empty_index():
+    index = mark_index.MarkIndex()
+    assert len(index) == 0
+    with pytest.raises(RuntimeError):
+        index.get("editor")
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from rezide.utils import pool
+from tests import fakes
+
+FIFO_DIR = "/run/user/1000/rezide-pool"
+
+
+@pytest.fixture
+def window_manager():
+    return fakes.FakeWindowManager()
+
+
+@pytest.fixture
+def client_pool(window_manager, filestore):
+    return pool.ClientPool(
+        window_manager, filestore, 2, "foot --app-id {app_id}", FIFO_DIR
+    )
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "the pool never caught up"
+        time.sleep(0.001)
+
+
+def test_fill(client_pool, window_manager, filestore):
+    client_pool.fill()
+    assert len(client_pool) == 2
+    assert len(window_manager.hidden_commands) == 2
+    first_client = client_pool.claim()
+    assert first_client.con_id == 1
+    assert filestore.path_exists(first_client.fifo_path)
+    assert window_manager.hidden_commands[0] == client_pool.client_command(
+        first_client.fifo_path
+    )
+
+
+def test_client_command(client_pool):
+    assert client_pool.client_command("/run/a b.fifo") == (
+        "foot --app-id rezide-hidden sh -c"
+        + """ 'read -r command < "$1" && rm -f "$1" && exec sh -c "$command"'"""
+        + " rezide-pool '/run/a b.fifo'"
+    )
+
+
+def test_claim_and_run(client_pool, filestore):
+    client_pool.fill()
+    first_client = client_pool.claim()
+    second_client = client_pool.claim()
+    assert second_client.con_id == 2
+    assert client_pool.claim() is None
+    client_pool.run(first_client, "kak")
+    assert filestore.read_file(first_client.fifo_path) == "kak\n"
+
+
+def test_claimed_terminals_are_replaced(client_pool, window_manager):
+    client_pool.start()
+    wait_for(lambda: len(client_pool) == 2)
+    assert client_pool.claim().con_id == 1
+    wait_for(lambda: len(window_manager.hidden_commands) == 3)
+    wait_for(lambda: len(client_pool) == 2)
+    client_pool.stop()
+
+
+def test_stop_closes_warm_terminals(client_pool, filestore):
+    client_pool.fill()
+    fifo_paths = [
+        f"{FIFO_DIR}/{name}" for name in filestore.list_directory_contents(FIFO_DIR)
+    ]
+    client_pool.stop()
+    assert len(client_pool) == 0
+    assert [filestore.read_file(path) for path in fifo_paths] == ["exit\n", "exit\n"]
+
+
+def test_stop_warns_about_terminals_that_cant_be_closed(client_pool, filestore, caplog):
+    client_pool.fill()
+    for name in filestore.list_directory_contents(FIFO_DIR):
+        filestore._filesystem.remove_object(f"{FIFO_DIR}/{name}")
+    client_pool.stop()
+    assert len(client_pool) == 0
+    assert "couldn't close pooled terminal" in caplog.text
+
+
+class BrokenWindowManager(fakes.FakeWindowManager):
+    def spawn_hidden(self, command: str) -> int:
+        raise RuntimeError("no terminal")
+
+
+def test_failed_refills_are_logged(filestore, caplog):
+    client_pool = pool.ClientPool(BrokenWindowManager(), filestore, 1, "foot", FIFO_DIR)
+    client_pool.start()
+    wait_for(lambda: "failed to refill the client pool" in caplog.text)
+    assert client_pool.claim() is None
+    client_pool.stop()
+
+
+def test_default_fifo_dir(monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert pool.default_fifo_dir() == FIFO_DIR
+
+
+def test_default_fifo_dir_without_a_runtime_dir(monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.gettempdir", lambda: "/tmp")
+    monkeypatch.setattr("os.getuid", lambda: 1000)
+    assert pool.default_fifo_dir() == "/tmp/rezide-pool-1000"
+
+
+def test_stopping_a_pool_that_never_started(client_pool, window_manager):
+    client_pool.stop()
+    client_pool.fill()
+    assert window_manager.hidden_commands == []
@@ -0,0 +1,152 @@
+import itertools
+import json
+from typing import Any, Dict, List, NamedTuple
+
+import pytest
+
+from rezide.utils import records
+from tests import fakes
+
+
+def node(id: int, marks: List[str], width: int = 100) -> fakes.FakeNode:
+    return fakes.FakeNode(
+        "alacritty", fakes.FakeRect(0, 0, width, 200), None, marks, id=id
+    )
+
+
+def test_make_record():
+    gapped_node = fakes.FakeNode(
+        "alacritty",
+        fakes.FakeRect(1, 2, 3, 4),
+        fakes.FakeGaps(inner=5, outer=6),
+        ["editor"],
+        window_rect=fakes.FakeRect(0, 0, 7, 8),
+    )
+    record = records.make_record(
+        gapped_node, ["x", "y", "gaps", "window_width", "window_height"]
+    )
+    assert record == {
+        "x": 1,
+        "y": 2,
+        "gaps": {
+            "inner": 5,
+            "outer": 6,
+            "top": None,
+            "right": None,
+            "bottom": None,
+            "left": None,
+        },
+        "window_width": 7,
+        "window_height": 8,
+    }
+
+
+def test_window_rect_is_optional():
+    record = records.make_record(node(1, []), ["gaps", "window_width"])
+    assert record == {"gaps": None, "window_width": None}
+
+
+class ParseFieldsTestCase(NamedTuple):
+    fields: str
+    expected_fields: List[str]
+
+
+@pytest.mark.parametrize(
+    "test_case",
+    [
+        ParseFieldsTestCase("id", ["id"]),
+        ParseFieldsTestCase("id, marks,", ["id", "marks"]),
+    ],
+)
+def test_parse_fields(test_case):
+    assert records.parse_fields(test_case.fields) == test_case.expected_fields
+
+
+@pytest.mark.parametrize("fields", ["", ",", "id,colour"])
+def test_parse_invalid_fields(fields):
+    with pytest.raises(RuntimeError):
+        records.parse_fields(fields)
+
+
+class WriterTestCase(NamedTuple):
+    output_format: str
+    records: List[Dict[str, Any]]
+    expected_output: str
+
+
+writer_test_cases = [
+    WriterTestCase("json", [], "[]\n"),
+    WriterTestCase(
+        "json",
+        [{"id": 1, "marks": ["a"]}, {"id": 2, "marks": []}],
+        '[\n{"id": 1, "marks": ["a"]},\n{"id": 2, "marks": []}\n]\n',
+    ),
+    WriterTestCase("ndjson", [], ""),
+    WriterTestCase(
+        "ndjson",
+        [{"id": 1, "marks": ["a"]}, {"id": 2, "marks": []}],
+        '{"id": 1, "marks": ["a"]}\n{"id": 2, "marks": []}\n',
+    ),
+    WriterTestCase("csv", [], "id,marks\n"),
+    WriterTestCase(
+        "csv",
+        [{"id": 1, "marks": ["a"]}, {"id": 2, "marks": []}],
+        'id,marks\n1,"[""a""]"\n2,[]\n',
+    ),
+]
+
+
+@pytest.mark.parametrize("test_case", writer_test_cases)
+def test_writers(test_case):
+    chunks: List[str] = []
+    writer = records.WRITERS[test_case.output_format](["id", "marks"], chunks.append)
+    for record in test_case.records:
+        writer.write_record(record)
+    writer.close()
+    assert "".join(chunks) == test_case.expected_output
+
+
+def test_writers_stream_each_record():
+    """Every record is written before the next node is looked at"""
+    chunks: List[str] = []
+    writer = records.NdjsonWriter(["id"], chunks.append)
+
+    def nodes():
+        for id in range(3):
+            assert len(chunks) == id
+            yield node(id, [])
+
+    records.write_records(nodes(), ["id"], writer)
+    assert [json.loads(chunk) for chunk in chunks] == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+
+def test_changed_records():
+    """Only nodes that are new, different, or gone get reported after the first
+    tree
+    """
+    window_manager = fakes.FakeWindowManager(
+        tree=[node(1, ["editor"]), node(2, ["tests"])],
+        tree_changes=[
+            # nothing changed
+            [node(1, ["editor"]), node(2, ["tests"])],
+            # a window was resized and another was opened
+            [node(1, ["editor"], width=50), node(2, ["tests"]), node(3, [])],
+            # a window was closed
+            [node(1, ["editor"], width=50), node(3, [])],
+        ],
+    )
+    changes = records.changed_records(
+        window_manager.get_tree, ["marks", "width"], window_manager.wait_for_tree_change
+    )
+    assert list(itertools.islice(changes, 5)) == [
+        {"marks": ["editor"], "width": 100, "status": "added"},
+        {"marks": ["tests"], "width": 100, "status": "added"},
+        {"marks": ["editor"], "width": 50, "status": "changed"},
+        {"marks": [], "width": 100, "status": "added"},
+        {"marks": ["tests"], "width": 100, "status": "removed"},
+    ]
+
+
+def test_record_writers_are_abstract():
+    with pytest.raises(TypeError):
+        records.RecordWriter(["id"], print)  # type: ignore[abstract]
@@ -1,3 +1,5 @@
+import json
+import pstats
 from typing import Dict, List, NamedTuple
 from unittest import mock
 
@@ -19,7 +21,9 @@ def MockRezide(mocker):
 
 @pytest.fixture
 def MockConfigReader(mocker):
-    return mocker.patch("rezide.utils.config_readers.TomlReader")
+    MockConfigReader = mocker.patch("rezide.utils.config_readers.TomlReader")
+    MockConfigReader.return_value.read.return_value = {}
+    return MockConfigReader
 
 
 @pytest.fixture
@@ -37,6 +41,12 @@ def MockConfigDir(mocker):
     return mocker.patch("rezide.utils.config_dir.ConfigDir")
 
 
+@pytest.fixture(autouse=True)
+def MockRunHistory(mocker):
+    """Keep CLI tests from writing to the real run history"""
+    return mocker.patch("rezide.utils.history.RunHistory")
+
+
 # how do we even run an end-to-end test?? a sandboxed vm that runs a window manager?
 @pytest.mark.skip
 @pytest.mark.e2e
@@ -111,7 +121,103 @@ def test_successful_script(
     MockRezide.assert_called_once_with(
         test_parameters.expected_parsed_env, MockLayoutManager()
     )
-    MockRezide.return_value.run.assert_called_once_with(test_parameters.cli_args[-1])
+    MockRezide.return_value.run.assert_called_once_with(
+        test_parameters.cli_args[-1], {}
+    )
+
+
+def test_open_supervised(
+    click_runner,
+    mocker,
+    MockWindowManager,
+    MockRezide,
+    MockConfigReader,
+    MockLayoutManager,
+    MockFilestore,
+):
+    MockLauncher = mocker.patch("rezide.utils.launcher.Launcher")
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--supervise", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockLauncher.assert_called_once_with(MockFilestore())
+    MockWindowManager.assert_called_once_with(
+        client_launcher=MockLauncher.return_value, lean_ipc=False
+    )
+    MockRezide.return_value.run.assert_called_once_with("my_ide", {})
+    MockLauncher.return_value.close.assert_called_once_with()
+
+
+def test_open_with_prelaunching(
+    click_runner,
+    mocker,
+    MockWindowManager,
+    MockRezide,
+    MockConfigReader,
+    MockLayoutManager,
+    MockFilestore,
+    MockRunHistory,
+):
+    MockRunHistory.return_value.startup_times.return_value = {"idea": 8.0}
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--prelaunch", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockWindowManager.assert_called_once_with(client_launcher=None, lean_ipc=False)
+    MockLayoutManager.assert_called_once_with(
+        mock.ANY, mock.ANY, startup_times={"idea": 8.0}
+    )
+
+
+def test_prelaunching_needs_its_own_process(click_runner, MockConfigDir):
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--prelaunch", "--use-daemon", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 2
+    assert "--prelaunch can't be used with --use-daemon" in result.output
+
+
+@pytest.mark.parametrize("error,outcome", [(None, "ok"), (RuntimeError("no"), "error")])
+def test_open_is_recorded_in_the_history(
+    click_runner,
+    MockWindowManager,
+    MockRezide,
+    MockConfigReader,
+    MockLayoutManager,
+    MockFilestore,
+    MockRunHistory,
+    error,
+    outcome,
+):
+    MockRezide.return_value.run.side_effect = error
+    click_runner.invoke(
+        rezide.main, ["open", "my_ide"], env={"HOME": "abc", "XDG_CONFIG_HOME": "def"}
+    )
+    MockRunHistory.return_value.record.assert_called_once_with(
+        "my_ide", outcome, mock.ANY
+    )
+    step_names = [
+        event["name"] for event in MockRunHistory.return_value.record.call_args[0][2]
+    ]
+    assert "traversal" in step_names
+
+
+def test_stats(click_runner, MockConfigDir, MockRunHistory):
+    MockRunHistory.return_value.report.return_value = dtos.HistoryReport(
+        dtos.DurationSummary(0, 0.0, 0.0, 0.0), 0, {}, [], []
+    )
+    result = click_runner.invoke(
+        rezide.main, ["stats", "coding"], env={"HOME": "abc", "XDG_CONFIG_HOME": "def"}
+    )
+    assert result.exit_code == 0, result.exception
+    MockRunHistory.return_value.report.assert_called_once_with("coding")
+    assert result.stdout == "no runs recorded yet\n"
 
 
 def test_run():
@@ -119,7 +225,7 @@ def test_run():
     layout = mock.MagicMock()
     application = rezide.Rezide(env, layout)
     application.run("my_ide")
-    layout.spawn_windows.assert_called_once_with()
+    layout.spawn_windows.assert_called_once_with(None)
 
 
 def test_list_layouts(
@@ -140,3 +246,379 @@ def test_list_layouts(
 
 
 # TODO: add integration tests where we fail due to invalid config files
+
+
+def test_trace_is_written_when_command_finishes(
+    click_runner,
+    MockWindowManager,
+    MockRezide,
+    MockConfigReader,
+    MockLayoutManager,
+    MockFilestore,
+):
+    result = click_runner.invoke(
+        rezide.main,
+        ["--trace", "/tmp/rzd-trace.json", "open", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    path, trace_json = MockFilestore.return_value.write_file.call_args.args
+    assert path == "/tmp/rzd-trace.json"
+    span_names = {event["name"] for event in json.loads(trace_json)["traceEvents"]}
+    assert {"config discovery", "parse", "connect", "traversal"} <= span_names
+
+
+def test_cprofile_stats_are_dumped(
+    click_runner, MockConfigDir, MockFilestore, tmp_path
+):
+    stats_path = tmp_path / "rzd.pstats"
+    result = click_runner.invoke(
+        rezide.main, ["--cprofile", str(stats_path), "list-layouts"]
+    )
+    assert result.exit_code == 0, result.exception
+    assert pstats.Stats(str(stats_path)).get_stats_profile().func_profiles
+
+
+@pytest.fixture
+def MockSendRequest(mocker):
+    return mocker.patch("rezide.utils.daemon.send_request")
+
+
+def test_open_with_daemon(click_runner, MockFilestore, MockRezide, MockSendRequest):
+    MockSendRequest.return_value = "ok"
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--use-daemon", "--socket-path", "/a.sock", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockSendRequest.assert_called_once_with("/a.sock", "open my_ide")
+    MockRezide.assert_not_called()
+
+
+def test_switch(
+    click_runner, mocker, MockConfigDir, MockWindowManager, MockConfigReader
+):
+    MockLayoutManager = mocker.patch("rezide.utils.layouts.LayoutManager")
+    MockLayoutSwitcher = mocker.patch("rezide.utils.transitions.LayoutSwitcher")
+    MockLayoutSwitcher.return_value.switch.return_value = dtos.TransitionPlan(
+        {"code": "editor"}, ["tests"]
+    )
+    result = click_runner.invoke(
+        rezide.main,
+        ["switch", "--param", "repo=~/a", "coding", "review"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    assert MockLayoutManager.call_count == 2
+    MockLayoutSwitcher.return_value.switch.assert_called_once_with(
+        MockLayoutManager.return_value, MockLayoutManager.return_value, {"repo": "~/a"}
+    )
+    assert "reused 1 windows and closed 1" in result.stderr
+
+
+@pytest.mark.parametrize(
+    "report,exit_code",
+    [
+        (dtos.TeardownReport(["editor", "tests"], [], ["docs"]), 0),
+        (dtos.TeardownReport(["tests"], ["editor"], ["docs"]), 1),
+    ],
+)
+def test_close(
+    click_runner,
+    mocker,
+    MockConfigDir,
+    MockWindowManager,
+    MockConfigReader,
+    MockLayoutManager,
+    report,
+    exit_code,
+):
+    MockLayoutCloser = mocker.patch("rezide.utils.teardown.LayoutCloser")
+    MockLayoutCloser.return_value.close.return_value = report
+    result = click_runner.invoke(
+        rezide.main,
+        ["close", "--timeout", "2", "--force", "coding"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == exit_code
+    MockLayoutCloser.return_value.close.assert_called_once_with(
+        MockLayoutManager.return_value.marks.return_value, 2.0, True
+    )
+    assert result.stdout == "".join(f"{mark}\n" for mark in report.survivors)
+    assert (
+        f"closed {len(report.closed)} windows, {len(report.survivors)} still open"
+        + " (1 weren't open)"
+    ) in result.stderr
+
+
+def test_lean_ipc(
+    click_runner,
+    mocker,
+    MockConfigDir,
+    MockWindowManager,
+    MockConfigReader,
+    MockLayoutManager,
+):
+    MockLayoutCloser = mocker.patch("rezide.utils.teardown.LayoutCloser")
+    MockLayoutCloser.return_value.close.return_value = dtos.TeardownReport([], [], [])
+    result = click_runner.invoke(
+        rezide.main,
+        ["close", "coding"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def", "REZIDE_LEAN_IPC": "1"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockWindowManager.assert_called_once_with(lean_ipc=True)
+
+
+def test_open_with_params(
+    click_runner,
+    MockWindowManager,
+    MockRezide,
+    MockConfigReader,
+    MockLayoutManager,
+    MockFilestore,
+):
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--param", "repo=~/code/a b", "--param", "branch=main", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockRezide.return_value.run.assert_called_once_with(
+        "my_ide", {"repo": "~/code/a b", "branch": "main"}
+    )
+
+
+def test_open_with_params_and_daemon(click_runner, MockFilestore, MockSendRequest):
+    MockSendRequest.return_value = "ok"
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--use-daemon", "--socket-path", "/a.sock"]
+        + ["--param", "repo=~/code/a b", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockSendRequest.assert_called_once_with("/a.sock", "open my_ide 'repo=~/code/a b'")
+
+
+def test_open_with_daemon_fails(click_runner, MockFilestore, MockSendRequest):
+    MockSendRequest.return_value = "error Layout 'my_ide' doesn't exist"
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--use-daemon", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert isinstance(result.exception, RuntimeError)
+
+
+def test_daemon(click_runner, mocker, MockConfigDir, MockFilestore, MockWindowManager):
+    MockLayoutCache = mocker.patch("rezide.utils.layout_cache.LayoutCache")
+    MockDaemon = mocker.patch("rezide.utils.daemon.Daemon")
+    MockConfigWatcher = mocker.patch("rezide.utils.config_watcher.ConfigWatcher")
+    mocker.patch("rezide.utils.inotify.InotifyWatcher")
+    MockGeometryModel = mocker.patch("rezide.utils.geometry.GeometryModel")
+    MockGeometryMonitor = mocker.patch("rezide.utils.geometry.GeometryMonitor")
+    result = click_runner.invoke(rezide.main, ["daemon", "--socket-path", "/a.sock"])
+    assert result.exit_code == 0, result.exception
+    MockWindowManager.assert_any_call(keep_event_subscription=True, lean_ipc=False)
+    MockLayoutCache.return_value.preload.assert_called_once_with()
+    MockDaemon.assert_called_once_with(
+        "/a.sock", MockLayoutCache.return_value, MockGeometryModel.return_value
+    )
+    MockGeometryMonitor.return_value.start.assert_called_once_with()
+    MockGeometryMonitor.return_value.stop.assert_called_once_with()
+    server = MockDaemon.return_value.__enter__.return_value
+    server.serve_forever.assert_called_once_with()
+    MockConfigWatcher.return_value.start.assert_called_once_with()
+    MockConfigWatcher.return_value.stop.assert_called_once_with()
+    assert MockLayoutCache.call_args.args[4] is None
+
+
+def test_daemon_with_pool(
+    click_runner, mocker, MockConfigDir, MockFilestore, MockWindowManager
+):
+    MockLayoutCache = mocker.patch("rezide.utils.layout_cache.LayoutCache")
+    mocker.patch("rezide.utils.daemon.Daemon")
+    mocker.patch("rezide.utils.config_watcher.ConfigWatcher")
+    mocker.patch("rezide.utils.inotify.InotifyWatcher")
+    mocker.patch("rezide.utils.geometry.GeometryMonitor")
+    MockClientPool = mocker.patch("rezide.utils.pool.ClientPool")
+    result = click_runner.invoke(
+        rezide.main,
+        ["daemon", "--socket-path", "/a.sock", "--pool-size", "3"]
+        + ["--pool-terminal", "foot --app-id {app_id}"],
+    )
+    assert result.exit_code == 0, result.exception
+    MockClientPool.assert_called_once_with(
+        MockWindowManager(), MockFilestore(), 3, "foot --app-id {app_id}"
+    )
+    assert MockLayoutCache.call_args.args[4] is MockClientPool.return_value
+    MockClientPool.return_value.start.assert_called_once_with()
+    MockClientPool.return_value.stop.assert_called_once_with()
+
+
+def test_open_session(
+    click_runner, mocker, MockConfigDir, MockConfigReader, MockWindowManager
+):
+    MockConfigReader.return_value.read.return_value = {
+        "workspaces": [{"workspace": "1", "layout": "ide"}]
+    }
+    MockSessionManager = mocker.patch("rezide.utils.sessions.SessionManager")
+    result = click_runner.invoke(
+        rezide.main,
+        ["open-session", "work"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockConfigDir.return_value.get_session_file_path.assert_called_once_with("work")
+    workspace_layouts, _, _ = MockSessionManager.call_args.args
+    assert workspace_layouts == [dtos.WorkspaceLayout("1", "ide")]
+    MockSessionManager.return_value.open.assert_called_once_with()
+
+
+def test_save(click_runner, mocker, MockConfigDir, MockFilestore, MockWindowManager):
+    MockToToml = mocker.patch("rezide.utils.snapshots.to_toml")
+    MockConfigDir.return_value.get_new_layout_file_path.return_value = "/a/config.toml"
+    result = click_runner.invoke(
+        rezide.main,
+        ["save", "--force", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockConfigDir.return_value.get_new_layout_file_path.assert_called_once_with(
+        "my_ide", overwrite=True
+    )
+    workspace, _ = MockToToml.call_args.args
+    assert workspace == MockWindowManager.return_value.get_workspace_snapshot()
+    MockFilestore.return_value.write_file.assert_called_once_with(
+        "/a/config.toml", MockToToml.return_value
+    )
+    assert "/a/config.toml" in result.output
+
+
+@pytest.fixture
+def MockCheckLayouts(mocker):
+    return mocker.patch("rezide.utils.linter.check_layouts")
+
+
+def test_check_all(
+    click_runner, mocker, MockConfigDir, MockFilestore, MockCheckLayouts
+):
+    MockCheckCache = mocker.patch("rezide.utils.linter.CheckCache")
+    MockConfigDir.return_value.list_layouts.return_value = {"a", "b"}
+    MockConfigDir.return_value.path = "/config"
+    MockCheckLayouts.return_value = (
+        [
+            dtos.LayoutCheck("a", [], {}),
+            dtos.LayoutCheck(
+                "b",
+                [dtos.ConfigProblem("/config/b/config.toml", "root", "sizes", "oops")],
+                {},
+            ),
+        ],
+        1,
+    )
+    result = click_runner.invoke(
+        rezide.main,
+        ["check", "--all", "--jobs", "4", "--cache-file", "/cache.json"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 1
+    assert result.stdout == "/config/b/config.toml:root.sizes: oops\n"
+    assert "checked 2 layouts (1 unchanged): 1 problems" in result.stderr
+    MockCheckCache.assert_called_once_with(MockFilestore(), "/cache.json")
+    _, config_dir_path, layout_names, cache, jobs = MockCheckLayouts.call_args.args
+    assert config_dir_path == "/config"
+    assert sorted(layout_names) == ["a", "b"]
+    assert cache is MockCheckCache.return_value
+    assert jobs == 4
+    MockCheckCache.return_value.save.assert_called_once_with()
+
+
+def test_check_named_layouts_without_cache(
+    click_runner, mocker, MockConfigDir, MockFilestore, MockCheckLayouts
+):
+    MockCheckCache = mocker.patch("rezide.utils.linter.CheckCache")
+    MockCheckLayouts.return_value = ([dtos.LayoutCheck("a", [], {})], 0)
+    result = click_runner.invoke(
+        rezide.main,
+        ["check", "--no-cache", "a"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 0, result.exception
+    MockCheckCache.assert_not_called()
+    _, _, layout_names, cache, jobs = MockCheckLayouts.call_args.args
+    assert layout_names == ("a",)
+    assert cache is None
+    assert jobs is None
+
+
+def test_check_needs_layouts(click_runner, MockConfigDir, MockFilestore):
+    result = click_runner.invoke(
+        rezide.main, ["check"], env={"HOME": "abc", "XDG_CONFIG_HOME": "def"}
+    )
+    assert result.exit_code == 2
+
+
+@pytest.fixture
+def dry_run_config(tmp_path):
+    layout_dir = tmp_path / "rezide" / "my_ide"
+    layout_dir.mkdir(parents=True)
+    (layout_dir / "config.toml").write_text("""
+[root]
+split = "horizontal"
+children = ["editor", "terminal"]
+sizes = [70, 30]
+
+[editor]
+command = "alacritty -e kak {{repo}}"
+
+[terminal]
+command = "alacritty"
+""")
+    return tmp_path
+
+
+def test_open_dry_run(click_runner, tmp_path, dry_run_config, MockWindowManager):
+    trace_file = tmp_path / "trace.json"
+    trace_file.write_text(
+        json.dumps({"traceEvents": [{"name": "make_window", "dur": 1_000_000}]})
+    )
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--dry-run", "--param", "repo=~/a", "--latency", "split=0"]
+        + ["--latency-from", str(trace_file), "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": str(tmp_path)},
+    )
+    assert result.exit_code == 0, result.exception
+    assert result.stdout.splitlines() == [
+        "exec alacritty -e kak ~/a",
+        '[con_id=1] mark "editor"',
+        "[con_id=1] split horizontal",
+        '[con_id=2] mark "abc"',
+        "exec alacritty",
+        '[con_id=3] mark "terminal"',
+    ]
+    assert "estimated 2.00s: 2 spawn, 1 split, 0 focus, 0 resize" in result.stderr
+    MockWindowManager.assert_not_called()
+
+
+def test_dry_run_estimates_with_default_latencies(click_runner, dry_run_config):
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--dry-run", "--param", "repo=~/a", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": str(dry_run_config)},
+    )
+    assert result.exit_code == 0, result.exception
+    assert "estimated 1.25s: 2 spawn, 1 split" in result.stderr
+
+
+def test_dry_run_cant_use_daemon(click_runner, MockFilestore, MockSendRequest):
+    result = click_runner.invoke(
+        rezide.main,
+        ["open", "--dry-run", "--use-daemon", "my_ide"],
+        env={"HOME": "abc", "XDG_CONFIG_HOME": "def"},
+    )
+    assert result.exit_code == 2
+    MockSendRequest.assert_not_called()
@@ -0,0 +1,32 @@
+from rezide.utils import dtos
+from rezide.utils import scheduling
+
+terminal = dtos.WindowDetails(mark="terminal", command="foot")
+editor = dtos.WindowDetails(mark="editor", command="idea")
+browser = dtos.WindowDetails(mark="browser", command="firefox")
+logs = dtos.WindowDetails(mark="logs", command="foot -e journalctl -f")
+startup_times = {"foot": 0.1, "idea": 8.0, "firefox": 2.0}
+
+
+def test_slow_clients_start_first():
+    windows = [terminal, logs, browser, editor]
+    assert scheduling.plan_prelaunches(windows, startup_times) == [editor, browser]
+
+
+def test_the_first_window_opens_straight_away():
+    windows = [editor, terminal, browser]
+    assert scheduling.plan_prelaunches(windows, startup_times) == [browser]
+
+
+def test_fast_and_unknown_clients_arent_started_early():
+    assert scheduling.plan_prelaunches([terminal, logs], startup_times) == []
+    assert scheduling.plan_prelaunches([terminal, browser], startup_times, 5.0) == []
+
+
+def test_the_build_takes_about_as_long_as_the_slowest_client():
+    windows = [terminal, browser, terminal._replace(mark="shell"), editor]
+    assert scheduling.estimate_build_time(windows, startup_times, set()) == 10.2
+    prelaunched = {
+        window.mark for window in scheduling.plan_prelaunches(windows, startup_times)
+    }
+    assert scheduling.estimate_build_time(windows, startup_times, prelaunched) == 8.0
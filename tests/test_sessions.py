@@ -0,0 +1,161 @@
+from typing import Dict, List, NamedTuple, Optional
+from unittest import mock
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import layouts
+from rezide.utils import sessions
+from tests import fakes
+
+
+class SessionTestCase(NamedTuple):
+    session_dict: Dict
+    expected_workspace_layouts: List[dtos.WorkspaceLayout]
+
+
+valid_session_tests = [
+    SessionTestCase(
+        session_dict={"workspaces": [{"workspace": "1", "layout": "ide"}]},
+        expected_workspace_layouts=[dtos.WorkspaceLayout("1", "ide")],
+    ),
+    # workspace numbers are converted to names
+    SessionTestCase(
+        session_dict={
+            "workspaces": [
+                {"workspace": 1, "layout": "ide", "output": "DP-1"},
+                {"workspace": "docs", "layout": "browser"},
+            ]
+        },
+        expected_workspace_layouts=[
+            dtos.WorkspaceLayout("1", "ide", "DP-1"),
+            dtos.WorkspaceLayout("docs", "browser"),
+        ],
+    ),
+    # the same layout can be opened on several workspaces
+    SessionTestCase(
+        session_dict={
+            "workspaces": [
+                {"workspace": "1", "layout": "ide"},
+                {"workspace": "2", "layout": "ide"},
+            ]
+        },
+        expected_workspace_layouts=[
+            dtos.WorkspaceLayout("1", "ide"),
+            dtos.WorkspaceLayout("2", "ide"),
+        ],
+    ),
+    # parameter values are converted to strings
+    SessionTestCase(
+        session_dict={
+            "workspaces": [
+                {"workspace": "1", "layout": "ide", "params": {"repo": "~/a"}},
+                {"workspace": "2", "layout": "ide", "params": {"port": 8000}},
+            ]
+        },
+        expected_workspace_layouts=[
+            dtos.WorkspaceLayout("1", "ide", params={"repo": "~/a"}),
+            dtos.WorkspaceLayout("2", "ide", params={"port": "8000"}),
+        ],
+    ),
+]
+
+
+@pytest.mark.parametrize("test_case", valid_session_tests)
+def test_parse_session(test_case):
+    actual = sessions.parse_session(test_case.session_dict)
+    assert actual == test_case.expected_workspace_layouts
+
+
+invalid_session_tests = [
+    {},
+    {"workspaces": [], "layout": "ide"},
+    {"workspaces": [{"workspace": "1"}]},
+    {"workspaces": [{"layout": "ide"}]},
+    {"workspaces": [{"workspace": "1", "layout": "ide", "command": "kak"}]},
+    {"workspaces": [{"workspace": "1", "layout": "ide", "params": "repo=~/a"}]},
+    {
+        "workspaces": [
+            {"workspace": "1", "layout": "ide"},
+            {"workspace": "1", "layout": "browser"},
+        ]
+    },
+]
+
+
+@pytest.mark.parametrize("session_dict", invalid_session_tests)
+def test_parse_invalid_session(session_dict):
+    with pytest.raises(RuntimeError):
+        sessions.parse_session(session_dict)
+
+
+class FakeLayout(layouts.LayoutManager):
+    """Records which workspace the window manager was on when it spawned windows"""
+
+    def __init__(self, name: str, window_manager: fakes.SpyWindowManager) -> None:
+        self._name = name
+        self._spy = window_manager
+
+    def spawn_windows(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        adopted: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self._spy.calls.append(dtos.WindowManagerCall("spawn", (self._name, params)))
+
+
+def test_open_session():
+    """Workspaces are grouped by output so that each output is only focused once"""
+    window_manager = fakes.SpyWindowManager()
+    session = sessions.SessionManager(
+        [
+            dtos.WorkspaceLayout("1", "ide", "DP-1"),
+            dtos.WorkspaceLayout("2", "browser", "HDMI-A-1"),
+            dtos.WorkspaceLayout("3", "ide", "DP-1", {"repo": "~/b"}),
+            dtos.WorkspaceLayout("4", "chat"),
+        ],
+        lambda name: FakeLayout(name, window_manager),
+        window_manager,
+    )
+    session.open()
+    assert window_manager.calls == [
+        dtos.WindowManagerCall("workspace", "4"),
+        dtos.WindowManagerCall("spawn", ("chat", None)),
+        dtos.WindowManagerCall("output", "DP-1"),
+        dtos.WindowManagerCall("workspace", "1"),
+        dtos.WindowManagerCall("spawn", ("ide", None)),
+        dtos.WindowManagerCall("workspace", "3"),
+        dtos.WindowManagerCall("spawn", ("ide", {"repo": "~/b"})),
+        dtos.WindowManagerCall("output", "HDMI-A-1"),
+        dtos.WindowManagerCall("workspace", "2"),
+        dtos.WindowManagerCall("spawn", ("browser", None)),
+    ]
+
+
+def test_open_session_loads_each_layout_once():
+    load_layout = mock.MagicMock()
+    session = sessions.SessionManager(
+        [dtos.WorkspaceLayout("1", "ide"), dtos.WorkspaceLayout("2", "ide")],
+        load_layout,
+        fakes.SpyWindowManager(),
+    )
+    session.open()
+    load_layout.assert_called_once_with("ide")
+    assert load_layout.return_value.spawn_windows.call_count == 2
+
+
+def test_invalid_layout_stops_session_before_opening_windows():
+    def load_layout(name: str) -> FakeLayout:
+        if name == "broken":
+            raise RuntimeError("invalid config")
+        return FakeLayout(name, window_manager)
+
+    window_manager = fakes.SpyWindowManager()
+    session = sessions.SessionManager(
+        [dtos.WorkspaceLayout("1", "ide"), dtos.WorkspaceLayout("2", "broken")],
+        load_layout,
+        window_manager,
+    )
+    with pytest.raises(RuntimeError):
+        session.open()
+    assert window_manager.calls == []
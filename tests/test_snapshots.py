@@ -0,0 +1,174 @@
+from typing import Dict, List, NamedTuple, Sequence
+
+import pytest
+import toml
+
+from rezide.utils import config_parser
+from rezide.utils import dtos
+from rezide.utils import snapshots
+from rezide.utils import tree
+from tests import fakes
+
+
+def window(mark: str = "", width: float = 50, height: float = 100, pid: int = 1):
+    marks = (mark,) if mark else ()
+    return dtos.ContainerSnapshot(
+        split=None, width=width, height=height, marks=marks, pid=pid
+    )
+
+
+def container(split: str, *children: dtos.ContainerSnapshot, width=100, height=100):
+    return dtos.ContainerSnapshot(
+        split=split, width=width, height=height, children=children
+    )
+
+
+def get_command(window: dtos.ContainerSnapshot) -> str:
+    return f"run {window.pid}"
+
+
+def test_save_workspace():
+    workspace = container(
+        "horizontal",
+        window("editor", width=75, pid=1),
+        container(
+            "vertical",
+            window("tests", height=20, pid=2),
+            window(height=80, pid=3),
+            width=25,
+        ),
+    )
+    config = toml.loads(snapshots.to_toml(workspace, get_command))
+    assert config == {
+        "root": {
+            "is_layout": True,
+            "split": "horizontal",
+            "children": ["editor", "section-1"],
+            "sizes": [75, 25],
+        },
+        "editor": {"command": "run 1"},
+        "section-1": {
+            "split": "vertical",
+            "children": ["tests", "window-1"],
+            "sizes": [20, 80],
+        },
+        "tests": {"command": "run 2"},
+        "window-1": {"command": "run 3"},
+    }
+
+
+def test_saved_workspace_is_a_valid_layout():
+    """Containers that only hold one thing are skipped since rezide can't make them"""
+    workspace = container(
+        "horizontal",
+        container("vertical", container("horizontal", window("a"), window("b"))),
+        window("c"),
+        container("vertical", window("d")),
+    )
+    config = toml.loads(snapshots.to_toml(workspace, get_command))
+    parser = config_parser.ConfigParser(config, tree.TreeFactory())
+    parser.validate()
+    expected_tree = tree.Section("horizontal", [50, 25, 25])
+    nested_section = tree.Section("horizontal", [50, 50], parent=expected_tree)
+    for mark in "ab":
+        tree.Window(dtos.WindowDetails(mark, "run 1"), parent=nested_section)
+    for mark in "cd":
+        tree.Window(dtos.WindowDetails(mark, "run 1"), parent=expected_tree)
+    assert parser.get_tree() == expected_tree
+
+
+def test_generated_names_dont_clash_with_marks():
+    workspace = container(
+        "horizontal", window("window-1"), window(), window("root"), window("a b")
+    )
+    config = toml.loads(snapshots.to_toml(workspace, get_command))
+    assert config["root"]["children"] == ["window-1", "window-2", "window-3", "a b"]
+
+
+def test_saves_hundreds_of_windows():
+    workspace = container(
+        "vertical",
+        *[container("horizontal", window(), window()) for _ in range(200)],
+    )
+    config = toml.loads(snapshots.to_toml(workspace, get_command))
+    config_parser.ConfigParser(config, tree.TreeFactory()).validate()
+    assert len(config) == 601
+
+
+@pytest.mark.parametrize(
+    "workspace",
+    [
+        container("horizontal"),
+        container("horizontal", container("vertical")),
+        container("horizontal", window("lonely")),
+    ],
+)
+def test_cant_save_workspace_without_2_windows(workspace):
+    with pytest.raises(RuntimeError):
+        snapshots.to_toml(workspace, get_command)
+
+
+class SizesTestCase(NamedTuple):
+    lengths: Sequence[float]
+    expected_sizes: List[int]
+
+
+sizes_test_cases = [
+    SizesTestCase([50, 50], [50, 50]),
+    SizesTestCase([1, 1, 1], [34, 33, 33]),
+    SizesTestCase([640, 1280], [33, 67]),
+    SizesTestCase([0, 0], [50, 50]),
+    SizesTestCase([1, 1000], [1, 99]),
+    SizesTestCase([0.1] + [1] * 99, [1] * 100),
+    SizesTestCase([1] * 10 + [1000], [1] * 10 + [90]),
+]
+
+
+@pytest.mark.parametrize("test_case", sizes_test_cases)
+def test_proportional_sizes(test_case):
+    actual_sizes = snapshots.proportional_sizes(test_case.lengths)
+    assert actual_sizes == test_case.expected_sizes
+    assert sum(actual_sizes) == 100
+
+
+class CommandTestCase(NamedTuple):
+    files: Dict[str, str]
+    window: dtos.ContainerSnapshot
+    expected_command: str
+
+
+command_test_cases = [
+    CommandTestCase(
+        files={"/proc/12/cmdline": "alacritty\0--working-directory\0/my dir\0"},
+        window=dtos.ContainerSnapshot(None, 1, 1, pid=12, app_name="Alacritty"),
+        expected_command="alacritty --working-directory '/my dir'",
+    ),
+    # the process already exited
+    CommandTestCase(
+        files={},
+        window=dtos.ContainerSnapshot(None, 1, 1, pid=12, app_name="firefox"),
+        expected_command="firefox",
+    ),
+    CommandTestCase(
+        files={"/proc/12/cmdline": ""},
+        window=dtos.ContainerSnapshot(None, 1, 1, pid=12, app_name="firefox"),
+        expected_command="firefox",
+    ),
+    CommandTestCase(
+        files={},
+        window=dtos.ContainerSnapshot(None, 1, 1, app_name="firefox"),
+        expected_command="firefox",
+    ),
+]
+
+
+@pytest.mark.parametrize("test_case", command_test_cases)
+def test_read_command(test_case):
+    reader = snapshots.ProcCommandReader(fakes.FakeFilestore(test_case.files))
+    assert reader(test_case.window) == test_case.expected_command
+
+
+def test_cant_read_command():
+    reader = snapshots.ProcCommandReader(fakes.FakeFilestore(dict()))
+    with pytest.raises(RuntimeError):
+        reader(dtos.ContainerSnapshot(None, 1, 1, pid=12))
@@ -0,0 +1,209 @@
+import json
+import socket
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import sway_ipc
+
+window_rect = {"x": 0, "y": 0, "width": 960, "height": 1080}
+tree_reply = {
+    "id": 1,
+    "type": "root",
+    "name": "root",
+    "focus": [2],
+    "nodes": [
+        {
+            "id": 2,
+            "type": "workspace",
+            "name": "1",
+            "layout": "splith",
+            "nodes": [
+                {
+                    "id": 3,
+                    "type": "con",
+                    "marks": ["editor"],
+                    "focused": True,
+                    "pid": 100,
+                    "app_id": "foot",
+                    "rect": window_rect,
+                    "window_rect": window_rect,
+                },
+            ],
+            "floating_nodes": [{"id": 4, "type": "floating_con", "marks": ["calc"]}],
+        }
+    ],
+}
+
+
+def workspace(con_id, *windows):
+    return {
+        "id": con_id,
+        "type": "workspace",
+        "name": str(con_id),
+        "nodes": [
+            {"id": window_id, "type": "con", "window_properties": {"class": "Firefox"}}
+            for window_id in windows
+        ],
+    }
+
+
+outputs_reply = {
+    "id": 1,
+    "type": "root",
+    "focus": [20, 10],
+    "nodes": [
+        {
+            "id": 10,
+            "type": "output",
+            "focus": [11],
+            "nodes": [workspace(11, 12, 13)],
+        },
+        {
+            "id": 20,
+            "type": "output",
+            "focus": [22, 21],
+            "nodes": [workspace(21, 23), workspace(22, 24, 25, 26)],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def sockets():
+    client_socket, sway_socket = socket.socketpair()
+    yield client_socket, sway_socket
+    client_socket.close()
+    sway_socket.close()
+
+
+@pytest.fixture
+def connection(sockets):
+    return sway_ipc.Connection(sockets[0])
+
+
+def reply(sway_socket, message_type, payload):
+    encoded = json.dumps(payload).encode()
+    sway_socket.sendall(
+        sway_ipc.HEADER.pack(sway_ipc.MAGIC, len(encoded), message_type) + encoded
+    )
+
+
+def test_command(connection, sockets):
+    reply(sockets[1], sway_ipc.RUN_COMMAND, [{"success": True}, {"success": False}])
+    assert connection.command("mark a; mark b") == [
+        dtos.CommandReply(True),
+        dtos.CommandReply(False),
+    ]
+    payload = b"mark a; mark b"
+    assert sockets[1].recv(1024) == (
+        sway_ipc.HEADER.pack(sway_ipc.MAGIC, len(payload), sway_ipc.RUN_COMMAND)
+        + payload
+    )
+
+
+def test_get_tree(connection, sockets):
+    reply(sockets[1], sway_ipc.GET_TREE, tree_reply)
+    root = connection.get_tree()
+    assert [node.id for node in sway_ipc.walk(root)] == [2, 3, 4]
+    window = sway_ipc.find_by_id(root, 3)
+    assert window is not None
+    assert window.marks == ("editor",)
+    assert window.focused
+    assert window.pid == 100
+    assert window.app_id == "foot"
+    assert window.window_rect == dtos.Rect(0, 0, 960, 1080)
+    workspace = sway_ipc.find_parent(root, 3)
+    assert workspace is not None
+    assert workspace.name == "1"
+    assert workspace.layout == "splith"
+    assert workspace.rect == sway_ipc.NO_RECT
+    assert sway_ipc.find_parent(root, 4) is workspace
+    assert sway_ipc.find_parent(root, 2) is root
+
+
+def test_missing_containers(connection, sockets):
+    reply(sockets[1], sway_ipc.GET_TREE, tree_reply)
+    root = connection.get_tree()
+    assert sway_ipc.find_by_id(root, 5) is None
+    assert sway_ipc.find_parent(root, 5) is None
+    assert sway_ipc.find_parent(root, 1) is None
+
+
+def test_get_focused_workspace(connection, sockets):
+    reply(sockets[1], sway_ipc.GET_TREE, outputs_reply)
+    focused = connection.get_focused_workspace()
+    assert focused.id == 22
+    assert [window.id for window in sway_ipc.leaves(focused)] == [24, 25, 26]
+    assert focused.nodes[0].window_class == "Firefox"
+
+
+def test_floating_windows_arent_leaves(connection, sockets):
+    reply(sockets[1], sway_ipc.GET_TREE, tree_reply)
+    assert [
+        window.id for window in sway_ipc.leaves(connection.get_focused_workspace())
+    ] == [3]
+
+
+@pytest.mark.parametrize("focus", [[], [99]])
+def test_there_may_be_no_focused_workspace(focus):
+    with pytest.raises(RuntimeError, match="no focused workspace"):
+        sway_ipc.find_focused_workspace({**outputs_reply, "focus": focus})
+
+
+def test_the_buffer_grows_for_big_replies(monkeypatch, sockets):
+    monkeypatch.setattr(sway_ipc, "INITIAL_BUFFER_SIZE", 16)
+    connection = sway_ipc.Connection(sockets[0])
+    for _ in range(2):
+        reply(sockets[1], sway_ipc.GET_TREE, tree_reply)
+        assert len(list(sway_ipc.walk(connection.get_tree()))) == 3
+
+
+def test_replies_must_start_with_the_magic_string(connection, sockets):
+    sockets[1].sendall(sway_ipc.HEADER.pack(b"i4-ipc", 2, sway_ipc.GET_TREE) + b"{}")
+    with pytest.raises(RuntimeError, match="doesn't start with"):
+        connection.get_tree()
+
+
+def test_replies_must_match_the_message(connection, sockets):
+    reply(sockets[1], sway_ipc.RUN_COMMAND, [])
+    with pytest.raises(RuntimeError, match="replied to message 4 with message 0"):
+        connection.get_tree()
+
+
+def test_sway_closes_the_connection(connection, sockets):
+    # sway stops halfway through a header
+    sockets[1].sendall(sway_ipc.MAGIC)
+    sockets[1].shutdown(socket.SHUT_WR)
+    with pytest.raises(RuntimeError, match="closed the IPC connection"):
+        connection.get_tree()
+
+
+def test_connect(monkeypatch, tmp_path):
+    path = str(tmp_path / "sway.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+    monkeypatch.setenv("SWAYSOCK", path)
+    connection = sway_ipc.connect()
+    sway_socket, _ = listener.accept()
+    reply(sway_socket, sway_ipc.RUN_COMMAND, [{"success": True}])
+    assert connection.command("nop") == [dtos.CommandReply(True)]
+    connection.close()
+    sway_socket.close()
+    listener.close()
+
+
+def test_socket_path(monkeypatch):
+    monkeypatch.delenv("SWAYSOCK", raising=False)
+    monkeypatch.setenv("I3SOCK", "/run/i3.sock")
+    assert sway_ipc.socket_path() == "/run/i3.sock"
+    monkeypatch.setenv("SWAYSOCK", "/run/sway.sock")
+    assert sway_ipc.socket_path() == "/run/sway.sock"
+
+
+def test_socket_path_needs_sway(monkeypatch):
+    monkeypatch.delenv("SWAYSOCK", raising=False)
+    monkeypatch.delenv("I3SOCK", raising=False)
+    with pytest.raises(RuntimeError, match="Is SWAYSOCK set"):
+        sway_ipc.socket_path()
@@ -0,0 +1,153 @@
+import signal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rezide.utils import dtos
+from rezide.utils import teardown
+from tests import fakes
+
+
+class ClosingWindowManager(fakes.FakeWindowManager):
+    """Windows close after they've been asked to, except for the stubborn ones, which
+    only close when their process is stopped. Each window's process is 1000 plus its
+    container id unless `pids` says otherwise, and the processes in `ignore_sigterm`
+    only stop for SIGKILL
+    """
+
+    def __init__(
+        self,
+        con_ids: Dict[str, int],
+        stubborn: Iterable[str] = (),
+        pids: Optional[Dict[int, int]] = None,
+        ignore_sigterm: Iterable[int] = (),
+    ) -> None:
+        super().__init__(con_ids=dict(con_ids))
+        self._stubborn = set(stubborn)
+        self._pids = pids or dict()
+        self._ignore_sigterm = set(ignore_sigterm)
+        self.closed_batches: List[List[int]] = []
+        self.signals: List[Tuple[int, int]] = []
+
+    def close_windows(self, con_ids: Iterable[int]) -> None:
+        batch = list(con_ids)
+        self.closed_batches.append(batch)
+        for mark, con_id in list(self._con_ids.items()):
+            if con_id in batch and mark not in self._stubborn:
+                del self._con_ids[mark]
+
+    def get_pids(self, con_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        if con_ids is None:
+            con_ids = list(self._con_ids.values()) + list(self._pids)
+        return {
+            con_id: self._pids.get(con_id, 1000 + con_id)
+            for con_id in con_ids
+            if con_id != 3
+        }
+
+    def kill_process(self, pid: int, signal_number: int) -> None:
+        self.signals.append((pid, signal_number))
+        if signal_number == signal.SIGTERM and pid in self._ignore_sigterm:
+            return
+        for mark, con_id in list(self._con_ids.items()):
+            if self._pids.get(con_id, 1000 + con_id) == pid:
+                del self._con_ids[mark]
+
+
+def make_closer(window_manager, clock=None):
+    clock = clock or fakes.FakeClock()
+    return teardown.LayoutCloser(
+        window_manager, window_manager.kill_process, clock, clock.sleep
+    )
+
+
+def test_windows_are_closed_in_one_batch():
+    window_manager = ClosingWindowManager({"editor": 1, "tests": 2})
+    report = make_closer(window_manager).close(["editor", "tests", "docs"])
+    assert window_manager.closed_batches == [[1, 2]]
+    assert report == dtos.TeardownReport(
+        closed=["editor", "tests"], survivors=[], missing=["docs"]
+    )
+
+
+def test_survivors_are_reported():
+    window_manager = ClosingWindowManager({"editor": 1, "tests": 2}, ["editor"])
+    clock = fakes.FakeClock()
+    report = make_closer(window_manager, clock).close(["editor", "tests"], timeout=1)
+    assert report == dtos.TeardownReport(
+        closed=["tests"], survivors=["editor"], missing=[]
+    )
+    assert clock.time >= 1
+
+
+def test_survivors_are_killed_with_force():
+    window_manager = ClosingWindowManager(
+        {"editor": 1, "tests": 2, "ci": 3}, ["editor", "ci"]
+    )
+    report = make_closer(window_manager).close(
+        ["editor", "tests", "ci"], timeout=1, force=True
+    )
+    # ci's window doesn't have a process that we can kill
+    assert report == dtos.TeardownReport(
+        closed=["editor", "tests"], survivors=["ci"], missing=[]
+    )
+    assert window_manager.signals == [(1001, signal.SIGTERM)]
+
+
+def test_processes_that_ignore_sigterm_get_sigkill():
+    window_manager = ClosingWindowManager(
+        {"editor": 1, "tests": 2}, ["editor", "tests"], ignore_sigterm=[1001]
+    )
+    report = make_closer(window_manager).close(
+        ["editor", "tests"], timeout=1, force=True
+    )
+    assert report.closed == ["editor", "tests"]
+    assert window_manager.signals == [
+        (1001, signal.SIGTERM),
+        (1002, signal.SIGTERM),
+        (1001, signal.SIGKILL),
+    ]
+
+
+def test_processes_with_windows_outside_the_layout_are_left_alone():
+    # the editor is a client of a server that also owns a window in another layout
+    window_manager = ClosingWindowManager(
+        {"editor": 1, "tests": 2},
+        ["editor", "tests"],
+        pids={1: 500, 2: 501, 9: 500},
+    )
+    report = make_closer(window_manager).close(
+        ["editor", "tests"], timeout=1, force=True
+    )
+    assert report == dtos.TeardownReport(
+        closed=["tests"], survivors=["editor"], missing=[]
+    )
+    assert window_manager.signals == [(501, signal.SIGTERM)]
+
+
+def test_processes_that_already_exited_are_ignored():
+    window_manager = ClosingWindowManager({"editor": 1}, ["editor"])
+
+    def kill_process(pid, signal_number):
+        raise ProcessLookupError(pid)
+
+    closer = teardown.LayoutCloser(
+        window_manager, kill_process, fakes.FakeClock(), lambda seconds: None
+    )
+    report = closer.close(["editor"], timeout=0, force=True)
+    assert report.survivors == ["editor"]
+
+
+def test_marks_that_moved_to_other_windows_dont_count(monkeypatch):
+    window_manager = ClosingWindowManager({"editor": 1})
+    closer = make_closer(window_manager)
+    monkeypatch.setattr(
+        window_manager,
+        "close_windows",
+        lambda con_ids: window_manager._con_ids.update(editor=7),
+    )
+    assert closer.close(["editor"]).closed == ["editor"]
+
+
+def test_nothing_to_close():
+    window_manager = ClosingWindowManager({})
+    report = make_closer(window_manager).close(["editor"])
+    assert report == dtos.TeardownReport(closed=[], survivors=[], missing=["editor"])
@@ -0,0 +1,133 @@
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import layouts
+from rezide.utils import templates
+from rezide.utils import tree
+from tests import fakes
+
+
+def make_tree() -> tree.Section:
+    root = tree.Section("horizontal", [60, 40])
+    tree.Window(
+        dtos.WindowDetails(
+            mark="editor",
+            command="alacritty --working-directory {{repo}} -e kak",
+            ready_socket="/tmp/{{ repo_name }}.sock",
+        ),
+        parent=root,
+    )
+    right = tree.Section("vertical", [50, 50], parent=root)
+    tree.Window(
+        dtos.WindowDetails(
+            mark="tests",
+            command="alacritty -e ptw {{repo}}",
+            terminal_command="ptw {{repo}}",
+        ),
+        parent=right,
+    )
+    tree.Window(dtos.WindowDetails(mark="docs", command="brave"), parent=right)
+    return root
+
+
+def test_parameter_names():
+    template = templates.LayoutTemplate(make_tree())
+    assert template.parameter_names == {"repo", "repo_name"}
+
+
+def test_expand():
+    template = templates.LayoutTemplate(make_tree())
+    actual = template.expand({"repo": "~/code/rezide", "repo_name": "rezide"})
+    expected = tree.Section("horizontal", [60, 40])
+    tree.Window(
+        dtos.WindowDetails(
+            mark="editor",
+            command="alacritty --working-directory ~/code/rezide -e kak",
+            ready_socket="/tmp/rezide.sock",
+        ),
+        parent=expected,
+    )
+    right = tree.Section("vertical", [50, 50], parent=expected)
+    tree.Window(
+        dtos.WindowDetails(
+            mark="tests",
+            command="alacritty -e ptw ~/code/rezide",
+            terminal_command="ptw ~/code/rezide",
+        ),
+        parent=right,
+    )
+    tree.Window(dtos.WindowDetails(mark="docs", command="brave"), parent=right)
+    assert actual == expected
+
+
+def test_expansions_are_memoized():
+    template = templates.LayoutTemplate(make_tree())
+    first = template.expand({"repo": "~/a", "repo_name": "a"})
+    assert template.expand({"repo_name": "a", "repo": "~/a"}) is first
+    assert template.expand({"repo": "~/b", "repo_name": "b"}) is not first
+
+
+def test_only_recent_expansions_are_memoized():
+    template = templates.LayoutTemplate(make_tree(), max_expansions=2)
+    first = template.expand({"repo": "~/a", "repo_name": "a"})
+    template.expand({"repo": "~/b", "repo_name": "b"})
+    assert template.expand({"repo": "~/a", "repo_name": "a"}) is first
+    template.expand({"repo": "~/c", "repo_name": "c"})
+    template.expand({"repo": "~/d", "repo_name": "d"})
+    assert template.expand({"repo": "~/a", "repo_name": "a"}) is not first
+
+
+def test_layout_without_parameters_is_not_copied():
+    root = tree.Section("horizontal", [50, 50])
+    tree.Window(dtos.WindowDetails(mark="a", command="alacritty"), parent=root)
+    tree.Window(
+        dtos.WindowDetails(mark="b", command="{not a placeholder}"), parent=root
+    )
+    assert templates.LayoutTemplate(root).expand({}) is root
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"repo": "~/a"},
+        {"repo": "~/a", "repo_name": "a", "branch": "main"},
+    ],
+)
+def test_parameters_must_match(params):
+    template = templates.LayoutTemplate(make_tree())
+    with pytest.raises(RuntimeError):
+        template.expand(params)
+
+
+def test_parse_params():
+    assert templates.parse_params(["repo=~/a=b", "empty="]) == {
+        "repo": "~/a=b",
+        "empty": "",
+    }
+
+
+@pytest.mark.parametrize("pair", ["repo", "=value", "two words=value"])
+def test_parse_invalid_params(pair):
+    with pytest.raises(RuntimeError):
+        templates.parse_params([pair])
+
+
+def test_layout_manager_fills_in_parameters():
+    spy_window_manager = fakes.SpyWindowManager()
+    layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(
+            {
+                "split": "horizontal",
+                "sizes": [50, 50],
+                "children": [
+                    {"mark": "a", "command": "kak {{file}}"},
+                    {"mark": "b", "command": "alacritty"},
+                ],
+            }
+        ),
+        spy_window_manager,
+    )
+    layout.spawn_windows({"file": "README.md"})
+    assert spy_window_manager.calls[0] == dtos.WindowManagerCall(
+        command="make", arg=dtos.WindowDetails(mark="a", command="kak README.md")
+    )
@@ -0,0 +1,138 @@
+import json
+import random
+
+import pytest
+import toml
+
+from rezide import testing
+from rezide.utils import config_parser
+from rezide.utils import dtos
+from rezide.utils import layouts
+from rezide.utils import tree
+
+specs = [
+    dtos.LayoutSpec(),
+    dtos.LayoutSpec(depth=3, fan_out=4, sizes="random"),
+    dtos.LayoutSpec(depth=50, fan_out=2, shape="chain", sizes="skewed"),
+    dtos.LayoutSpec(fan_out=100, shape="star", sizes="random"),
+    dtos.LayoutSpec(depth=4, fan_out=5, shape="random", sizes="random", seed=7),
+    dtos.LayoutSpec(depth=1, fan_out=3, command_length=500),
+]
+
+
+def get_windows(config_dict):
+    parser = config_parser.ConfigParser(config_dict, tree.TreeFactory())
+    parser.validate()
+    return layouts.Layout(parser.get_tree()).windows()
+
+
+@pytest.mark.parametrize("spec", specs)
+def test_generated_layouts_are_valid(spec):
+    config_dict = testing.generate_config_dict(spec)
+    assert 1 <= len(get_windows(config_dict)) <= testing.max_windows(spec)
+    assert toml.loads(testing.generate_toml(spec)) == config_dict
+
+
+@pytest.mark.parametrize(
+    "spec,expected_windows",
+    [
+        (dtos.LayoutSpec(depth=3, fan_out=3), 27),
+        (dtos.LayoutSpec(depth=10, fan_out=3, shape="chain"), 21),
+        (dtos.LayoutSpec(depth=10, fan_out=30, shape="star"), 30),
+    ],
+)
+def test_shapes(spec, expected_windows):
+    assert len(get_windows(testing.generate_config_dict(spec))) == expected_windows
+
+
+def test_the_deepest_chains_can_be_built():
+    spec = dtos.LayoutSpec(depth=testing.MAX_DEPTH, shape="chain")
+    assert len(get_windows(testing.generate_config_dict(spec))) == testing.MAX_DEPTH + 1
+
+
+def test_chains_are_left_deep():
+    config_dict = testing.generate_config_dict(
+        dtos.LayoutSpec(depth=3, fan_out=3, shape="chain")
+    )
+    assert config_dict["root"]["children"] == ["section-1", "window-1", "window-2"]
+    assert config_dict["section-1"]["children"] == ["section-2", "window-3", "window-4"]
+    assert config_dict["section-2"]["split"] == "horizontal"
+    assert get_windows(config_dict)[0].mark == "window-5"
+
+
+def test_layouts_depend_only_on_the_seed():
+    spec = dtos.LayoutSpec(depth=5, fan_out=6, shape="random", sizes="random")
+    assert testing.generate_config_dict(spec) == testing.generate_config_dict(spec)
+    assert testing.generate_config_dict(spec) != testing.generate_config_dict(
+        spec._replace(seed=1)
+    )
+
+
+@pytest.mark.parametrize(
+    "distribution,expected",
+    [("even", [34, 33, 33]), ("skewed", [98, 1, 1])],
+)
+def test_make_sizes(distribution, expected):
+    assert testing.make_sizes(3, distribution, random.Random(0)) == expected
+
+
+def test_random_sizes():
+    rng = random.Random(0)
+    for num_children in (2, 10, 100):
+        sizes = testing.make_sizes(num_children, "random", rng)
+        assert len(sizes) == num_children
+        assert sum(sizes) == 100
+        assert min(sizes) >= 1
+
+
+def test_make_command():
+    rng = random.Random(0)
+    short = testing.make_command("window-1", dtos.LayoutSpec(), rng)
+    assert short == "alacritty --title window-1 -e sh -c 'zsh'"
+    long = testing.make_command("window-1", dtos.LayoutSpec(command_length=200), rng)
+    assert len(long) == 200
+    assert long.startswith("alacritty --title window-1 -e sh -c 'echo ")
+
+
+@pytest.mark.parametrize(
+    "spec,message",
+    [
+        (dtos.LayoutSpec(shape="tree"), "shape must be one of"),
+        (dtos.LayoutSpec(sizes="uneven"), "sizes must be one of"),
+        (dtos.LayoutSpec(depth=0), "depth must be between 1 and 200"),
+        (dtos.LayoutSpec(depth=2000, shape="chain"), "depth must be between"),
+        (dtos.LayoutSpec(fan_out=1), "fan_out must be between 2 and 100"),
+        (dtos.LayoutSpec(fan_out=101, shape="star"), "fan_out must be between"),
+        (dtos.LayoutSpec(command_length=-1), "command_length can't be negative"),
+        (dtos.LayoutSpec(depth=14), "could have 16384 windows"),
+    ],
+)
+def test_invalid_specs(spec, message):
+    with pytest.raises(RuntimeError, match=message):
+        testing.generate_config_dict(spec)
+
+
+def test_cli(click_runner):
+    result = click_runner.invoke(
+        testing.main, ["--depth", "3", "--shape", "chain", "--seed", "2"]
+    )
+    assert result.exit_code == 0, result.exception
+    assert toml.loads(result.output) == testing.generate_config_dict(
+        dtos.LayoutSpec(depth=3, shape="chain", seed=2)
+    )
+
+
+def test_cli_json(click_runner):
+    result = click_runner.invoke(
+        testing.main, ["--fan-out", "5", "--shape", "star", "--format", "json"]
+    )
+    assert result.exit_code == 0, result.exception
+    assert json.loads(result.output) == testing.generate_config_dict(
+        dtos.LayoutSpec(fan_out=5, shape="star")
+    )
+
+
+def test_cli_errors(click_runner):
+    result = click_runner.invoke(testing.main, ["--depth", "0"])
+    assert result.exit_code == 2
+    assert "depth must be between 1 and 200" in result.output
@@ -0,0 +1,147 @@
+import json
+from typing import Dict, List, NamedTuple
+from unittest import mock
+
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import tracing
+from tests import fakes
+
+
+@pytest.fixture
+def tracer():
+    return tracing.Tracer(clock=fakes.FakeClock(step=1))
+
+
+def test_span_records_complete_event(tracer):
+    with tracer.span("parse", "config", path="/abc/config.toml"):
+        pass
+    assert len(tracer.events) == 1
+    event = tracer.events[0]
+    assert event["name"] == "parse"
+    assert event["cat"] == "config"
+    assert event["ph"] == "X"
+    assert event["ts"] == 1_000_000
+    assert event["dur"] == 1_000_000
+    assert event["args"] == {"path": "/abc/config.toml"}
+
+
+def test_nested_spans_contain_each_other(tracer):
+    with tracer.span("outer", "layout"):
+        with tracer.span("inner", "ipc"):
+            pass
+    inner, outer = tracer.events
+    assert outer["ts"] < inner["ts"]
+    assert inner["ts"] + inner["dur"] < outer["ts"] + outer["dur"]
+
+
+def test_span_is_recorded_when_exception_is_raised(tracer):
+    with pytest.raises(RuntimeError):
+        with tracer.span("validate", "config"):
+            raise RuntimeError("invalid config")
+    assert [event["name"] for event in tracer.events] == ["validate"]
+    assert tracer.events[0]["args"] == {"error": "RuntimeError"}
+
+
+def test_write_chrome_trace(tracer):
+    with tracer.span("validate", "config"):
+        pass
+    filestore = fakes.FakeFilestore(dict())
+    tracer.write(filestore, "/traces/rzd.json")
+    trace = json.loads(filestore.read_file("/traces/rzd.json"))
+    assert trace["displayTimeUnit"] == "ms"
+    metadata, span = trace["traceEvents"]
+    assert metadata["ph"] == "M"
+    assert span["name"] == "validate"
+
+
+def test_tracing_config_reader(tracer):
+    reader = tracing.TracingConfigReader(fakes.FakeConfig({"a": "b"}), tracer)
+    assert reader.read("/abc/config.toml") == {"a": "b"}
+    assert tracer.events[0]["name"] == "parse"
+
+
+def test_tracing_config_parser(tracer):
+    parser = mock.MagicMock()
+    tracing_parser = tracing.TracingConfigParser(parser, tracer)
+    tracing_parser.validate()
+    assert tracing_parser.get_tree() == parser.get_tree.return_value
+    assert [event["name"] for event in tracer.events] == ["validate", "get_tree"]
+
+
+def test_tracing_tree_factory(tracer):
+    tree_stub = mock.MagicMock()
+    factory = tracing.TracingTreeFactory(fakes.FakeTreeFactory(tree_stub), tracer)
+    assert factory.create_tree(dict()) == tree_stub
+    assert tracer.events[0]["name"] == "create_tree"
+
+
+class WindowManagerCallTestCase(NamedTuple):
+    method: str
+    args: List
+    expected_span_args: Dict
+
+
+window = dtos.WindowDetails(mark="editor", command="kak")
+window_manager_call_test_cases = [
+    WindowManagerCallTestCase(
+        "make_window", [window], {"mark": "editor", "command": "kak"}
+    ),
+    WindowManagerCallTestCase("resize_width", [window, 50], {"mark": "editor"}),
+    WindowManagerCallTestCase("resize_height", [window, 50], {"mark": "editor"}),
+    WindowManagerCallTestCase("focus", [window], {"mark": "editor"}),
+    WindowManagerCallTestCase(
+        "split_and_mark_parent", ["vertical", "abc"], {"split": "vertical"}
+    ),
+    WindowManagerCallTestCase("get_tree", [None], {"workspace": None}),
+    WindowManagerCallTestCase("get_windows", ["1"], {"workspace": "1"}),
+    WindowManagerCallTestCase("get_window_geometries", [], {}),
+    WindowManagerCallTestCase("wait_for_tree_change", [], {}),
+    WindowManagerCallTestCase("get_window_sizes", [None], {"workspace": None}),
+    WindowManagerCallTestCase("get_workspace_snapshot", [], {}),
+    WindowManagerCallTestCase("switch_workspace", ["1"], {"workspace": "1"}),
+    WindowManagerCallTestCase("focus_output", ["DP-1"], {"output": "DP-1"}),
+    WindowManagerCallTestCase("spawn_hidden", ["foot"], {"command": "foot"}),
+    WindowManagerCallTestCase(
+        "prelaunch", [window], {"mark": "editor", "command": "kak"}
+    ),
+    WindowManagerCallTestCase("adopt_window", [3, window], {"mark": "editor"}),
+    WindowManagerCallTestCase("get_con_ids", [["editor"]], {}),
+    WindowManagerCallTestCase("hide_windows", [[3]], {}),
+    WindowManagerCallTestCase("close_windows", [[3]], {}),
+    WindowManagerCallTestCase("get_pids", [[3]], {}),
+]
+
+
+@pytest.mark.parametrize("test_case", window_manager_call_test_cases)
+def test_tracing_window_manager(tracer, test_case):
+    """Each call is passed through to the real window manager and gets a span"""
+    window_manager = mock.MagicMock()
+    tracing_window_manager = tracing.TracingWindowManager(window_manager, tracer)
+    getattr(tracing_window_manager, test_case.method)(*test_case.args)
+    getattr(window_manager, test_case.method).assert_called_once_with(*test_case.args)
+    event = tracer.events[0]
+    assert event["name"] == test_case.method
+    assert event["cat"] == "ipc"
+    assert event["args"] == test_case.expected_span_args
+
+
+def test_placing_prelaunched_windows_has_its_own_span(tracer):
+    """Otherwise the history would think that the client started instantly"""
+    tracing_window_manager = tracing.TracingWindowManager(mock.MagicMock(), tracer)
+    tracing_window_manager.prelaunch(window)
+    tracing_window_manager.make_window(window)
+    tracing_window_manager.make_window(window)
+    assert [event["name"] for event in tracer.events] == [
+        "prelaunch",
+        "place_prelaunched",
+        "make_window",
+    ]
+
+
+def test_tracing_window_manager_counts_windows(tracer):
+    window_manager = fakes.FakeWindowManager(num_workspace_windows=3)
+    tracing_window_manager = tracing.TracingWindowManager(window_manager, tracer)
+    assert tracing_window_manager.num_workspace_windows == 3
+    assert tracer.events[0]["name"] == "num_workspace_windows"
@@ -0,0 +1,131 @@
+import pytest
+
+from rezide.utils import dtos
+from rezide.utils import layouts
+from rezide.utils import transitions
+from tests import fakes
+
+
+def window(mark, command, reuse=None):
+    return dtos.WindowDetails(mark=mark, command=command, reuse=reuse)
+
+
+def test_windows_are_matched_by_command():
+    plan = transitions.plan_transition(
+        [window("editor", "kak"), window("shell", "foot"), window("logs", "foot")],
+        [window("code", "kak"), window("terminal", "foot"), window("docs", "brave")],
+    )
+    assert plan == dtos.TransitionPlan(
+        reused={"code": "editor", "terminal": "shell"}, dropped=["logs"]
+    )
+
+
+def test_reuse_keys_beat_commands():
+    plan = transitions.plan_transition(
+        [window("editor", "kak", reuse="editor"), window("notes", "kak")],
+        [window("code", "kak ~/code", reuse="editor"), window("review", "kak")],
+    )
+    assert plan.reused == {"code": "editor", "review": "notes"}
+    assert plan.dropped == []
+
+
+def layout(config):
+    return layouts.LayoutManager(
+        fakes.FakeConfigParser(config), fakes.SpyWindowManager()
+    )
+
+
+coding_layout = {
+    "split": "horizontal",
+    "sizes": [50, 50],
+    "children": [
+        {"mark": "editor", "command": "kak {{repo}}"},
+        {"mark": "tests", "command": "ptw"},
+    ],
+}
+review_layout = {
+    "split": "vertical",
+    "sizes": [30, 40, 30],
+    "children": [
+        {"mark": "diff", "command": "tig"},
+        {"mark": "code", "command": "kak {{repo}}"},
+        {"mark": "ci", "command": "gh run watch"},
+    ],
+}
+
+
+def test_switch():
+    window_manager = fakes.SpyWindowManager(
+        con_ids={"editor": 4, "tests": 5, "unrelated": 9}, num_workspace_windows=2
+    )
+    switcher = transitions.LayoutSwitcher(window_manager)
+    new_layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(review_layout), window_manager
+    )
+    plan = switcher.switch(layout(coding_layout), new_layout, {"repo": "~/a"})
+    assert plan == dtos.TransitionPlan(reused={"code": "editor"}, dropped=["tests"])
+    code = dtos.WindowDetails(mark="code", command="kak ~/a")
+    assert window_manager.calls == [
+        dtos.WindowManagerCall("hide", [4]),
+        dtos.WindowManagerCall("close", [5]),
+        dtos.WindowManagerCall("make", dtos.WindowDetails("diff", "tig")),
+        dtos.WindowManagerCall("split", "vertical"),
+        dtos.WindowManagerCall("adopt", (4, code)),
+        dtos.WindowManagerCall("make", dtos.WindowDetails("ci", "gh run watch")),
+    ]
+
+
+def test_windows_that_were_already_closed_are_opened_again():
+    window_manager = fakes.SpyWindowManager(con_ids={"tests": 5})
+    switcher = transitions.LayoutSwitcher(window_manager)
+    new_layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(review_layout), window_manager
+    )
+    plan = switcher.switch(layout(coding_layout), new_layout, {"repo": "~/a"})
+    assert plan == dtos.TransitionPlan(reused={}, dropped=["tests"])
+
+
+def test_switch_fails_with_stray_windows():
+    window_manager = fakes.SpyWindowManager(
+        con_ids={"editor": 4, "tests": 5}, num_workspace_windows=4
+    )
+    switcher = transitions.LayoutSwitcher(window_manager)
+    with pytest.raises(RuntimeError, match="2 windows"):
+        switcher.switch(layout(coding_layout), layout(review_layout), {"repo": "~/a"})
+    assert window_manager.calls == []
+
+
+plain_layout = {
+    "split": "horizontal",
+    "sizes": [50, 50],
+    "children": [
+        {"mark": "notes", "command": "kak notes.md"},
+        {"mark": "shell", "command": "foot"},
+    ],
+}
+
+
+def test_each_layout_gets_its_own_params():
+    window_manager = fakes.SpyWindowManager(
+        con_ids={"editor": 4, "tests": 5}, num_workspace_windows=2
+    )
+    switcher = transitions.LayoutSwitcher(window_manager)
+    new_layout = layouts.LayoutManager(
+        fakes.FakeConfigParser(plain_layout), window_manager
+    )
+    plan = switcher.switch(layout(coding_layout), new_layout, {"repo": "~/a"})
+    assert plan == dtos.TransitionPlan(reused={}, dropped=["editor", "tests"])
+    assert (
+        dtos.WindowManagerCall("make", dtos.WindowDetails("notes", "kak notes.md"))
+        in window_manager.calls
+    )
+
+
+def test_params_that_neither_layout_has_are_rejected():
+    window_manager = fakes.SpyWindowManager(con_ids={"editor": 4, "tests": 5})
+    switcher = transitions.LayoutSwitcher(window_manager)
+    with pytest.raises(RuntimeError, match=r"these parameters: \['rpeo'\]"):
+        switcher.switch(
+            layout(coding_layout), layout(plain_layout), {"repo": "~/a", "rpeo": "~/b"}
+        )
+    assert window_manager.calls == []
@@ -1,3 +1,7 @@
+import gc
+from unittest import mock
+import weakref
+
 import pytest
 
 from rezide.utils import dtos
@@ -28,6 +32,50 @@ def test_tree_creation():
     assert actual_tree == expected_tree
 
 
+def test_tree_creation_with_readiness_probes():
+    tree_dict = {
+        "split": "horizontal",
+        "sizes": [50, 50],
+        "children": [
+            {
+                "mark": "editor",
+                "command": "nvim --listen /tmp/nvim.sock",
+                "ready_socket": "/tmp/nvim.sock",
+                "ready_timeout": 3,
+            },
+            {
+                "mark": "shell",
+                "command": "alacritty",
+                "ready_title": "^~",
+                "terminal_command": "$SHELL",
+                "reuse": "shell",
+            },
+        ],
+    }
+    actual_tree = tree.TreeFactory().create_tree(tree_dict)
+    expected_tree = tree.Section("horizontal", [50, 50])
+    tree.Window(
+        dtos.WindowDetails(
+            mark="editor",
+            command="nvim --listen /tmp/nvim.sock",
+            ready_socket="/tmp/nvim.sock",
+            ready_timeout=3,
+        ),
+        parent=expected_tree,
+    )
+    tree.Window(
+        dtos.WindowDetails(
+            mark="shell",
+            command="alacritty",
+            ready_title="^~",
+            terminal_command="$SHELL",
+            reuse="shell",
+        ),
+        parent=expected_tree,
+    )
+    assert actual_tree == expected_tree
+
+
 def test_not_enough_children():
     tree_dict = {
         "split": "horizontal",
@@ -215,3 +263,133 @@ def test_window_cant_add_child():
     window_2 = tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"))
     with pytest.raises(RuntimeError):
         window_2.add_child(window_1)
+
+
+def test_identical_subtrees_are_shared():
+    def pair(split):
+        return {
+            "split": split,
+            "sizes": [50, 50],
+            "children": [
+                {"mark": "a", "command": "kak"},
+                {"mark": "b", "command": "ptw"},
+            ],
+        }
+
+    factory = tree.TreeFactory()
+    first = factory.create_tree(
+        {
+            "split": "horizontal",
+            "sizes": [50, 50],
+            "children": [pair("vertical"), {"mark": "c", "command": "brave"}],
+        }
+    )
+    second = factory.create_tree(
+        {
+            "split": "vertical",
+            "sizes": [30, 70],
+            "children": [{"mark": "d", "command": "zsh"}, pair("vertical")],
+        }
+    )
+    assert first.children[0] is second.children[1]
+    different = factory.create_tree(pair("horizontal"))
+    assert different is not first.children[0]
+    assert different.children[0] is first.children[0].children[0]
+
+
+def test_sections_with_different_sizes_are_unequal():
+    tree_1 = tree.Section("a", [50, 50])
+    tree_2 = tree.Section("a", [70, 30])
+    for section in (tree_1, tree_2):
+        tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"), parent=section)
+        tree.Window(dtos.WindowDetails(mark="bye", command="echo bye"), parent=section)
+    assert tree_1 != tree_2
+
+
+def test_identical_trees_have_the_same_hash():
+    tree_dict = {
+        "split": "horizontal",
+        "sizes": [50, 50],
+        "children": [
+            {"mark": "a", "command": "kak"},
+            {"mark": "b", "command": "firefox"},
+        ],
+    }
+    tree_1 = tree.TreeFactory().create_tree(tree_dict)
+    tree_2 = tree.TreeFactory().create_tree(tree_dict)
+    assert tree_1 is not tree_2
+    assert tree_1.structural_hash == tree_2.structural_hash
+    assert len({tree_1, tree_2, tree_1.children[0]}) == 2
+
+
+def test_adding_a_child_changes_the_hash():
+    section = tree.Section("a", [50, 50])
+    tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"), parent=section)
+    old_hash = section.structural_hash
+    tree.Window(dtos.WindowDetails(mark="bye", command="echo bye"), parent=section)
+    assert section.structural_hash != old_hash
+
+
+def test_adding_a_child_changes_the_hash_of_every_ancestor():
+    root = tree.Section("a", [50, 50])
+    middle = tree.Section("b", [50, 50], parent=root)
+    tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"), parent=middle)
+    tree.Window(dtos.WindowDetails(mark="bye", command="echo bye"), parent=root)
+    old_hash = root.structural_hash
+    tree.Window(dtos.WindowDetails(mark="yo", command="echo yo"), parent=middle)
+    assert root.structural_hash != old_hash
+
+
+def test_sections_can_hold_other_tree_nodes():
+    section = tree.Section("a", [50, 50])
+    tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"), parent=section)
+    section.add_child(mock.Mock(structural_hash=b"other"))
+    assert section.structural_hash == tree.section_hash(
+        "a",
+        [50, 50],
+        [section.children[0].structural_hash, b"other"],
+    )
+
+
+def test_trees_dont_compare_to_other_types():
+    window = tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"))
+    assert window.__eq__("hi") is NotImplemented
+    assert window != "hi"
+
+
+def test_shared_subtrees_dont_keep_their_parents_alive():
+    def pair(split):
+        return {
+            "split": split,
+            "sizes": [50, 50],
+            "children": [
+                {"mark": "a", "command": "kak"},
+                {"mark": "b", "command": "ptw"},
+            ],
+        }
+
+    # only the two windows and the latest section fit
+    factory = tree.TreeFactory(max_subtrees=3)
+    first = weakref.ref(factory.create_tree(pair("horizontal")))
+    second = factory.create_tree(pair("vertical"))
+    gc.collect()
+    assert first() is None
+    assert second.children[0] is factory.create_tree({"mark": "a", "command": "kak"})
+
+
+def test_only_recent_subtrees_are_shared():
+    factory = tree.TreeFactory(max_subtrees=2)
+    first = factory.create_tree({"mark": "a", "command": "kak"})
+    factory.create_tree({"mark": "b", "command": "ptw"})
+    assert factory.create_tree({"mark": "a", "command": "kak"}) is first
+    factory.create_tree({"mark": "c", "command": "zsh"})
+    factory.create_tree({"mark": "d", "command": "vim"})
+    assert factory.create_tree({"mark": "a", "command": "kak"}) is not first
+
+
+def test_sections_only_describe_their_own_level():
+    section = tree.Section("vertical", [50, 50])
+    window = tree.Window(dtos.WindowDetails(mark="hi", command="echo hi"), section)
+    tree.Section("horizontal", [50, 50], parent=section)
+    assert repr(section) == "Section(vertical, 2 children)"
+    assert repr(window) == 'Window("hi")'